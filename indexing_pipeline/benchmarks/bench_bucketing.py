@@ -0,0 +1,86 @@
+"""
+Measure padding waste and throughput of length-bucketed embedding.
+
+"before" is the previous setup: pipeline batches of 32 messages in CSV order,
+each encoded as one padded forward pass, with the model's default maximum
+sequence length. "after" feeds larger pipeline batches through
+SentenceTransformerEmbedder with `token_budget` (length buckets) and
+`max_seq_length`. Padding waste is the share of padded token positions that
+hold no real token. Run from the indexing_pipeline directory:
+
+    uv run python -m benchmarks.bench_bucketing --max-seq-length 128 --token-budget 4096
+"""
+import argparse
+import time
+from typing import List
+
+import numpy as np
+
+from src.data_loader import DataLoader
+from src.embedding.sentence_tranformer_embedder import SentenceTransformerEmbedder, length_buckets
+from src.models.document import DocumentBatch
+
+
+def padding_waste(batches: List[np.ndarray]) -> float:
+    """Share of padded positions that are padding, for batches of token lengths."""
+    padded = sum(len(lengths) * lengths.max() for lengths in batches if len(lengths))
+    real = sum(lengths.sum() for lengths in batches)
+    return 1.0 - real / padded
+
+
+def split(batch: DocumentBatch, size: int) -> List[DocumentBatch]:
+    return [batch.select(range(start, min(start + size, len(batch)))) for start in range(0, len(batch), size)]
+
+
+def throughput(embedder: SentenceTransformerEmbedder, batches: List[DocumentBatch]) -> float:
+    embedder.embed_document_batch(batches[0])  # warm up
+    started = time.perf_counter()
+    rows = sum(len(embedder.embed_document_batch(batch)) for batch in batches)
+    return rows / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L12-v2")
+    parser.add_argument("--corpus", default="../data/YInt_w_label.csv")
+    parser.add_argument("--rows", type=int, default=None, help="messages to use (default: all)")
+    parser.add_argument("--max-seq-length", type=int, default=128)
+    parser.add_argument("--token-budget", type=int, default=4096, help="padded tokens per forward pass")
+    parser.add_argument("--pipeline-batch", type=int, default=512, help="documents per pipeline batch (after)")
+    args = parser.parse_args()
+
+    corpus = next(DataLoader(args.corpus).load_column_batches(batch_size=args.rows or 1 << 30))
+
+    before = SentenceTransformerEmbedder(args.model, batch_size=32)
+    after = SentenceTransformerEmbedder(
+        args.model, max_seq_length=args.max_seq_length, token_budget=args.token_budget
+    )
+
+    untruncated = np.array([len(ids) for ids in before.model.tokenizer(corpus.message)["input_ids"]])
+    print(
+        f"{len(corpus)} messages; tokens p50 {np.percentile(untruncated, 50):.0f}, "
+        f"p99 {np.percentile(untruncated, 99):.0f}, max {untruncated.max()}; "
+        f"{(untruncated > args.max_seq_length).sum()} longer than {args.max_seq_length} "
+        f"(model default {before.model.max_seq_length})"
+    )
+
+    before_lengths = before.token_lengths(corpus.message)
+    waste_before = padding_waste([before_lengths[i:i + 32] for i in range(0, len(corpus), 32)])
+    after_lengths = after.token_lengths(corpus.message)
+    waste_after = padding_waste(
+        [
+            chunk[bucket]
+            for chunk in (after_lengths[i:i + args.pipeline_batch] for i in range(0, len(corpus), args.pipeline_batch))
+            for bucket in length_buckets(chunk, args.token_budget)
+        ]
+    )
+
+    rate_before = throughput(before, split(corpus, 32))
+    rate_after = throughput(after, split(corpus, args.pipeline_batch))
+    print(f"{'':<8} {'padding waste':>14} {'docs/s':>10}")
+    print(f"{'before':<8} {waste_before:>14.1%} {rate_before:>10,.0f}")
+    print(f"{'after':<8} {waste_after:>14.1%} {rate_after:>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Compare QdrantIndexer's default upserts with bulk-load mode.
+
+Random 384-dimensional vectors stand in for the embedder. The default run
+sends one acknowledged upsert per --batch-size documents from one thread, as
+the pipeline did before; the bulk run uses bulk_load() with --bulk-batch-size
+documents per upsert and --workers uploads in flight. Each run indexes into a
+fresh collection and its time includes waiting for the collection to finish
+indexing. Run from the indexing_pipeline directory against a local server:
+
+    uv run python -m benchmarks.bench_bulk_load --location http://localhost:6333 --rows 100000
+
+or, without a server, against Qdrant in-process local mode (the default),
+where HNSW settings and gRPC have no effect and, because the local client is
+not thread-safe, uploads run one at a time:
+
+    uv run python -m benchmarks.bench_bulk_load --rows 20000
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import numpy as np
+
+from src.indexing.qdrant_indexer import QdrantIndexer
+from src.models.document import Document, DocumentBatch, EmbeddedBatch
+
+
+def make_batches(rows: int, batch_size: int) -> List[EmbeddedBatch]:
+    rng = np.random.default_rng(0)
+    batches = []
+    for start in range(0, rows, batch_size):
+        documents = DocumentBatch.from_documents(
+            [
+                Document("2020-04-06 00:00:00", "Weston", f"user{i}", f"message {i}")
+                for i in range(start, min(start + batch_size, rows))
+            ]
+        )
+        batches.append(EmbeddedBatch(documents, rng.random((len(documents), 384), dtype=np.float32), "bench"))
+    return batches
+
+
+def report(name: str, rows: int, elapsed: float) -> None:
+    print(f"{name:<40} {rows:>9} points {elapsed:8.2f}s {rows / elapsed:>10,.0f} points/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--location", default=":memory:", help='Qdrant URL, local path or ":memory:"')
+    parser.add_argument("--grpc", action="store_true", help="use gRPC for the bulk run")
+    parser.add_argument("--rows", type=int, default=20_000, help="number of points")
+    parser.add_argument("--batch-size", type=int, default=32, help="points per upsert in the default run")
+    parser.add_argument("--bulk-batch-size", type=int, default=256, help="points per upsert in the bulk run")
+    parser.add_argument("--workers", type=int, default=4, help="uploads in flight in the bulk run")
+    args = parser.parse_args()
+    if not args.location.startswith(("http://", "https://")):
+        args.workers = 1
+
+    indexer = QdrantIndexer(collection_name="bench_default", location=args.location)
+    batches = make_batches(args.rows, args.batch_size)
+    started = time.perf_counter()
+    for batch in batches:
+        indexer.index_embedded_batch(batch)
+    indexer.wait_for_optimization()
+    report(f"default (batch {args.batch_size}, 1 upload)", args.rows, time.perf_counter() - started)
+    indexer.client.delete_collection("bench_default")
+
+    indexer = QdrantIndexer(collection_name="bench_bulk", location=args.location, prefer_grpc=args.grpc)
+    batches = make_batches(args.rows, args.bulk_batch_size)
+    started = time.perf_counter()
+    with indexer.bulk_load(), ThreadPoolExecutor(args.workers) as pool:
+        list(pool.map(indexer.index_embedded_batch, batches))
+    report(
+        f"bulk (batch {args.bulk_batch_size}, {args.workers} uploads{', gRPC' if args.grpc else ''})",
+        args.rows,
+        time.perf_counter() - started,
+    )
+    indexer.client.delete_collection("bench_bulk")
+
+
+if __name__ == "__main__":
+    main()
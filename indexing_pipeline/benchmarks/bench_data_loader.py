@@ -0,0 +1,58 @@
+"""
+Compare DataLoader throughput: row loader versus the columnar loader.
+
+The YInt CSV is replicated until it holds --rows rows, then each loader reads
+the whole file. Run from the indexing_pipeline directory:
+
+    uv run python -m benchmarks.bench_data_loader --rows 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from src.data_loader import DataLoader, pa
+
+
+def replicate_csv(source: Path, target: Path, rows: int) -> None:
+    """Write about `rows` data rows to `target` by repeating all rows of `source`."""
+    with open(source, "rb") as f:
+        header = f.readline()
+        body = f.read()
+    if not body.endswith(b"\n"):
+        body += b"\n"
+    source_rows = sum(len(batch) for batch in DataLoader(source).load_column_batches())
+
+    with open(target, "wb") as f:
+        f.write(header)
+        for _ in range(max(1, rows // source_rows)):
+            f.write(body)
+
+def time_loader(name: str, batches) -> None:
+    started = time.perf_counter()
+    rows = sum(len(batch) for batch in batches)
+    elapsed = time.perf_counter() - started
+    print(f"{name:<32} {rows:>10} rows {elapsed:8.2f}s {rows / elapsed:>12,.0f} rows/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", default="../data/YInt_w_label.csv", help="CSV to replicate")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="approximate number of rows")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes for the parallel run")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = Path(tmp) / "corpus.csv"
+        replicate_csv(Path(args.source), corpus, args.rows)
+        loader = DataLoader(corpus)
+        print(f"Corpus: {corpus.stat().st_size / 1e6:.1f} MB, pyarrow {'available' if pa else 'not installed'}")
+
+        time_loader("row loader (Document per row)", loader.load_in_batches(batch_size=32))
+        time_loader("columnar, 1 worker", loader.load_column_batches(workers=1))
+        time_loader(f"columnar, {args.workers} workers", loader.load_column_batches(workers=args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Fraction of encode calls saved by near-duplicate detection on the corpus.
+
+Streams the corpus through NearDuplicateDetector in pipeline-sized batches
+(no model needed: encoded rows get placeholder vectors) and compares the
+rows it still encodes with exact-duplicate removal (identical message text,
+what the embedding cache catches). Also prints the largest groups, to check
+that what is merged really is a repost or a spam variant. Run from the
+indexing_pipeline directory:
+
+    uv run python -m benchmarks.bench_dedup --threshold 0.95
+"""
+import argparse
+import time
+from collections import Counter
+
+import numpy as np
+
+from src.data_loader import DataLoader
+from src.dedup import NearDuplicateDetector
+from src.models.document import EmbeddedBatch
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default="../data/YInt_w_label.csv")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--threshold", type=float, default=0.95)
+    parser.add_argument("--num-perm", type=int, default=128)
+    parser.add_argument("--bands", type=int, default=16)
+    parser.add_argument("--groups", type=int, default=5, help="largest groups to print")
+    args = parser.parse_args()
+
+    detector = NearDuplicateDetector(threshold=args.threshold, num_perm=args.num_perm, bands=args.bands)
+    exact = set()
+    members = {}
+    started = time.perf_counter()
+    for batch in DataLoader(args.corpus).load_column_batches(batch_size=args.batch_size):
+        exact.update(batch.message)
+        plan = detector.plan(batch)
+        encoded = EmbeddedBatch(
+            batch.select(plan.embed_rows), np.zeros((len(plan.embed_rows), 1), dtype=np.float32), "placeholder"
+        )
+        embedded = detector.complete(plan, encoded if plan.embed_rows else None)
+        for group_id, message in zip(embedded.payload["duplicate_group"], batch.message):
+            members.setdefault(group_id, []).append(message)
+    seconds = time.perf_counter() - started
+
+    rows = detector.rows
+    print(f"{rows} messages, {seconds:.2f} s ({rows / seconds:,.0f} messages/s)")
+    print(f"{'':<22} {'encoded':>8} {'saved':>8}")
+    print(f"{'exact duplicates':<22} {len(exact):>8} {1 - len(exact) / rows:>8.1%}")
+    print(f"{'near duplicates':<22} {detector.encoded:>8} {detector.saved_fraction:>8.1%}")
+
+    largest = sorted(members.values(), key=len, reverse=True)[:args.groups]
+    for group in largest:
+        variants = Counter(group)
+        print(f"\n{len(group)} messages, {len(variants)} distinct texts:")
+        for text, count in variants.most_common(3):
+            print(f"  {count:>4} x {text[:100]}")
+
+
+if __name__ == "__main__":
+    main()
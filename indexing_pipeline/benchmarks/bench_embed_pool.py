@@ -0,0 +1,56 @@
+"""
+Scaling curve of ProcessPoolEmbedder: docs/sec with 1, 2, 4 and N workers.
+
+Every worker holds its own SentenceTransformerEmbedder with cores / workers
+intra-op threads. The "in-process" row is a single SentenceTransformerEmbedder
+using all cores, for reference. Run from the indexing_pipeline directory:
+
+    uv run python -m benchmarks.bench_embed_pool --rows 4000
+"""
+import argparse
+import os
+import time
+
+from src.data_loader import DataLoader
+from src.embedding.process_pool_embedder import ProcessPoolEmbedder
+from src.embedding.sentence_tranformer_embedder import SentenceTransformerEmbedder
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L12-v2")
+    parser.add_argument("--corpus", default="../data/YInt_w_label.csv")
+    parser.add_argument("--rows", type=int, default=4000, help="messages to embed")
+    parser.add_argument("--batch-size", type=int, default=256, help="documents per pipeline batch")
+    args = parser.parse_args()
+
+    corpus = next(DataLoader(args.corpus).load_column_batches(batch_size=args.rows))
+    batches = [
+        corpus.select(range(start, min(start + args.batch_size, len(corpus))))
+        for start in range(0, len(corpus), args.batch_size)
+    ]
+    cores = os.cpu_count() or 1
+    kwargs = {"model_name": args.model, "batch_size": 32}
+
+    def rate(embedder) -> float:
+        embedder.embed_document_batch(batches[0])  # start workers and load models
+        started = time.perf_counter()
+        for batch in batches:
+            embedder.embed_document_batch(batch)
+        return len(corpus) / (time.perf_counter() - started)
+
+    print(f"{len(corpus)} messages, {cores} cores")
+    print(f"{'workers':<12} {'threads/worker':>14} {'docs/s':>10} {'speedup':>8}")
+    baseline = rate(SentenceTransformerEmbedder(**kwargs))
+    print(f"{'in-process':<12} {cores:>14} {baseline:>10,.0f} {1.0:>8.2f}")
+    for workers in sorted({1, 2, 4, cores}):
+        with ProcessPoolEmbedder(SentenceTransformerEmbedder, kwargs, workers=workers) as embedder:
+            docs_per_second = rate(embedder)
+            print(
+                f"{workers:<12} {embedder.threads_per_worker:>14} "
+                f"{docs_per_second:>10,.0f} {docs_per_second / baseline:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Compare embedding backends: PyTorch, ONNX Runtime and ONNX Runtime int8.
+
+For each backend it reports indexing throughput (documents/sec embedding the
+first --rows messages in pipeline-sized batches), single-query encode latency
+(p50/p99 over the category terms, as the search service encodes them) and the
+largest cosine distance from the PyTorch vectors. Run from the
+indexing_pipeline directory:
+
+    uv run --extra onnx python -m benchmarks.bench_embedders --rows 2000
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from src.data_loader import DataLoader
+from src.embedding.onnx_embedder import OnnxEmbedder, cosine_distances
+from src.embedding.sentence_tranformer_embedder import SentenceTransformerEmbedder
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L12-v2")
+    parser.add_argument("--corpus", default="../data/YInt_w_label.csv")
+    parser.add_argument("--categories", default="../data/categories.json")
+    parser.add_argument("--rows", type=int, default=2000, help="messages to embed")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--quantization-config", default="avx2", help="instruction set for int8 quantization")
+    args = parser.parse_args()
+
+    documents = next(DataLoader(args.corpus).load_column_batches(batch_size=args.rows))
+    batches = [
+        documents.select(range(start, min(start + args.batch_size, len(documents))))
+        for start in range(0, len(documents), args.batch_size)
+    ]
+    with open(args.categories, "r", encoding="utf-8") as f:
+        terms = [term for category_terms in json.load(f).values() for term in category_terms]
+
+    backends = {
+        "torch": lambda: SentenceTransformerEmbedder(args.model, args.batch_size),
+        "onnx": lambda: OnnxEmbedder(args.model, args.batch_size),
+        "onnx-int8": lambda: OnnxEmbedder(
+            args.model, args.batch_size, quantize=True, quantization_config=args.quantization_config
+        ),
+    }
+
+    reference = None
+    print(f"{'backend':<10} {'docs/s':>10} {'query p50 ms':>13} {'query p99 ms':>13} {'max cos dist':>13}")
+    for name, make in backends.items():
+        embedder = make()
+        embedder.embed_document_batch(batches[0])  # warm up
+
+        started = time.perf_counter()
+        embeddings = np.concatenate([embedder.embed_document_batch(batch).embeddings for batch in batches])
+        docs_per_second = len(documents) / (time.perf_counter() - started)
+
+        latencies = []
+        for _ in range(3):
+            for term in terms:
+                started = time.perf_counter()
+                embedder.model.encode(term)
+                latencies.append(time.perf_counter() - started)
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+
+        if reference is None:
+            reference = embeddings
+        distance = cosine_distances(embeddings, reference).max()
+        print(f"{name:<10} {docs_per_second:>10,.0f} {p50:>13.2f} {p99:>13.2f} {distance:>13.5f}")
+
+
+if __name__ == "__main__":
+    main()
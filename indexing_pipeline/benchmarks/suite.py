@@ -0,0 +1,297 @@
+"""
+Indexing benchmark suite on synthetic corpora.
+
+For every corpus size a synthetic CSV is generated by resampling and
+perturbing the rows of data/YInt_w_label.csv (shifted times, swapped
+locations and accounts, shuffled/dropped/duplicated words, so documents stay
+realistic but distinct). Then these stages run, each in a fresh process so
+its peak RSS is its own:
+
+    loader     DataLoader.load_column_batches over the whole corpus
+    embed:X    embedder X (torch, onnx, onnx-int8) over the first --embed-rows rows
+    indexer    QdrantIndexer.index_embedded_batch with random unit vectors
+    e2e:X      Pipeline.run (concurrent) with embedder X over the first --embed-rows rows
+
+Qdrant runs in the client's in-process local mode, so no server is needed.
+Results (rows/sec, p50/p99 batch latency, peak RSS) are written as JSON;
+pass an earlier results file with --compare to print the change per stage.
+Run from the indexing_pipeline directory:
+
+    uv run python -m benchmarks.suite --sizes 10k,100k --embedders torch
+    uv run python -m benchmarks.suite --sizes 10k --compare benchmarks/results/<earlier>.json
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from src.data_loader import DataLoader
+from src.models.document import DocumentBatch, EmbeddedBatch
+
+COLUMNS = ["time", "location", "account", "message"]
+
+
+def parse_size(text: str) -> int:
+    """Parse sizes like "10k", "1M" or "2500"."""
+    text = text.strip().lower()
+    factor = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text[:-1] if factor > 1 else text) * factor)
+
+
+def make_corpus(source: Path, target: Path, rows: int, seed: int = 0) -> None:
+    """Write `rows` synthetic rows to `target` by resampling and perturbing the rows of `source`."""
+    with open(source, "r", encoding="utf-8", newline="") as f:
+        sample = [{column: row[column] for column in COLUMNS} for row in csv.DictReader(f)]
+    locations = sorted({row["location"] for row in sample})
+    accounts = sorted({row["account"] for row in sample})
+    rng = random.Random(seed)
+
+    with open(target, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        writer.writeheader()
+        for i in range(rows):
+            row = sample[i % len(sample)] if i < len(sample) else perturb(rng.choice(sample), rng, locations, accounts)
+            writer.writerow(row)
+
+
+def perturb(row: Dict[str, str], rng: random.Random, locations: List[str], accounts: List[str]) -> Dict[str, str]:
+    """A realistic variation of a message row."""
+    words = row["message"].split()
+    if len(words) > 3:
+        edit = rng.random()
+        if edit < 0.3:
+            words.pop(rng.randrange(len(words)))
+        elif edit < 0.6:
+            words.insert(rng.randrange(len(words)), rng.choice(words))
+        else:
+            i, j = rng.randrange(len(words)), rng.randrange(len(words))
+            words[i], words[j] = words[j], words[i]
+    try:
+        shifted = datetime.strptime(row["time"], "%Y-%m-%d %H:%M:%S").timestamp() + rng.randint(-86400, 86400)
+        time_ = datetime.fromtimestamp(shifted).strftime("%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        time_ = row["time"]
+    return {
+        "time": time_,
+        "location": rng.choice(locations) if rng.random() < 0.3 else row["location"],
+        "account": rng.choice(accounts) if rng.random() < 0.3 else row["account"],
+        "message": " ".join(words),
+    }
+
+
+def timed(batches: Iterable[Any], step: Callable[[Any], int]) -> Dict[str, float]:
+    """
+    Run `step` on every batch; return rows, seconds and per-batch latency percentiles.
+
+    A batch's latency includes producing it, so lazily loaded batches are timed too.
+    """
+    latencies = []
+    rows = 0
+    started = batch_started = time.perf_counter()
+    for batch in batches:
+        rows += step(batch)
+        now = time.perf_counter()
+        latencies.append(now - batch_started)
+        batch_started = now
+    return summary(rows, time.perf_counter() - started, latencies)
+
+
+def summary(rows: int, seconds: float, latencies: List[float]) -> Dict[str, float]:
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000 if latencies else (0.0, 0.0)
+    return {
+        "rows": rows,
+        "seconds": round(seconds, 4),
+        "rows_per_sec": round(rows / seconds, 1) if seconds else 0.0,
+        "batch_p50_ms": round(float(p50), 3),
+        "batch_p99_ms": round(float(p99), 3),
+    }
+
+
+def make_embedder(name: str, model: str):
+    if name == "torch":
+        from src.embedding.sentence_tranformer_embedder import SentenceTransformerEmbedder
+
+        return SentenceTransformerEmbedder(model_name=model)
+    from src.embedding.onnx_embedder import OnnxEmbedder
+
+    return OnnxEmbedder(model_name=model, quantize=name == "onnx-int8")
+
+
+def first_rows(corpus: Path, rows: int, batch_size: int) -> List[DocumentBatch]:
+    batches = []
+    for batch in DataLoader(corpus).load_column_batches(batch_size=batch_size):
+        batches.append(batch if len(batch) <= rows else batch.select(range(rows)))
+        rows -= len(batches[-1])
+        if rows <= 0:
+            break
+    return batches
+
+
+def run_stage(stage: str, corpus: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one stage (in a fresh process) and return its measurements."""
+    from src.indexing.qdrant_indexer import CollectionConfig, QdrantIndexer
+
+    corpus_path = Path(corpus)
+    batch_size = options["batch_size"]
+
+    if stage == "loader":
+        result = timed(DataLoader(corpus_path).load_column_batches(batch_size=batch_size), len)
+
+    elif stage.startswith("embed:"):
+        embedder = make_embedder(stage.split(":", 1)[1], options["model"])
+        batches = first_rows(corpus_path, options["embed_rows"], batch_size)
+        embedder.embed_document_batch(batches[0])  # warm up
+        result = timed(batches, lambda batch: len(embedder.embed_document_batch(batch)))
+
+    elif stage == "indexer":
+        rng = np.random.default_rng(0)
+        indexer = QdrantIndexer(collection_name="bench", location=":memory:")
+
+        def with_vectors(batch: DocumentBatch) -> EmbeddedBatch:
+            vectors = rng.standard_normal((len(batch), 384), dtype=np.float32)
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+            return EmbeddedBatch(batch, vectors, "random")
+
+        embedded = (with_vectors(batch) for batch in DataLoader(corpus_path).load_column_batches(batch_size))
+        result = timed(embedded, lambda batch: indexer.index_embedded_batch(batch) or len(batch))
+
+    elif stage.startswith("e2e:"):
+        from src.pipeline import Pipeline
+
+        embedder = make_embedder(stage.split(":", 1)[1], options["model"])
+        batches = first_rows(corpus_path, options["embed_rows"], batch_size)
+        vector_size = embedder.embed_document_batch(batches[0]).embeddings.shape[1]  # warm up
+        indexer = QdrantIndexer(
+            collection_name="bench", location=":memory:", collection_config=CollectionConfig(vector_size=vector_size)
+        )
+        loader = _ListLoader(batches)
+
+        # Per-batch latency in a pipelined run: time between consecutive indexed batches
+        completions = []
+        index_embedded_batch = indexer.index_embedded_batch
+
+        def index_and_time(batch: EmbeddedBatch) -> None:
+            index_embedded_batch(batch)
+            completions.append(time.perf_counter())
+
+        indexer.index_embedded_batch = index_and_time
+        started = time.perf_counter()
+        Pipeline(loader, embedder, indexer).run(batch_size=batch_size, concurrent=True)
+        seconds = time.perf_counter() - started
+        latencies = list(np.diff([started] + completions))
+        result = summary(sum(len(batch) for batch in batches), seconds, latencies)
+
+    else:
+        raise ValueError(f"Unknown stage: {stage}")
+
+    # ru_maxrss is in kilobytes on Linux
+    result["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return result
+
+
+class _ListLoader:
+    """DataLoader stand-in that replays pre-loaded batches, so e2e timing excludes CSV parsing twice."""
+
+    def __init__(self, batches: List[DocumentBatch]):
+        self.batches = batches
+
+    def load_column_batches(self, batch_size: int = 0):
+        return iter(self.batches)
+
+
+def compare(results: List[Dict[str, Any]], previous_path: Path) -> None:
+    """Print each stage's throughput and peak RSS relative to an earlier results file."""
+    with open(previous_path, "r", encoding="utf-8") as f:
+        previous = {(r["stage"], r["size"]): r for r in json.load(f)["results"]}
+    print(f"\nCompared with {previous_path}:")
+    for result in results:
+        before = previous.get((result["stage"], result["size"]))
+        if before is None:
+            continue
+        speed = result["rows_per_sec"] / before["rows_per_sec"] - 1 if before["rows_per_sec"] else 0.0
+        memory = result["peak_rss_mb"] / before["peak_rss_mb"] - 1 if before["peak_rss_mb"] else 0.0
+        print(f"{result['stage']:<16} {result['size']:>9}  rows/s {speed:+7.1%}  peak RSS {memory:+7.1%}")
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", default="../data/YInt_w_label.csv", help="CSV to resample")
+    parser.add_argument("--sizes", default="10k,100k", help="comma-separated corpus sizes, e.g. 10k,100k,1M")
+    parser.add_argument("--stages", default="loader,embed,indexer,e2e", help="stages to run")
+    parser.add_argument("--embedders", default="torch", help="comma-separated: torch, onnx, onnx-int8")
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L12-v2")
+    parser.add_argument("--embed-rows", type=int, default=5000, help="rows embedded per size in embed/e2e stages")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--output", default=None, help="results file (default: benchmarks/results/<time>.json)")
+    parser.add_argument("--compare", default=None, help="earlier results file to compare with")
+    args = parser.parse_args()
+
+    embedders = [name for name in args.embedders.split(",") if name]
+    stages = []
+    for stage in args.stages.split(","):
+        stages += [f"{stage}:{name}" for name in embedders] if stage in ("embed", "e2e") else [stage]
+    options = {"batch_size": args.batch_size, "model": args.model}
+
+    results = []
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_text in args.sizes.split(","):
+            size = parse_size(size_text)
+            corpus = Path(tmp) / f"corpus_{size}.csv"
+            make_corpus(Path(args.source), corpus, size)
+            options["embed_rows"] = min(size, args.embed_rows)
+            for stage in stages:
+                with context.Pool(1) as pool:
+                    result = pool.apply(run_stage, (stage, str(corpus), options))
+                result = {"stage": stage, "size": size, **result}
+                results.append(result)
+                print(
+                    f"{stage:<16} {size:>9} rows  {result['rows_per_sec']:>12,.0f} rows/s  "
+                    f"p50 {result['batch_p50_ms']:>9.2f} ms  p99 {result['batch_p99_ms']:>9.2f} ms  "
+                    f"peak RSS {result['peak_rss_mb']:>8.1f} MB"
+                )
+            corpus.unlink()
+
+    output = Path(args.output or f"benchmarks/results/{datetime.now():%Y%m%d-%H%M%S}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "created": datetime.now(timezone.utc).isoformat(),
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "cpus": os.cpu_count(),
+                "options": {**vars(args)},
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+    print(f"Results written to {output}")
+    if args.compare:
+        compare(results, Path(args.compare))
+
+
+if __name__ == "__main__":
+    main()
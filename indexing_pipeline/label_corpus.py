@@ -0,0 +1,115 @@
+"""
+Label every message already in the Qdrant collection with its closest category term.
+
+Reads the stored vectors page by page (no re-encoding, no search service),
+scores them against the embedded terms of data/categories.json with
+CategoryLabeler, writes the labels back into the points' payloads and saves
+data/YInt_w_label.csv. Run from the indexing_pipeline directory:
+
+    uv run python label_corpus.py
+"""
+import csv
+import logging
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import SetPayload, SetPayloadOperation
+
+from src.embedding.sentence_tranformer_embedder import SentenceTransformerEmbedder
+from src.labeling import CategoryLabeler, load_categories
+
+CSV_COLUMNS = ["time", "location", "account", "message", "label", "best_score", "main_category"]
+
+logger = logging.getLogger(__name__)
+
+
+def label_collection(
+    client: QdrantClient,
+    collection_name: str,
+    labeler: CategoryLabeler,
+    page_size: int = 1024,
+    update_payload: bool = True,
+) -> List[Dict[str, Any]]:
+    """
+    Label all points of a collection.
+
+    Args:
+        client: Qdrant client.
+        collection_name: Collection to label.
+        labeler: Labeler built with the collection's embedding model.
+        page_size: Points read (and updated) per request.
+        update_payload: Write the label columns into the points' payloads.
+
+    Returns:
+        One row per point: its payload including the label columns.
+    """
+    rows = []
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            limit=page_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        if points:
+            columns = labeler.label(np.array([point.vector for point in points], dtype=np.float32))
+            labels = [dict(zip(columns, values)) for values in zip(*columns.values())]
+            if update_payload:
+                client.batch_update_points(
+                    collection_name=collection_name,
+                    update_operations=[
+                        SetPayloadOperation(set_payload=SetPayload(payload=label, points=[point.id]))
+                        for point, label in zip(points, labels)
+                    ],
+                )
+            rows.extend({**point.payload, **label} for point, label in zip(points, labels))
+        if offset is None:
+            return rows
+
+
+def write_labeled_csv(path: str, rows: List[Dict[str, Any]], top_k: int = 1) -> None:
+    """Write labeled rows in the YInt_w_label.csv layout (plus top_labels if top_k > 1)."""
+    columns = CSV_COLUMNS + (["top_labels"] if top_k > 1 else [])
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        for row in rows:
+            row = {**row, "best_score": f"{row['best_score']:.8g}"}
+            if top_k > 1:
+                row["top_labels"] = "|".join(row["top_labels"])
+            writer.writerow(row)
+
+
+def main():
+    # Configuration
+    qdrant_host = "localhost"
+    qdrant_port = 6333
+    collection_name = "earthquake_messages"
+    embedding_model = "sentence-transformers/all-MiniLM-L12-v2"  # the model the collection was indexed with
+    categories_path = "../data/categories.json"
+    output_path = "../data/YInt_w_label.csv"
+    top_k = 1  # >1 also stores the k best terms as top_labels / top_scores
+    min_score = None  # messages scoring below this on every term stay unlabeled
+    update_payload = True  # write labels into the Qdrant payloads as well
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    labeler = CategoryLabeler(
+        load_categories(categories_path),
+        SentenceTransformerEmbedder(model_name=embedding_model),
+        top_k=top_k,
+        min_score=min_score,
+    )
+    client = QdrantClient(host=qdrant_host, port=qdrant_port)
+
+    started = time.perf_counter()
+    rows = label_collection(client, collection_name, labeler, update_payload=update_payload)
+    write_labeled_csv(output_path, rows, top_k=top_k)
+    logger.info("Labeled %d messages in %.1f s, saved to %s", len(rows), time.perf_counter() - started, output_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,17 @@
+import logging
+from contextlib import nullcontext
+
+from src.checkpoint import Checkpoint
+from src.embedding.cached_embedder import CachedEmbedder
+from src.embedding.onnx_embedder import OnnxEmbedder, check_cosine_tolerance
+from src.embedding.process_pool_embedder import ProcessPoolEmbedder
 from src.embedding.sentence_tranformer_embedder import SentenceTransformerEmbedder
-from src.indexing.qdrant_indexer import QdrantIndexer
+from src.indexing.qdrant_indexer import CollectionConfig, QdrantIndexer
 from src.data_loader import DataLoader
+from src.dedup import NearDuplicateDetector
+from src.follower import FeedFollower
+from src.labeling import CategoryLabeler, load_categories
+from src.metrics import PipelineMetrics
 from src.pipeline import Pipeline
 
 
@@ -11,23 +22,126 @@ def main():
     qdrant_port = 6333
     collection_name = "earthquake_messages"
     embedding_model = "sentence-transformers/all-MiniLM-L12-v2"
-    batch_size = 32
+    embedding_backend = "torch"  # "torch", "onnx" or "onnx-int8" (ONNX Runtime, dynamic int8 quantization)
+    backend_tolerance = 0.02  # max cosine distance of ONNX vectors from PyTorch ones, checked at startup; None skips
+    batch_size = 256  # documents per pipeline batch; large batches let length buckets form
+    max_seq_length = 128  # tokens; YInt messages are ~20 tokens at the median, ~70 at p99
+    token_budget = 4096  # padded tokens per forward pass (length-bucketed batching); None encodes in load order
+    embed_processes = 1  # >1: shard each batch across this many worker processes, each with its own model
+    concurrent = True  # overlap loading, embedding and indexing
+    queue_size = 4  # batches buffered between stages
+    embedding_cache_dir = ".cache/embeddings"  # set to None to disable the cache
+    embedding_cache_max_bytes = 1 << 30
+    checkpoint_path = ".cache/checkpoint.json"  # set to None to always start from the first row
+    skip_existing = True  # don't re-embed documents already in the collection
+    near_duplicate_threshold = None  # e.g. 0.95: reuse the vector of an earlier near-identical message; None disables
+    categories_path = "../data/categories.json"  # label messages with their closest category term; None disables
+    label_top_k = 1  # >1 also stores the k best terms as top_labels / top_scores
+    follow = False  # keep watching data_path (a file or a directory of CSV/NDJSON drops) for new rows
+    max_latency = 2.0  # seconds a followed row may wait before its micro-batch is indexed
+    bulk_load = False  # initial load: unacknowledged parallel uploads, HNSW indexing paused until the end
+    index_workers = 4  # concurrent uploads in bulk-load mode
+    prefer_grpc = False  # talk to Qdrant over gRPC (port 6334)
+    # Collection storage, applied when the collection is created
+    quantization = None  # None, "scalar" (int8) or "binary"; searches rescore with the original vectors
+    vectors_on_disk = False  # memory-map original vectors instead of holding them in RAM
+    payload_on_disk = False
+    hnsw_m = None  # None keeps Qdrant's default (16)
+    hnsw_ef_construct = None  # None keeps Qdrant's default (100)
+    # Progress and metrics
+    metrics_interval = 10.0  # seconds between per-stage progress summaries in the log
+    metrics_path = ".cache/metrics.prom"  # Prometheus text file rewritten on every summary; None disables
+    profile_dir = None  # e.g. ".cache/profiles": run every stage under cProfile, one <stage>.prof per stage
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
 
     # Initialize components
     data_loader = DataLoader(data_path)
-    embedder = SentenceTransformerEmbedder(model_name=embedding_model, batch_size=batch_size)
-    indexer = QdrantIndexer(host=qdrant_host, port=qdrant_port, collection_name=collection_name)
+    embedder_kwargs = dict(
+        model_name=embedding_model,
+        batch_size=batch_size,
+        max_seq_length=max_seq_length,
+        token_budget=token_budget,
+    )
+    if embedding_backend == "torch":
+        embedder_class = SentenceTransformerEmbedder
+    else:
+        embedder_class = OnnxEmbedder
+        embedder_kwargs["quantize"] = embedding_backend == "onnx-int8"
+    if embed_processes > 1:
+        embedder = ProcessPoolEmbedder(embedder_class, embedder_kwargs, workers=embed_processes)
+    else:
+        embedder = embedder_class(**embedder_kwargs)
+    if embedding_backend != "torch" and backend_tolerance is not None:
+        sample = next(data_loader.load_column_batches(batch_size=64)).message
+        reference = SentenceTransformerEmbedder(model_name=embedding_model, batch_size=batch_size)
+        distance = check_cosine_tolerance(embedder, reference, sample, tolerance=backend_tolerance)
+        print(f"{embedding_backend} embeddings within cosine distance {distance:.4f} of PyTorch")
+        del reference
+    if embedding_cache_dir:
+        embedder = CachedEmbedder(embedder, embedding_cache_dir, max_bytes=embedding_cache_max_bytes)
+    collection_config = CollectionConfig(
+        quantization=quantization,
+        on_disk=vectors_on_disk,
+        on_disk_payload=payload_on_disk,
+        hnsw_m=hnsw_m,
+        hnsw_ef_construct=hnsw_ef_construct,
+    )
+    indexer = QdrantIndexer(
+        host=qdrant_host,
+        port=qdrant_port,
+        collection_name=collection_name,
+        prefer_grpc=prefer_grpc,
+        collection_config=collection_config,
+    )
+
+    # Points indexed before the numeric timestamp field existed get it now (no-op otherwise)
+    backfilled = indexer.backfill_timestamps()
+    if backfilled:
+        print(f"Added timestamps to {backfilled} existing points")
+
+    checkpoint = None
+    if checkpoint_path:
+        checkpoint = Checkpoint(checkpoint_path, source=f"{data_path}|{qdrant_host}:{qdrant_port}/{collection_name}")
 
     # Create and run pipeline
     pipeline = Pipeline(
         data_loader=data_loader,
         embedder=embedder,
         indexer=indexer,
+        checkpoint=checkpoint,
+        deduplicator=NearDuplicateDetector(threshold=near_duplicate_threshold) if near_duplicate_threshold else None,
+        labeler=CategoryLabeler(load_categories(categories_path), embedder, top_k=label_top_k) if categories_path else None,
+        metrics=PipelineMetrics(
+            report_interval=metrics_interval,
+            prometheus_path=metrics_path,
+            profile_dir=profile_dir,
+        ),
     )
 
     try:
-        pipeline.run(batch_size=batch_size)
-        print(f"Successfully processed CSV messages and saved to Qdrant collection '{collection_name}'")
+        # Leaving the block releases the embedder (worker processes, cache files), also on errors
+        with embedder:
+            if follow:
+                follower = FeedFollower(data_path, batch_size=batch_size, max_latency=max_latency)
+                try:
+                    pipeline.follow(follower, skip_existing=skip_existing)
+                except KeyboardInterrupt:
+                    pass
+                return
+            # Bulk uploads are not acknowledged by Qdrant: save the checkpoint only after the final barrier
+            held = checkpoint.hold() if bulk_load and checkpoint is not None else nullcontext()
+            with held, indexer.bulk_load() if bulk_load else nullcontext():
+                pipeline.run(
+                    batch_size=batch_size,
+                    concurrent=concurrent or bulk_load,
+                    queue_size=queue_size,
+                    index_workers=index_workers if bulk_load else 1,
+                    skip_existing=skip_existing,
+                )
+            print(f"Successfully processed CSV messages and saved to Qdrant collection '{collection_name}'")
+            if isinstance(embedder, CachedEmbedder):
+                print(f"Embedding cache: {embedder.hits} hits, {embedder.misses} misses")
     except Exception as e:
         print(f"Error during pipeline execution: {e}")
         raise
@@ -0,0 +1,76 @@
+"""
+Export a Qdrant collection with its vectors to Parquet/Arrow files, or restore one.
+
+    uv run --extra fast python snapshot_collection.py export earthquake_messages snapshots/earthquake --shards 8 --workers 8
+    uv run --extra fast python snapshot_collection.py import snapshots/earthquake earthquake_messages_restored --workers 4
+
+Export follows scroll pagination to the end (optionally in parallel ID-range
+shards); import creates the collection with the snapshot's vector size and
+distance and bulk-loads the points with their original IDs.
+"""
+import argparse
+import logging
+import time
+
+from qdrant_client.models import Distance
+
+from src.indexing.qdrant_indexer import CollectionConfig, QdrantIndexer, connect
+from src.snapshot import export_collection, import_snapshot, snapshot_metadata
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6333)
+    parser.add_argument("--location", default=None, help="URL or local path instead of host/port")
+    parser.add_argument("--grpc", action="store_true", help="talk to Qdrant over gRPC")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="write a collection to snapshot files")
+    export.add_argument("collection")
+    export.add_argument("directory")
+    export.add_argument("--shards", type=int, default=1, help="ID ranges exported independently")
+    export.add_argument("--workers", type=int, default=1, help="threads exporting shards")
+    export.add_argument("--page-size", type=int, default=1024)
+    export.add_argument("--format", choices=["parquet", "arrow"], default="parquet")
+
+    restore = commands.add_parser("import", help="bulk-load snapshot files into a new collection")
+    restore.add_argument("directory")
+    restore.add_argument("collection")
+    restore.add_argument("--workers", type=int, default=4, help="concurrent uploads")
+    restore.add_argument("--batch-size", type=int, default=1024)
+    restore.add_argument("--quantization", choices=["scalar", "binary"], default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    started = time.perf_counter()
+
+    if args.command == "export":
+        client = connect(args.host, args.port, args.location, args.grpc)
+        rows = export_collection(
+            client, args.collection, args.directory,
+            shards=args.shards, workers=args.workers, page_size=args.page_size, format=args.format,
+        )
+        logger.info("Exported %d points to %s in %.1f s", rows, args.directory, time.perf_counter() - started)
+        return
+
+    metadata = snapshot_metadata(args.directory)
+    config = CollectionConfig(
+        vector_size=int(metadata["vector_size"]),
+        distance=Distance(metadata["distance"]),
+        quantization=args.quantization,
+    )
+    indexer = QdrantIndexer(
+        host=args.host, port=args.port, collection_name=args.collection,
+        location=args.location, prefer_grpc=args.grpc, collection_config=config,
+    )
+    if indexer.client.count(args.collection).count:
+        raise SystemExit(f"Collection {args.collection!r} already holds points; import into a new collection")
+    rows = import_snapshot(args.directory, indexer, batch_size=args.batch_size, workers=args.workers)
+    logger.info("Imported %d points into %s in %.1f s", rows, args.collection, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    main()
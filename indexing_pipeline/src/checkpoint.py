@@ -0,0 +1,127 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Union
+
+
+class Checkpoint:
+    """
+    Persists how far into the corpus file the pipeline has indexed.
+
+    The checkpoint records the byte offset just after the last row whose batch,
+    and every batch before it, has been acknowledged by the indexer. Batches may
+    be acknowledged out of order (concurrent mode); the saved offset only moves
+    forward over a contiguous run of acknowledged batches. When following a feed
+    of several files it also records which file the offset refers to.
+    """
+
+    def __init__(self, path: Union[str, Path], source: str):
+        """
+        Initialize the checkpoint.
+
+        Args:
+            path: JSON file the checkpoint is stored in.
+            source: Identifies what is being indexed (e.g. corpus path and
+                    collection name). A stored checkpoint for a different
+                    source is ignored.
+        """
+        self.path = Path(path)
+        self.source = source
+        self.offset = 0
+        self.rows = 0
+        self.file: Optional[str] = None
+        self._lock = threading.Lock()
+        self._next_seq = 0
+        self._pending: Dict[int, tuple] = {}
+        self._held = False
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("source") == self.source:
+            self.offset = int(state.get("offset", 0))
+            self.rows = int(state.get("rows", 0))
+            self.file = state.get("file")
+
+    def start(self, file_size: Optional[int] = None) -> int:
+        """
+        Begin a run and return the byte offset to resume from.
+
+        Args:
+            file_size: Current size of the corpus file. If it is smaller than the
+                       saved offset the file was replaced, and the run starts over.
+        """
+        with self._lock:
+            if file_size is not None and file_size < self.offset:
+                self.offset = 0
+                self.rows = 0
+                self.file = None
+            self._next_seq = 0
+            self._pending = {}
+            return self.offset
+
+    def ack(self, seq: int, end_offset: int, rows: int, file: Optional[str] = None) -> None:
+        """
+        Record that batch number `seq` of the current run has been indexed.
+
+        Args:
+            seq: Zero-based position of the batch in the current run.
+            end_offset: Byte offset just after the batch's last row.
+            rows: Number of rows in the batch.
+            file: File the offset refers to, if the source spans several files.
+        """
+        with self._lock:
+            self._pending[seq] = (end_offset, rows, file)
+            advanced = False
+            while self._next_seq in self._pending:
+                end_offset, rows, file = self._pending.pop(self._next_seq)
+                self.offset = end_offset
+                self.file = file
+                self.rows += rows
+                self._next_seq += 1
+                advanced = True
+            if advanced and not self._held:
+                self._save()
+
+    @contextmanager
+    def hold(self) -> Iterator["Checkpoint"]:
+        """
+        Keep acknowledged progress in memory and save it only if the block succeeds.
+
+        For indexers whose acknowledged writes are not yet applied, such as
+        QdrantIndexer.bulk_load (wait=False upserts): entered outside that
+        block, the offset is saved after its final barrier, so a crash never
+        leaves a checkpoint past rows Qdrant did not apply.
+        """
+        with self._lock:
+            self._held = True
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._held = False
+        with self._lock:
+            self._save()
+
+    def reset(self) -> None:
+        """Forget all progress so the next run starts from the beginning."""
+        with self._lock:
+            self.offset = 0
+            self.rows = 0
+            self.file = None
+            self._save()
+
+    def _save(self) -> None:
+        """Atomically write the checkpoint file."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"source": self.source, "file": self.file, "offset": self.offset, "rows": self.rows}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
@@ -1,9 +1,23 @@
 import json
 import csv
+import io
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Generator, List, Optional, Union
+from typing import Any, BinaryIO, Dict, Generator, Iterator, List, Optional, Tuple, Union
 
-from src.models.document import Document
+import numpy as np
+
+from src.models.document import Document, DocumentBatch
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:  # pyarrow is optional; the columnar loader falls back to the csv module
+    pa = None
+
+# Columns read into a DocumentBatch
+COLUMNS = ("time", "location", "account", "message")
 
 
 class DataLoader:
@@ -20,7 +34,7 @@ class DataLoader:
         self.corpus_path = Path(corpus_path) if corpus_path else None
 
     def load_messages_from_csv(
-        self, batch_size: Optional[int] = None, limit: Optional[int] = None
+        self, batch_size: Optional[int] = None, limit: Optional[int] = None, start_offset: int = 0
     ) -> Generator[List[Document], None, None]:
         """
         Load documents from a CSV file, using the 'message' column as text content.
@@ -29,55 +43,290 @@ class DataLoader:
             batch_size: Number of documents to yield in each batch.
                         If None, returns all documents in one batch.
             limit: Maximum number of documents to load. If None, loads all documents.
+            start_offset: Byte offset of the first row to read, as returned by
+                          load_batches_with_offsets. 0 reads from the first row.
 
         Yields:
             Batches of Document objects.
         """
+        for batch, _ in self.load_batches_with_offsets(batch_size, limit, start_offset):
+            yield batch
+
+    def load_batches_with_offsets(
+        self, batch_size: Optional[int] = None, limit: Optional[int] = None, start_offset: int = 0
+    ) -> Generator[Tuple[List[Document], int], None, None]:
+        """
+        Load documents from a CSV file together with the byte offset reached.
+
+        The offset yielded with each batch is the position just after the batch's
+        last row, so passing it back as `start_offset` resumes with the next row.
+
+        Args:
+            batch_size: Number of documents to yield in each batch.
+                        If None, returns all documents in one batch.
+            limit: Maximum number of documents to load. If None, loads all documents.
+            start_offset: Byte offset of the first row to read. 0 reads from the first row.
+
+        Yields:
+            Tuples of (batch of Document objects, end byte offset of the batch).
+        """
         if not self.corpus_path or not self.corpus_path.exists():
             raise FileNotFoundError(f"Corpus file not found at {self.corpus_path}")
 
         batch = []
         count = 0
 
-        with open(self.corpus_path, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            
-            for row in reader:
+        with open(self.corpus_path, "rb") as f:
+            lines = _OffsetLines(f)
+            reader = csv.reader(lines)
+            fieldnames = next(reader, None)
+            if fieldnames is None:
+                return
+            if start_offset > lines.offset:
+                f.seek(start_offset)
+                lines.offset = start_offset
+
+            for values in reader:
                 if limit is not None and count >= limit:
                     break
-
-                # Create a unique ID using row index
-                doc_id = f"msg_{count:06d}"
-                
-                # Use message column as the main text content
-                message_text = row.get("message", "")
-                
-                # Create Document object with CSV data (only 4 columns: time, location, account, message)
-                document = Document(
-                    time=row.get("time"),
-                    location=row.get("location"),
-                    account=row.get("account"),
-                    message=row.get("message"),
-                )
-
-                batch.append(document)
+                if not values:  # skip blank lines like csv.DictReader
+                    continue
+                batch.append(document_from_row(dict(zip(fieldnames, values))))
                 count += 1
 
                 if batch_size and len(batch) >= batch_size:
-                    yield batch
+                    yield batch, lines.offset
                     batch = []
 
             if batch:  # Yield remaining items
-                yield batch
+                yield batch, lines.offset
+
+    def load_column_batches(
+        self,
+        batch_size: int = 65536,
+        workers: int = 1,
+        chunk_bytes: int = 16 << 20,
+    ) -> Generator[DocumentBatch, None, None]:
+        """
+        Load the CSV file as column batches, optionally parsing on several cores.
+
+        The file is cut into chunks of about `chunk_bytes` at row boundaries
+        (quoted multi-line messages are never split). Each chunk is parsed in
+        one go, with pyarrow if it is installed and the csv module otherwise,
+        and no per-row dicts or Document objects are created.
+
+        Args:
+            batch_size: Number of rows per yielded batch.
+            workers: Number of processes parsing chunks in parallel. 1 parses
+                     in the calling process.
+            chunk_bytes: Approximate size of the byte range parsed per task.
+
+        Yields:
+            DocumentBatch objects in file order.
+        """
+        for batch, _ in self.load_column_batches_with_offsets(batch_size, workers, chunk_bytes):
+            yield batch
+
+    def load_column_batches_with_offsets(
+        self,
+        batch_size: int = 65536,
+        workers: int = 1,
+        chunk_bytes: int = 16 << 20,
+        start_offset: int = 0,
+    ) -> Generator[Tuple[DocumentBatch, int], None, None]:
+        """
+        Load the CSV file as column batches together with the byte offset reached.
+
+        Like load_column_batches; the offset yielded with each batch is the
+        position just after the batch's last row, as in load_batches_with_offsets,
+        so passing it back as `start_offset` resumes with the next row.
+
+        Args:
+            batch_size: Number of rows per yielded batch.
+            workers: Number of processes parsing chunks in parallel.
+            chunk_bytes: Approximate size of the byte range parsed per task.
+            start_offset: Byte offset of the first row to read. 0 reads from the first row.
 
-    def load_in_batches(self, batch_size: int = 32) -> Generator[List[Document], None, None]:
+        Yields:
+            Tuples of (DocumentBatch, end byte offset of the batch) in file order.
+        """
+        if not self.corpus_path or not self.corpus_path.exists():
+            raise FileNotFoundError(f"Corpus file not found at {self.corpus_path}")
+
+        with open(self.corpus_path, "rb") as f:
+            header = f.readline()
+        if not header:
+            return
+        fieldnames = next(csv.reader([header.decode("utf-8")]))
+        ranges = _split_ranges(self.corpus_path, max(len(header), start_offset), chunk_bytes)
+        path = str(self.corpus_path)
+
+        if workers <= 1:
+            chunks = (_parse_range(path, start, end, fieldnames) for start, end in ranges)
+            yield from _rebatch(chunks, batch_size)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            def parse_in_workers() -> Iterator[Tuple[DocumentBatch, np.ndarray]]:
+                # Keep a bounded number of chunks in flight so memory stays flat
+                in_flight: deque = deque()
+                for start, end in ranges:
+                    in_flight.append(executor.submit(_parse_range, path, start, end, fieldnames))
+                    if len(in_flight) >= 2 * workers:
+                        yield in_flight.popleft().result()
+                while in_flight:
+                    yield in_flight.popleft().result()
+
+            yield from _rebatch(parse_in_workers(), batch_size)
+
+    def load_in_batches(self, batch_size: int = 32, start_offset: int = 0) -> Generator[List[Document], None, None]:
         """
         Load documents in batches. This is a wrapper around load_messages_from_csv.
         
         Args:
             batch_size: Number of documents to yield in each batch.
+            start_offset: Byte offset of the first row to read.
             
         Yields:
             Batches of Document objects.
         """
-        yield from self.load_messages_from_csv(batch_size=batch_size)
+        yield from self.load_messages_from_csv(batch_size=batch_size, start_offset=start_offset)
+
+
+def document_from_row(row: Dict[str, Any]) -> Document:
+    """Create a Document from a CSV row or JSON record; missing columns become None."""
+    # Only 4 columns are used: time, location, account, message
+    return Document(
+        time=row.get("time"),
+        location=row.get("location"),
+        account=row.get("account"),
+        message=row.get("message"),
+    )
+
+
+class _OffsetLines:
+    """Iterates over the decoded lines of a binary file, tracking the byte offset reached."""
+
+    def __init__(self, f: BinaryIO):
+        self._f = f
+        self.offset = f.tell()
+
+    def __iter__(self) -> Iterator[str]:
+        return self
+
+    def __next__(self) -> str:
+        line = self._f.readline()
+        if not line:
+            raise StopIteration
+        self.offset += len(line)
+        return line.decode("utf-8")
+
+
+def _split_ranges(path: Path, start: int, chunk_bytes: int) -> List[Tuple[int, int]]:
+    """
+    Cut the file from `start` to its end into byte ranges of about `chunk_bytes`.
+
+    Every range ends at a newline that is outside any quoted field, which is
+    tracked by counting quote characters from `start` onwards.
+    """
+    size = path.stat().st_size
+    bounds = [start]
+    quotes = 0
+    with open(path, "rb") as f:
+        f.seek(start)
+        position = start
+        while bounds[-1] + chunk_bytes < size:
+            block = f.read(bounds[-1] + chunk_bytes - position)
+            quotes += block.count(b'"')
+            position += len(block)
+            # Move forward to the end of the record the cut point falls into
+            while True:
+                line = f.readline()
+                if not line:
+                    break
+                quotes += line.count(b'"')
+                position += len(line)
+                if quotes % 2 == 0:
+                    break
+            if position >= size:
+                break
+            bounds.append(position)
+    bounds.append(size)
+    return [(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+def _parse_range(path: str, start: int, end: int, fieldnames: List[str]) -> Tuple[DocumentBatch, np.ndarray]:
+    """Parse the rows in a byte range of the CSV file into one DocumentBatch and each row's end offset."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    if pa is not None:
+        present = [name for name in COLUMNS if name in fieldnames]
+        table = pa_csv.read_csv(
+            io.BytesIO(data),
+            read_options=pa_csv.ReadOptions(column_names=fieldnames),
+            parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+            convert_options=pa_csv.ConvertOptions(
+                column_types={name: pa.string() for name in fieldnames},
+                include_columns=present,
+                strings_can_be_null=False,
+                quoted_strings_can_be_null=False,
+            ),
+        )
+        columns = {name: table.column(name).to_pylist() for name in present}
+        rows = table.num_rows
+    else:
+        records = [row for row in csv.reader(io.StringIO(data.decode("utf-8"), newline="")) if row]
+        columns = {}
+        for name in COLUMNS:
+            if name in fieldnames:
+                index = fieldnames.index(name)
+                columns[name] = [row[index] if index < len(row) else None for row in records]
+        rows = len(records)
+
+    row_ends = start + _row_ends(data)
+    if len(row_ends) != rows:
+        raise ValueError(f"Parsed {rows} rows but found {len(row_ends)} records in bytes {start}-{end} of {path}")
+    return DocumentBatch(**{name: columns.get(name, [None] * rows) for name in COLUMNS}), row_ends
+
+
+def _row_ends(data: bytes) -> np.ndarray:
+    """
+    Offset just after each non-blank CSV record in `data`.
+
+    A record ends at a newline preceded by an even number of quote
+    characters; blank lines are skipped, as both parsers do.
+    """
+    if not data:
+        return np.empty(0, dtype=np.int64)
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    newlines = np.flatnonzero(buffer == ord("\n"))
+    quotes = np.flatnonzero(buffer == ord('"'))
+    ends = newlines[np.searchsorted(quotes, newlines) % 2 == 0] + 1
+    if not len(ends) or ends[-1] != len(data):  # last record without a trailing newline
+        ends = np.append(ends, len(data))
+    starts = np.concatenate(([0], ends[:-1]))
+    lengths = ends - starts
+    blank = (lengths <= 1) | ((lengths == 2) & (buffer[np.minimum(starts, len(data) - 1)] == ord("\r")))
+    return ends[~blank]
+
+
+def _rebatch(chunks: Iterator[Tuple[DocumentBatch, np.ndarray]], batch_size: int) -> Iterator[Tuple[DocumentBatch, int]]:
+    """Re-slice parsed chunks of arbitrary length into batches of `batch_size` rows, with their end offsets."""
+    pending = {name: [] for name in COLUMNS}
+    pending_ends: List[int] = []
+    for chunk, row_ends in chunks:
+        for name in COLUMNS:
+            pending[name].extend(getattr(chunk, name))
+        pending_ends.extend(row_ends.tolist())
+        start = 0
+        while len(pending["message"]) - start >= batch_size:
+            batch = DocumentBatch(**{name: values[start:start + batch_size] for name, values in pending.items()})
+            yield batch, pending_ends[start + batch_size - 1]
+            start += batch_size
+        if start:
+            pending = {name: values[start:] for name, values in pending.items()}
+            pending_ends = pending_ends[start:]
+    if pending["message"]:
+        yield DocumentBatch(**pending), pending_ends[-1]
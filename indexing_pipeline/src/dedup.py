@@ -0,0 +1,229 @@
+import re
+import threading
+import unicodedata
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.models.document import DocumentBatch, EmbeddedBatch, document_ids
+
+# Repost / forward prefixes stripped before comparing messages ("re: re: ...")
+_REPOST_PREFIX = re.compile(r"^(\s*(re|rt|fwd?)\s*:\s*)+")
+_URL = re.compile(r"https?://\S+")
+_NON_WORD = re.compile(r"[\W_]+")
+
+# Mersenne prime 2^31 - 1: (a * x + b) with a, b, x below it fits in 64 bits
+_PRIME = (1 << 31) - 1
+
+
+def normalize_for_dedup(text: Optional[str]) -> str:
+    """Lowercase a message and drop repost prefixes, URLs and punctuation."""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = _URL.sub(" ", _REPOST_PREFIX.sub("", text))
+    return _NON_WORD.sub(" ", text).strip()
+
+
+@dataclass
+class DedupPlan:
+    """Which rows of a batch must be encoded and where the others get their vectors."""
+    documents: DocumentBatch
+    # Duplicate group (the representative's point ID) of every row
+    group_ids: List[int]
+    # Rows to encode, in order
+    embed_rows: List[int] = field(default_factory=list)
+    # Rows reusing a representative's vector from an earlier batch
+    reused: Dict[int, np.ndarray] = field(default_factory=dict)
+    # Rows reusing the vector of a representative row in this batch
+    same_batch: Dict[int, int] = field(default_factory=dict)
+    # Groups first seen in this batch -> their representative row
+    new_groups: Dict[int, int] = field(default_factory=dict)
+
+
+@dataclass
+class _Group:
+    signature: np.ndarray
+    vector: Optional[np.ndarray] = None
+
+
+class NearDuplicateDetector:
+    """
+    Streaming near-duplicate detection with MinHash and LSH banding.
+
+    Messages are normalized (see `normalize_for_dedup`) and split into
+    character shingles; their MinHash signatures estimate the Jaccard
+    similarity of the shingle sets. Signatures are cut into `bands` bands and
+    a message becomes a candidate duplicate of every earlier group sharing a
+    band; the first candidate whose estimated similarity reaches `threshold`
+    is its group. Messages without a match start a new group and act as its
+    representative: only representatives are encoded, duplicates reuse the
+    representative's vector.
+
+    Groups persist across batches, oldest evicted beyond `max_groups`. Each
+    group holds its signature (4 bytes per permutation) and its vector.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        num_perm: int = 128,
+        bands: int = 16,
+        shingle_size: int = 5,
+        max_groups: int = 1_000_000,
+        seed: int = 0,
+    ):
+        """
+        Initialize the detector.
+
+        Args:
+            threshold: Minimum estimated Jaccard similarity of two messages'
+                       shingle sets to count as near-duplicates. Below ~0.9,
+                       templated posts differing only in a name ("The X Bridge
+                       is closed ...") start to merge.
+            num_perm: MinHash permutations (signature length).
+            bands: LSH bands; `num_perm` must be divisible by it. More bands
+                   find more candidates below the threshold (checked, then dropped).
+            shingle_size: Characters per shingle.
+            max_groups: Groups kept for matching; the oldest are evicted beyond it.
+            seed: Seed of the hash permutations.
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+        self.max_groups = max_groups
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+        self._groups: "OrderedDict[int, _Group]" = OrderedDict()
+        self._tables: List[Dict[bytes, int]] = [{} for _ in range(bands)]
+        self._lock = threading.Lock()
+        self._embedding_model = ""
+        self.rows = 0
+        self.encoded = 0
+
+    @property
+    def saved_fraction(self) -> float:
+        """Share of rows whose encoding was skipped because they reused a vector."""
+        return 1.0 - self.encoded / self.rows if self.rows else 0.0
+
+    def signatures(self, texts: Sequence[Optional[str]]) -> np.ndarray:
+        """MinHash signatures of `texts` as a (len(texts) x num_perm) uint32 matrix."""
+        signatures = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        k = self.shingle_size
+        for row, text in enumerate(texts):
+            padded = f" {normalize_for_dedup(text)} "
+            shingles = {padded[i:i + k] for i in range(max(1, len(padded) - k + 1))}
+            hashes = np.fromiter(
+                (zlib.crc32(shingle.encode("utf-8")) % _PRIME for shingle in shingles),
+                dtype=np.uint64,
+                count=len(shingles),
+            )
+            signatures[row] = ((np.outer(self._a, hashes) + self._b[:, None]) % _PRIME).min(axis=1)
+        return signatures
+
+    def plan(self, batch: DocumentBatch) -> DedupPlan:
+        """
+        Assign every row of a batch to a duplicate group.
+
+        A row whose group's vector is known reuses it; a row whose group is
+        still being encoded elsewhere (another embed worker) is encoded itself.
+
+        Args:
+            batch: Documents about to be embedded.
+
+        Returns:
+            The plan; encode `batch.select(plan.embed_rows)` and pass the result to `complete`.
+        """
+        signatures = self.signatures(batch.message)
+        ids = document_ids(batch)
+        plan = DedupPlan(documents=batch, group_ids=[])
+        with self._lock:
+            for row, (signature, doc_id) in enumerate(zip(signatures, ids)):
+                group_id = self._find(signature)
+                if group_id is None:
+                    group_id = doc_id
+                    self._add(group_id, signature)
+                    plan.new_groups[group_id] = row
+                    plan.embed_rows.append(row)
+                elif self._groups[group_id].vector is not None:
+                    plan.reused[row] = self._groups[group_id].vector
+                elif group_id in plan.new_groups:
+                    plan.same_batch[row] = plan.new_groups[group_id]
+                else:
+                    plan.embed_rows.append(row)
+                plan.group_ids.append(group_id)
+        return plan
+
+    def complete(self, plan: DedupPlan, encoded: Optional[EmbeddedBatch]) -> EmbeddedBatch:
+        """
+        Assemble the batch's embeddings from the encoded rows and reused vectors.
+
+        Args:
+            plan: Plan returned by `plan`.
+            encoded: Embeddings of `plan.embed_rows`, or None if no row needed encoding.
+
+        Returns:
+            The embedded batch with a `duplicate_group` payload column.
+        """
+        rows = len(plan.documents)
+        if not rows:
+            return EmbeddedBatch(plan.documents, np.empty((0, 0), dtype=np.float32), self._embedding_model)
+        if encoded is not None:
+            dim, embedding_model = encoded.embeddings.shape[1], encoded.embedding_model
+        else:
+            reused = next(iter(plan.reused.values()))
+            dim, embedding_model = len(reused), self._embedding_model
+        embeddings = np.empty((rows, dim), dtype=np.float32)
+        if encoded is not None:
+            embeddings[plan.embed_rows] = encoded.embeddings
+        for row, vector in plan.reused.items():
+            embeddings[row] = vector
+        for row, source in plan.same_batch.items():
+            embeddings[row] = embeddings[source]
+
+        with self._lock:
+            for group_id, row in plan.new_groups.items():
+                group = self._groups.get(group_id)
+                if group is not None:
+                    group.vector = embeddings[row].copy()
+            self._embedding_model = embedding_model
+            self.rows += rows
+            self.encoded += len(plan.embed_rows)
+
+        return EmbeddedBatch(
+            documents=plan.documents,
+            embeddings=embeddings,
+            embedding_model=embedding_model,
+            payload={"duplicate_group": plan.group_ids},
+        )
+
+    def _find(self, signature: np.ndarray) -> Optional[int]:
+        checked = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            group_id = self._tables[band].get(key)
+            if group_id is None or group_id in checked:
+                continue
+            checked.add(group_id)
+            if np.mean(self._groups[group_id].signature == signature) >= self.threshold:
+                return group_id
+        return None
+
+    def _add(self, group_id: int, signature: np.ndarray) -> None:
+        self._groups[group_id] = _Group(signature)
+        for band, key in enumerate(self._band_keys(signature)):
+            self._tables[band].setdefault(key, group_id)
+        while len(self._groups) > self.max_groups:
+            old_id, old = self._groups.popitem(last=False)
+            for band, key in enumerate(self._band_keys(old.signature)):
+                if self._tables[band].get(key) == old_id:
+                    del self._tables[band][key]
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [band.tobytes() for band in np.split(signature, self.bands)]
@@ -0,0 +1,280 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+from src.embedding.embedder import Embedder
+from src.models.document import Document, DocumentBatch, EmbeddedBatch, EmbeddedDocument
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Normalize a message for cache keying (Unicode NFKC, collapsed whitespace)."""
+    if not text:
+        return ""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def cache_key(model_name: str, text: Optional[str]) -> str:
+    """Content address of a text embedded by a given model."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(normalize_text(text).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Disk-backed store of embedding vectors addressed by content key.
+
+    Vectors live in a single memory-mapped matrix file (`vectors.bin`); a SQLite
+    database (`index.sqlite`) maps each key to its row in the matrix and tracks
+    when it was last used. When the cache reaches `max_bytes` of vector data the
+    least recently used rows are evicted and their slots reused.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Union[str, Path],
+        dtype: str = "float32",
+        max_bytes: int = 1 << 30,
+    ):
+        """
+        Initialize the cache, opening existing cache files if present.
+
+        Args:
+            cache_dir: Directory holding the cache files. Created if missing.
+            dtype: Storage dtype for new caches ("float32" or "float16").
+                   An existing cache keeps the dtype it was created with.
+            max_bytes: Upper bound on the size of the vector file.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.cache_dir / "index.sqlite"), check_same_thread=False)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY, slot INTEGER UNIQUE, last_used INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+            """
+        )
+        meta = dict(self._db.execute("SELECT name, value FROM meta"))
+        self.dtype = np.dtype(meta.get("dtype", dtype))
+        if self.dtype not in (np.float32, np.float16):
+            raise ValueError(f"Unsupported cache dtype: {self.dtype}")
+        self.dim: Optional[int] = int(meta["dim"]) if "dim" in meta else None
+        self._clock = int(self._db.execute("SELECT COALESCE(MAX(last_used), 0) FROM entries").fetchone()[0])
+        self._vectors_path = self.cache_dir / "vectors.bin"
+        self._vectors: Optional[np.memmap] = None
+        if self.dim is not None:
+            self._open_vectors()
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of vectors the cache may hold."""
+        if self.dim is None:
+            return 0
+        return max(1, self.max_bytes // (self.dim * self.dtype.itemsize))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Return the cached float32 vectors for whichever of `keys` are present."""
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            if self._vectors is None or not keys:
+                return found
+            rows = self._lookup(keys)
+            if not rows:
+                return found
+            slots = np.fromiter((slot for _, slot in rows), dtype=np.int64, count=len(rows))
+            vectors = np.asarray(self._vectors[slots], dtype=np.float32)
+            for (key, _), vector in zip(rows, vectors):
+                found[key] = vector
+            self._clock += 1
+            self._db.executemany(
+                "UPDATE entries SET last_used = ? WHERE key = ?", [(self._clock, key) for key, _ in rows]
+            )
+            self._db.commit()
+        return found
+
+    def put_many(self, vectors: Dict[str, np.ndarray]) -> None:
+        """Store vectors under their keys, evicting least recently used entries if full."""
+        if not vectors:
+            return
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(len(next(iter(vectors.values()))))
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+                    [("dim", str(self.dim)), ("dtype", self.dtype.name)],
+                )
+                self._open_vectors()
+
+            for vector in vectors.values():
+                if len(vector) != self.dim:
+                    raise ValueError(f"Expected {self.dim}-dimensional vectors, got {len(vector)}")
+
+            existing = {key for key, _ in self._lookup(list(vectors))}
+            new_keys = [key for key in vectors if key not in existing][: self.capacity]
+            if not new_keys:
+                return
+
+            slots = self._allocate_slots(len(new_keys))
+            matrix = np.stack([np.asarray(vectors[key], dtype=np.float32) for key in new_keys])
+            self._vectors[np.asarray(slots)] = matrix.astype(self.dtype)
+            self._vectors.flush()
+
+            # The index is committed only after the vectors are on disk.
+            self._clock += 1
+            self._db.executemany(
+                "INSERT INTO entries (key, slot, last_used) VALUES (?, ?, ?)",
+                [(key, slot, self._clock) for key, slot in zip(new_keys, slots)],
+            )
+            self._db.commit()
+
+    def close(self) -> None:
+        """Flush and release the cache files."""
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+                self._vectors = None
+            self._db.close()
+
+    def _lookup(self, keys: List[str]) -> List[tuple]:
+        """Return (key, slot) rows for the given keys that are in the index."""
+        rows = []
+        for start in range(0, len(keys), 500):  # stay below SQLite's variable limit
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows += self._db.execute(
+                f"SELECT key, slot FROM entries WHERE key IN ({placeholders})", chunk
+            ).fetchall()
+        return rows
+
+    def _allocate_slots(self, count: int) -> List[int]:
+        """Pick `count` free rows, growing the vector file or evicting LRU entries as needed."""
+        # Evicted slots are reused immediately, so the used rows are always 0..high_water-1
+        high_water = self._db.execute("SELECT COALESCE(MAX(slot) + 1, 0) FROM entries").fetchone()[0]
+        slots: List[int] = []
+
+        fresh = min(count, self.capacity - high_water)
+        if fresh > 0:
+            self._ensure_rows(high_water + fresh)
+            slots = list(range(high_water, high_water + fresh))
+
+        missing = count - len(slots)
+        if missing > 0:
+            victims = self._db.execute(
+                "SELECT key, slot FROM entries ORDER BY last_used LIMIT ?", (missing,)
+            ).fetchall()
+            self._db.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key, _ in victims])
+            slots += [slot for _, slot in victims]
+        return slots
+
+    def _open_vectors(self) -> None:
+        rows = 0
+        if self._vectors_path.exists():
+            rows = self._vectors_path.stat().st_size // (self.dim * self.dtype.itemsize)
+        self._vectors = None
+        if rows:
+            self._vectors = np.memmap(self._vectors_path, dtype=self.dtype, mode="r+", shape=(rows, self.dim))
+        else:
+            self._ensure_rows(min(1024, self.capacity))
+
+    def _ensure_rows(self, rows: int) -> None:
+        """Grow the vector file (geometrically) so it holds at least `rows` vectors."""
+        current = 0 if self._vectors is None else self._vectors.shape[0]
+        if rows <= current:
+            return
+        rows = min(max(rows, current * 2), self.capacity)
+        if self._vectors is not None:
+            self._vectors.flush()
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(rows * self.dim * self.dtype.itemsize)
+        self._vectors = np.memmap(self._vectors_path, dtype=self.dtype, mode="r+", shape=(rows, self.dim))
+
+
+class CachedEmbedder(Embedder):
+    """
+    Embedder wrapper that serves repeated texts from a persistent EmbeddingCache.
+
+    Texts are keyed by (model name, normalized text), so identical messages are
+    encoded only once, both within a batch and across pipeline runs.
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        cache_dir: Union[str, Path],
+        model_name: Optional[str] = None,
+        dtype: str = "float32",
+        max_bytes: int = 1 << 30,
+    ):
+        """
+        Initialize the cached embedder.
+
+        Args:
+            embedder: The embedder used for cache misses.
+            cache_dir: Directory holding the cache files.
+            model_name: Name used in cache keys. Defaults to the wrapped
+                        embedder's `model_name` attribute.
+            dtype: Storage dtype for vectors ("float32" or "float16").
+            max_bytes: Upper bound on the size of the vector file.
+        """
+        self.embedder = embedder
+        self.model_name = model_name or getattr(embedder, "model_name", type(embedder).__name__)
+        self.cache = EmbeddingCache(cache_dir, dtype=dtype, max_bytes=max_bytes)
+        self.hits = 0
+        self.misses = 0
+
+    def embed_batch(self, documents: List[Document]) -> List[EmbeddedDocument]:
+        """Get embeddings for a batch of documents, encoding only unseen texts."""
+        if not documents:
+            return []
+        return self.embed_document_batch(DocumentBatch.from_documents(documents)).to_embedded_documents()
+
+    def embed_document_batch(self, batch: DocumentBatch) -> EmbeddedBatch:
+        """Get the embedding matrix for a column-wise batch, encoding only unseen texts."""
+        if not len(batch):
+            return EmbeddedBatch(batch, np.empty((0, 0), dtype=np.float32), self.model_name)
+
+        keys = [cache_key(self.model_name, message) for message in batch.message]
+        vectors = self.cache.get_many(keys)
+
+        # One representative row per distinct uncached text
+        pending: Dict[str, int] = {}
+        for row, key in enumerate(keys):
+            if key not in vectors and key not in pending:
+                pending[key] = row
+
+        if pending:
+            encoded = self.embedder.embed_document_batch(batch.select(list(pending.values())))
+            new_vectors = dict(zip(pending, encoded.embeddings))
+            self.cache.put_many(new_vectors)
+            vectors.update(new_vectors)
+
+        self.misses += len(pending)
+        self.hits += len(keys) - len(pending)
+
+        embeddings = np.stack([vectors[key] for key in keys]).astype(np.float32, copy=False)
+        return EmbeddedBatch(documents=batch, embeddings=embeddings, embedding_model=self.model_name)
+
+    def close(self) -> None:
+        """Release the cache files and the wrapped embedder."""
+        self.cache.close()
+        self.embedder.close()
@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import List
 
-from src.models.document import Document, EmbeddedDocument
+from src.models.document import Document, DocumentBatch, EmbeddedBatch, EmbeddedDocument
 
 
 class Embedder(ABC):
@@ -18,4 +18,31 @@ class Embedder(ABC):
         Returns:
             A list of EmbeddedDocument objects with embedded text and metadata
         """
-        pass
\ No newline at end of file
+        pass
+
+    def embed_document_batch(self, batch: DocumentBatch) -> EmbeddedBatch:
+        """
+        Embed a column-wise batch into one contiguous embedding matrix.
+
+        The default implementation goes through embed_batch; embedders that can
+        encode the message column directly should override it.
+
+        Args:
+            batch: A DocumentBatch to embed
+
+        Returns:
+            An EmbeddedBatch whose embedding matrix rows follow the batch rows
+        """
+        embedded = EmbeddedBatch.from_embedded_documents(self.embed_batch(batch.to_documents()))
+        embedded.documents = batch
+        return embedded
+
+    def close(self) -> None:
+        """Release resources held by the embedder, such as worker processes or cache files."""
+        pass
+
+    def __enter__(self) -> "Embedder":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,116 @@
+from pathlib import Path
+from typing import List, Optional, Union
+
+import numpy as np
+from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+from src.embedding.embedder import Embedder
+from src.embedding.sentence_tranformer_embedder import SentenceTransformerEmbedder
+from src.models.document import DocumentBatch
+
+
+class OnnxEmbedder(SentenceTransformerEmbedder):
+    """
+    SentenceTransformerEmbedder that runs the model with ONNX Runtime on CPU.
+
+    The model is exported to ONNX once and saved under `export_dir`; with
+    `quantize` its weights are additionally quantized to int8 (dynamic
+    quantization), which is smaller and faster but slightly less exact. Use
+    check_cosine_tolerance to confirm the vectors still match PyTorch's.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "sentence-transformers/all-MiniLM-L12-v2",
+        batch_size: int = 32,
+        quantize: bool = False,
+        quantization_config: str = "avx2",
+        export_dir: Union[str, Path] = ".cache/onnx",
+        max_seq_length: Optional[int] = None,
+        token_budget: Optional[int] = None,
+    ):
+        """
+        Initialize the embedder, exporting the model on first use.
+
+        Args:
+            model_name: Name or path of the sentence-transformers model.
+            batch_size: Batch size used for encoding.
+            quantize: Use dynamic int8 quantization.
+            quantization_config: Target instruction set for quantization
+                                 ("avx2", "avx512", "avx512_vnni" or "arm64").
+            export_dir: Directory the exported models are kept in.
+            max_seq_length: Truncate texts to this many tokens.
+            token_budget: Padded tokens per forward pass for length-bucketed
+                          batching (see SentenceTransformerEmbedder).
+        """
+        self.model = load_onnx_model(model_name, quantize, quantization_config, export_dir)
+        self.batch_size = batch_size
+        self.token_budget = token_budget
+        if max_seq_length is not None:
+            self.model.max_seq_length = max_seq_length
+        # Quantized vectors differ slightly, so they are labelled (and cached) separately
+        self.model_name = f"{model_name}+qint8-{quantization_config}" if quantize else model_name
+
+
+def load_onnx_model(
+    model_name: str,
+    quantize: bool = False,
+    quantization_config: str = "avx2",
+    export_dir: Union[str, Path] = ".cache/onnx",
+) -> SentenceTransformer:
+    """Load a sentence-transformers model on the ONNX backend, exporting (and quantizing) it if needed."""
+    model_dir = Path(export_dir) / model_name.replace("/", "__")
+    if not (model_dir / "onnx" / "model.onnx").exists():
+        SentenceTransformer(model_name, backend="onnx").save(str(model_dir))
+    if not quantize:
+        return SentenceTransformer(str(model_dir), backend="onnx", model_kwargs={"file_name": "onnx/model.onnx"})
+
+    quantized = _quantized_files(model_dir, quantization_config)
+    if not quantized:
+        model = SentenceTransformer(str(model_dir), backend="onnx", model_kwargs={"file_name": "onnx/model.onnx"})
+        export_dynamic_quantized_onnx_model(model, quantization_config, str(model_dir))
+        quantized = _quantized_files(model_dir, quantization_config)
+    return SentenceTransformer(
+        str(model_dir), backend="onnx", model_kwargs={"file_name": f"onnx/{quantized[0].name}"}
+    )
+
+
+def check_cosine_tolerance(
+    embedder: Embedder, reference: Embedder, texts: List[str], tolerance: float = 0.02
+) -> float:
+    """
+    Check that an embedder's vectors point the same way as a reference embedder's.
+
+    Args:
+        embedder: The embedder to check, e.g. an OnnxEmbedder.
+        reference: The embedder it should match, e.g. a SentenceTransformerEmbedder.
+        texts: Sample texts to embed with both.
+        tolerance: Largest allowed cosine distance (1 - cosine similarity).
+
+    Returns:
+        The largest cosine distance over the sample texts.
+
+    Raises:
+        ValueError: If any text's cosine distance exceeds the tolerance.
+    """
+    batch = DocumentBatch(time=[""] * len(texts), location=[""] * len(texts), account=[""] * len(texts), message=texts)
+    distances = cosine_distances(
+        embedder.embed_document_batch(batch).embeddings, reference.embed_document_batch(batch).embeddings
+    )
+    worst = float(distances.max()) if len(distances) else 0.0
+    if worst > tolerance:
+        raise ValueError(
+            f"Embeddings differ from the reference by cosine distance {worst:.4f} "
+            f"(tolerance {tolerance}) for text {texts[int(distances.argmax())]!r}"
+        )
+    return worst
+
+
+def cosine_distances(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Row-wise cosine distance between two equally shaped embedding matrices."""
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return 1.0 - np.einsum("ij,ij->i", a, b)
+
+
+def _quantized_files(model_dir: Path, quantization_config: str) -> List[Path]:
+    return sorted((model_dir / "onnx").glob(f"model_*int8_{quantization_config}.onnx"))
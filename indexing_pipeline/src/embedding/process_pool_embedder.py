@@ -0,0 +1,133 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Type
+
+import numpy as np
+from src.embedding.embedder import Embedder
+from src.models.document import Document, DocumentBatch, EmbeddedBatch, EmbeddedDocument
+
+# The embedder owned by a pool worker process
+_worker_embedder: Optional[Embedder] = None
+
+
+class ProcessPoolEmbedder(Embedder):
+    """
+    Embedder that shards every batch across a pool of worker processes.
+
+    Each worker builds its own embedder (e.g. a SentenceTransformerEmbedder)
+    with a pinned number of intra-op threads, so the workers together use all
+    cores without oversubscribing them. A batch is split into contiguous
+    shards, one per worker, and the shards' embeddings are concatenated in
+    order. Worker processes are started on first use and stopped by close()
+    (or by leaving a `with` block); a closed pool restarts when used again.
+    """
+
+    def __init__(
+        self,
+        embedder_class: Type[Embedder],
+        embedder_kwargs: Optional[Dict[str, Any]] = None,
+        workers: Optional[int] = None,
+        threads_per_worker: Optional[int] = None,
+        min_shard_size: int = 16,
+    ):
+        """
+        Initialize the pool (workers are started lazily).
+
+        Args:
+            embedder_class: Embedder built in every worker, e.g. SentenceTransformerEmbedder.
+            embedder_kwargs: Keyword arguments for `embedder_class`.
+            workers: Number of worker processes. Defaults to the number of cores.
+            threads_per_worker: Intra-op threads per worker. Defaults to the
+                                number of cores divided by `workers`.
+            min_shard_size: Batches are not split into shards smaller than this.
+        """
+        self.embedder_class = embedder_class
+        self.embedder_kwargs = dict(embedder_kwargs or {})
+        self.workers = workers or os.cpu_count() or 1
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // self.workers)
+        self.min_shard_size = min_shard_size
+        self._model_name: Optional[str] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def model_name(self) -> str:
+        """
+        The model name the workers' embedder reports (e.g. with OnnxEmbedder's
+        quantization suffix), so cache keys never mix models. Asked from a
+        worker on first use, which starts the pool.
+        """
+        if self._model_name is None:
+            self._model_name = self._pool().submit(_worker_model_name).result()
+        return self._model_name
+
+    def embed_batch(self, documents: List[Document]) -> List[EmbeddedDocument]:
+        """Get embeddings for a batch of documents, computed by the worker processes."""
+        if not documents:
+            return []
+        return self.embed_document_batch(DocumentBatch.from_documents(documents)).to_embedded_documents()
+
+    def embed_document_batch(self, batch: DocumentBatch) -> EmbeddedBatch:
+        """Get the embedding matrix for a column-wise batch, one shard per worker."""
+        if not len(batch):
+            return EmbeddedBatch(batch, np.empty((0, 0), dtype=np.float32), self.model_name)
+
+        shards = min(self.workers, max(1, len(batch) // self.min_shard_size))
+        bounds = np.linspace(0, len(batch), shards + 1).astype(int)
+        executor = self._pool()
+        futures = [
+            executor.submit(_embed_shard, batch.select(range(start, end)))
+            for start, end in zip(bounds[:-1], bounds[1:])
+        ]
+        results = [future.result() for future in futures]
+        return EmbeddedBatch(
+            documents=batch,
+            embeddings=np.concatenate([embeddings for embeddings, _ in results]),
+            embedding_model=results[0][1],
+        )
+
+    def close(self) -> None:
+        """Stop the worker processes, cancelling shards that have not started."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that already runs torch threads can deadlock
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.embedder_class, self.embedder_kwargs, self.threads_per_worker),
+                )
+            return self._executor
+
+
+def _init_worker(embedder_class: Type[Embedder], embedder_kwargs: Dict[str, Any], threads: int) -> None:
+    """Pin the worker's thread pools, then build its embedder."""
+    global _worker_embedder
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[variable] = str(threads)
+    try:
+        import torch
+
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _worker_embedder = embedder_class(**embedder_kwargs)
+
+
+def _embed_shard(shard: DocumentBatch):
+    """Embed one shard in a worker; returns (embedding matrix, model name)."""
+    embedded = _worker_embedder.embed_document_batch(shard)
+    return np.asarray(embedded.embeddings, dtype=np.float32), embedded.embedding_model
+
+
+def _worker_model_name() -> str:
+    """The model name of the worker's embedder."""
+    return getattr(_worker_embedder, "model_name", type(_worker_embedder).__name__)
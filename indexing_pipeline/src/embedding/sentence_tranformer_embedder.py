@@ -1,8 +1,9 @@
-from typing import List
+from typing import List, Optional
 
+import numpy as np
 from sentence_transformers import SentenceTransformer
 from src.embedding.embedder import Embedder
-from src.models.document import Document, EmbeddedDocument
+from src.models.document import Document, DocumentBatch, EmbeddedBatch, EmbeddedDocument
 
 
 class SentenceTransformerEmbedder(Embedder):
@@ -12,10 +13,29 @@ class SentenceTransformerEmbedder(Embedder):
         self,
         model_name: str = "sentence-transformers/all-MiniLM-L12-v2",
         batch_size: int = 32,
+        max_seq_length: Optional[int] = None,
+        token_budget: Optional[int] = None,
     ):
+        """
+        Initialize the embedder.
+
+        Args:
+            model_name: Name or path of the sentence-transformers model.
+            batch_size: Batch size used for encoding when `token_budget` is not set.
+            max_seq_length: Truncate texts to this many tokens. None keeps the
+                            model's default.
+            token_budget: Enable length-bucketed batching: texts are sorted by
+                          token length and grouped so that each forward pass
+                          holds at most this many (padded) tokens, i.e. short
+                          texts are encoded in large batches and long texts in
+                          small ones.
+        """
         self.model = SentenceTransformer(model_name)
         self.batch_size = batch_size
         self.model_name = model_name
+        self.token_budget = token_budget
+        if max_seq_length is not None:
+            self.model.max_seq_length = max_seq_length
 
     def embed_batch(self, documents: List[Document]) -> List[EmbeddedDocument]:
         """Get embeddings for a batch of documents."""
@@ -23,7 +43,7 @@ class SentenceTransformerEmbedder(Embedder):
         texts = [doc.message for doc in documents]
 
         # Generate embeddings in batches
-        embeddings = self.model.encode(texts, batch_size=self.batch_size)
+        embeddings = self._encode(texts)
 
         # Create EmbeddedDocument objects
         embedded_documents = []
@@ -34,3 +54,64 @@ class SentenceTransformerEmbedder(Embedder):
             embedded_documents.append(embedded_document)
 
         return embedded_documents
+
+    def embed_document_batch(self, batch: DocumentBatch) -> EmbeddedBatch:
+        """Get one float32 embedding matrix for a column-wise batch of documents."""
+        embeddings = self._encode(batch.message)
+        return EmbeddedBatch(
+            documents=batch,
+            embeddings=np.asarray(embeddings, dtype=np.float32),
+            embedding_model=self.model_name,
+        )
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Encode texts, bucketed by token length if a token budget is set; rows follow `texts`.
+
+        The model's own progress bar is off: progress is reported by the pipeline metrics.
+        """
+        if self.token_budget is None or not texts:
+            return self.model.encode(texts, batch_size=self.batch_size, show_progress_bar=False)
+
+        buckets = length_buckets(self.token_lengths(texts), self.token_budget)
+        embeddings: Optional[np.ndarray] = None
+        for rows in buckets:
+            encoded = self.model.encode([texts[row] for row in rows], batch_size=len(rows), show_progress_bar=False)
+            if embeddings is None:
+                embeddings = np.empty((len(texts), encoded.shape[1]), dtype=encoded.dtype)
+            embeddings[rows] = encoded
+        return embeddings
+
+    def token_lengths(self, texts: List[str]) -> np.ndarray:
+        """Number of tokens the model sees for each text, after truncation."""
+        encoded = self.model.tokenizer(
+            list(texts), add_special_tokens=True, truncation=True, max_length=self.model.max_seq_length
+        )
+        return np.fromiter((len(ids) for ids in encoded["input_ids"]), dtype=np.int64, count=len(texts))
+
+
+def length_buckets(lengths: np.ndarray, token_budget: int) -> List[np.ndarray]:
+    """
+    Group row indices into batches of similar length.
+
+    Rows are sorted by length and cut into consecutive batches whose padded
+    size (rows x longest row) stays within `token_budget`; a single row longer
+    than the budget gets a batch of its own.
+
+    Args:
+        lengths: Token length of every row.
+        token_budget: Maximum padded tokens per batch.
+
+    Returns:
+        Arrays of row indices, shortest rows first.
+    """
+    order = np.argsort(lengths, kind="stable")
+    buckets = []
+    start = 0
+    for end in range(1, len(order) + 1):
+        # order is ascending, so the row just added is the longest in the batch
+        if end < len(order) and (end + 1 - start) * lengths[order[end]] <= token_budget:
+            continue
+        buckets.append(order[start:end])
+        start = end
+    return buckets
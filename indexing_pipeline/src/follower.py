@@ -0,0 +1,225 @@
+import csv
+import io
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Generator, Iterator, List, Optional, Tuple, Union
+
+from src.data_loader import document_from_row
+from src.models.document import Document
+
+# File types picked up when following a directory of feed drops
+FEED_SUFFIXES = (".csv", ".ndjson", ".jsonl")
+
+
+class FeedFollower:
+    """
+    Follows a growing message feed and cuts it into micro-batches.
+
+    The feed is either a single CSV/NDJSON file that keeps being appended to
+    (and may be rotated: renamed away and replaced by a new file), or a
+    directory that receives CSV/NDJSON drops whose names sort in arrival order.
+    Only complete rows are read, so a row that is still being written is picked
+    up on a later poll.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        batch_size: int = 32,
+        max_latency: float = 2.0,
+        poll_interval: float = 0.5,
+    ):
+        """
+        Initialize the follower.
+
+        Args:
+            path: Feed file or directory of feed files.
+            batch_size: A batch is cut as soon as it holds this many rows.
+            max_latency: A non-empty batch is cut at the latest this many
+                         seconds after its first row was read.
+            poll_interval: Seconds to wait before checking an idle feed again.
+        """
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self.poll_interval = min(poll_interval, max_latency)
+
+    def follow(
+        self,
+        start_file: Optional[str] = None,
+        start_offset: int = 0,
+        stop: Optional[threading.Event] = None,
+    ) -> Generator[Tuple[List[Document], int, str], None, None]:
+        """
+        Yield micro-batches of new rows until `stop` is set.
+
+        Args:
+            start_file: File key from a previous batch to resume in. If it no
+                        longer matches the feed, reading starts at the oldest
+                        unread file.
+            start_offset: Byte offset within `start_file` to resume at.
+            stop: Optional event that ends following; rows already read are
+                  yielded as a final batch.
+
+        Yields:
+            Tuples of (documents, byte offset after the last row, key of the file
+            the last row came from). Passing the offset and key back as
+            `start_offset` and `start_file` resumes right after that row.
+        """
+        batch: List[Document] = []
+        deadline = 0.0
+        position: Tuple[int, str] = (0, "")
+
+        for item in self._read(start_file, start_offset, stop):
+            now = time.monotonic()
+            if item is not None:
+                document, end_offset, key = item
+                if not batch:
+                    deadline = now + self.max_latency
+                batch.append(document)
+                position = (end_offset, key)
+            if batch and (len(batch) >= self.batch_size or now >= deadline):
+                yield batch, position[0], position[1]
+                batch = []
+
+        if batch:
+            yield batch, position[0], position[1]
+
+    def _read(
+        self, start_file: Optional[str], start_offset: int, stop: Optional[threading.Event]
+    ) -> Iterator[Optional[Tuple[Document, int, str]]]:
+        """Yield (document, end offset, file key) per row, and None after every idle poll."""
+        current = self._open_start(start_file, start_offset)
+        while stop is None or not stop.is_set():
+            if current is not None:
+                yield from current.read_available()
+
+            successor = self._successor(current)
+            if successor is not None:
+                if current is not None:
+                    # Drain anything written to the old file before it was rotated
+                    yield from current.read_available()
+                    current.close()
+                current = successor
+                continue
+
+            yield None
+            time.sleep(self.poll_interval)
+
+        if current is not None:
+            current.close()
+
+    def _open_start(self, start_file: Optional[str], start_offset: int) -> Optional["_FeedFile"]:
+        """Open the file to resume in, or the first file of the feed."""
+        if self.path.is_dir():
+            files = self._feed_files()
+            if start_file is not None and start_file in files:
+                return _FeedFile(self.path / start_file, start_file, start_offset)
+            later = [name for name in files if start_file is None or name > start_file]
+            return _FeedFile(self.path / later[0], later[0]) if later else None
+
+        if not self.path.exists():
+            return None
+        st = self.path.stat()
+        key = _inode_key(st)
+        offset = start_offset if key == start_file and start_offset <= st.st_size else 0
+        return _FeedFile(self.path, key, offset)
+
+    def _successor(self, current: Optional["_FeedFile"]) -> Optional["_FeedFile"]:
+        """Return the file to switch to after `current`, or None to keep reading it."""
+        if self.path.is_dir():
+            later = [name for name in self._feed_files() if current is None or name > current.key]
+            return _FeedFile(self.path / later[0], later[0]) if later else None
+
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None  # between rotation and creation of the new file
+        key = _inode_key(st)
+        if current is None or key != current.key:
+            return _FeedFile(self.path, key)
+        if st.st_size < current.offset:
+            # Truncated in place: start over from the first row
+            return _FeedFile(self.path, key)
+        return None
+
+    def _feed_files(self) -> List[str]:
+        return sorted(
+            entry.name
+            for entry in os.scandir(self.path)
+            if entry.is_file() and entry.name.endswith(FEED_SUFFIXES)
+        )
+
+
+class _FeedFile:
+    """An open feed file read incrementally, one complete row at a time."""
+
+    def __init__(self, path: Path, key: str, offset: int = 0):
+        self.path = path
+        self.key = key
+        self.offset = offset
+        self.is_json = path.suffix in (".ndjson", ".jsonl")
+        self.fieldnames: Optional[List[str]] = None
+        self._f = open(path, "rb")
+        self._f.seek(offset)
+        self._buffer = b""
+
+    def read_available(self) -> Iterator[Tuple[Document, int, str]]:
+        """Yield every complete row written since the last call."""
+        self._buffer += self._f.read()
+        if not self.is_json and self.fieldnames is None and not self._read_header():
+            return
+
+        while True:
+            record_length = self._complete_record_length()
+            if record_length == 0:
+                return
+            record = self._buffer[:record_length].decode("utf-8")
+            self._buffer = self._buffer[record_length:]
+            self.offset += record_length
+            if not record.strip():
+                continue
+            if self.is_json:
+                row = json.loads(record)
+            else:
+                values = next(csv.reader(io.StringIO(record, newline="")))
+                row = dict(zip(self.fieldnames, values))
+            yield document_from_row(row), self.offset, self.key
+
+    def close(self) -> None:
+        self._f.close()
+
+    def _read_header(self) -> bool:
+        """Read the CSV header from the start of the file. Returns False if it is incomplete."""
+        with open(self.path, "rb") as f:
+            header = f.readline()
+        if not header.endswith(b"\n"):
+            return False
+        self.fieldnames = next(csv.reader([header.decode("utf-8")]))
+        if self.offset < len(header):
+            # Skip the header (or whatever part of it is still buffered)
+            self._buffer = self._buffer[len(header) - self.offset:]
+            self.offset = len(header)
+        return True
+
+    def _complete_record_length(self) -> int:
+        """Byte length of the first complete record in the buffer, or 0 if there is none."""
+        length = 0
+        quotes = 0
+        while True:
+            end = self._buffer.find(b"\n", length)
+            if end == -1:
+                return 0
+            if not self.is_json:
+                quotes += self._buffer.count(b'"', length, end)
+            length = end + 1
+            if quotes % 2 == 0:  # newline is not inside a quoted field
+                return length
+
+
+def _inode_key(st: os.stat_result) -> str:
+    """Identifies a file across renames, so rotation can be detected."""
+    return f"{st.st_dev}:{st.st_ino}"
@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterable, List, Set
 
-from src.models.document import EmbeddedDocument
+from src.models.document import EmbeddedBatch, EmbeddedDocument
 
 
 class Indexer(ABC):
@@ -16,3 +16,27 @@ class Indexer(ABC):
             embedded_documents: A list of EmbeddedDocument objects to index
         """
         pass
+
+    def index_embedded_batch(self, batch: EmbeddedBatch) -> None:
+        """
+        Index a column-wise embedded batch.
+
+        The default implementation goes through index_batch; indexers that can
+        upload the embedding matrix directly should override it.
+
+        Args:
+            batch: An EmbeddedBatch to index
+        """
+        self.index_batch(batch.to_embedded_documents())
+
+    def existing_ids(self, ids: Iterable[int]) -> Set[int]:
+        """
+        Return which of the given point IDs are already indexed.
+
+        Used to skip documents that an earlier run already stored. The default
+        implementation reports none as present.
+
+        Args:
+            ids: Point IDs as produced by document_id
+        """
+        return set()
@@ -1,29 +1,183 @@
-from typing import List
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+import numpy as np
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+from qdrant_client.models import (
+    Batch,
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    CollectionStatus,
+    Distance,
+    Filter,
+    HnswConfigDiff,
+    IsEmptyCondition,
+    OptimizersConfigDiff,
+    PayloadField,
+    PayloadSchemaType,
+    PointStruct,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SetPayload,
+    SetPayloadOperation,
+    VectorParams,
+)
 from src.indexing.indexer import Indexer
-from src.models.document import EmbeddedDocument
+from src.models.document import EmbeddedBatch, EmbeddedDocument, document_id, document_ids, timestamp
+
+# Payload fields the search service filters on, and their index types
+PAYLOAD_INDEXES = {
+    "timestamp": PayloadSchemaType.INTEGER,
+    "location": PayloadSchemaType.KEYWORD,
+    "account": PayloadSchemaType.KEYWORD,
+    "main_category": PayloadSchemaType.KEYWORD,
+    "label": PayloadSchemaType.KEYWORD,
+}
+
+# Qdrant's default optimizers indexing_threshold (KB of vectors per segment)
+DEFAULT_INDEXING_THRESHOLD = 10000
+
+
+@dataclass
+class CollectionConfig:
+    """
+    How a new collection stores and indexes its vectors.
+
+    The defaults match the original plain float32 in-RAM setup. Quantization
+    keeps a compressed copy of every vector (int8: 4x smaller, binary: 32x
+    smaller) for the first search pass; the original vectors are kept for
+    rescoring and can be moved to disk with `on_disk`.
+    """
+    vector_size: int = 384
+    distance: Distance = Distance.COSINE
+    quantization: Optional[str] = None  # None, "scalar" (int8) or "binary"
+    quantization_always_ram: bool = True  # keep quantized vectors in RAM even if originals are on disk
+    on_disk: bool = False  # memory-map original vectors from disk
+    on_disk_payload: bool = False  # keep payloads on disk, read only for returned points
+    hnsw_m: Optional[int] = None  # graph degree; Qdrant default 16
+    hnsw_ef_construct: Optional[int] = None  # build-time beam width; Qdrant default 100
+    # payload field -> index type; indexed fields are filtered without scanning payloads
+    payload_indexes: Dict[str, PayloadSchemaType] = field(default_factory=lambda: dict(PAYLOAD_INDEXES))
+
+    def create_collection_kwargs(self) -> Dict[str, Any]:
+        """Keyword arguments for QdrantClient.create_collection; unset options are left to Qdrant."""
+        kwargs: Dict[str, Any] = {
+            "vectors_config": VectorParams(
+                size=self.vector_size, distance=self.distance, on_disk=True if self.on_disk else None
+            ),
+        }
+        if self.quantization == "scalar":
+            kwargs["quantization_config"] = ScalarQuantization(
+                scalar=ScalarQuantizationConfig(
+                    type=ScalarType.INT8, quantile=0.99, always_ram=self.quantization_always_ram
+                )
+            )
+        elif self.quantization == "binary":
+            kwargs["quantization_config"] = BinaryQuantization(
+                binary=BinaryQuantizationConfig(always_ram=self.quantization_always_ram)
+            )
+        elif self.quantization is not None:
+            raise ValueError(f"Unknown quantization: {self.quantization!r} (expected 'scalar' or 'binary')")
+        if self.on_disk_payload:
+            kwargs["on_disk_payload"] = True
+        if self.hnsw_m is not None or self.hnsw_ef_construct is not None:
+            kwargs["hnsw_config"] = HnswConfigDiff(m=self.hnsw_m, ef_construct=self.hnsw_ef_construct)
+        return kwargs
+
+    def vector_bytes_in_ram(self) -> int:
+        """Approximate RAM per point used by vector storage (excluding the HNSW graph)."""
+        original = 0 if self.on_disk else self.vector_size * 4
+        if self.quantization is None or not self.quantization_always_ram:
+            quantized = 0
+        elif self.quantization == "scalar":
+            quantized = self.vector_size
+        else:
+            quantized = (self.vector_size + 7) // 8
+        return original + quantized
+
+
+def connect(
+    host: str = "localhost",
+    port: int = 6333,
+    location: Optional[str] = None,
+    prefer_grpc: bool = False,
+    grpc_port: int = 6334,
+) -> QdrantClient:
+    """
+    Create a Qdrant client for a server (host/port or URL) or an in-process store.
+
+    Args:
+        host: Qdrant host, used if `location` is not set.
+        port: Qdrant REST port.
+        location: ":memory:", a URL, or a local directory for on-disk in-process storage.
+        prefer_grpc: Talk to the server over gRPC instead of REST.
+        grpc_port: Qdrant gRPC port, used with prefer_grpc.
+    """
+    if location == ":memory:" or (location and "://" in location):
+        return QdrantClient(location=location, prefer_grpc=prefer_grpc, grpc_port=grpc_port)
+    if location:
+        return QdrantClient(path=location)
+    return QdrantClient(host=host, port=port, prefer_grpc=prefer_grpc, grpc_port=grpc_port)
 
 
 class QdrantIndexer(Indexer):
     """Qdrant implementation of the Indexer interface."""
 
-    def __init__(self, host: str = "localhost", port: int = 6333, collection_name: str = "documents"):
-        self.client = QdrantClient(host=host, port=port)
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 6333,
+        collection_name: str = "documents",
+        location: Optional[str] = None,
+        prefer_grpc: bool = False,
+        grpc_port: int = 6334,
+        collection_config: Optional[CollectionConfig] = None,
+    ):
+        """
+        Initialize the indexer and create the collection if it does not exist.
+
+        Args:
+            host: Qdrant host.
+            port: Qdrant REST port.
+            collection_name: Collection to index into.
+            location: ":memory:", a local path or a URL. ":memory:" and local
+                      paths run Qdrant in-process, e.g. for benchmarks.
+            prefer_grpc: Talk to the server over gRPC instead of REST.
+            grpc_port: Qdrant gRPC port, used with prefer_grpc.
+            collection_config: Storage and index settings used if the collection
+                               has to be created. An existing collection keeps
+                               its settings.
+        """
+        self.client = connect(host, port, location, prefer_grpc, grpc_port)
         self.collection_name = collection_name
+        self.collection_config = collection_config or CollectionConfig()
+        # Whether upserts wait until Qdrant has applied them; False during bulk loads
+        self.wait = True
+        self._last_upsert = None
+        self._lock = threading.Lock()
         self._initialize_collection()
 
     def _initialize_collection(self) -> None:
-        """Initialize a Qdrant collection."""
+        """Initialize a Qdrant collection and its payload indexes."""
         # Create collection if it doesn't exist
         try:
-            self.client.get_collection(collection_name=self.collection_name)
+            info = self.client.get_collection(collection_name=self.collection_name)
+            indexed = info.payload_schema if isinstance(info.payload_schema, dict) else {}
         except Exception:
-            # Use a default dimension, will be updated when first document is indexed
             self.client.create_collection(
                 collection_name=self.collection_name,
-                vectors_config=VectorParams(size=384, distance=Distance.COSINE),
+                **self.collection_config.create_collection_kwargs(),
             )
+            indexed = {}
+        for field_name, schema in self.collection_config.payload_indexes.items():
+            if field_name not in indexed:
+                self.client.create_payload_index(
+                    collection_name=self.collection_name, field_name=field_name, field_schema=schema
+                )
 
     def index_batch(self, embedded_documents: List[EmbeddedDocument]) -> None:
         """Index embedded documents to Qdrant."""
@@ -36,22 +190,192 @@ class QdrantIndexer(Indexer):
             # Create payload with document metadata
             payload = {
                 "time": doc.time,
+                "timestamp": timestamp(doc.time),
                 "location": doc.location,
                 "account": doc.account,
                 "message": doc.message,
                 "embedding_model": embedded_doc.embedding_model,
             }
             
-            # Generate unique ID based on document content (ensure positive integer)
-            doc_id = abs(hash(f"{doc.time}_{doc.location}_{doc.account}_{doc.message}"))
+            # Content-derived ID, so re-runs overwrite points instead of duplicating them
             point = PointStruct(
-                id=doc_id,
+                id=document_id(doc),
                 vector=embedded_doc.embedding.tolist(),
                 payload=payload
             )
             points.append(point)
 
-        self.client.upsert(
+        self._upsert(points)
+
+    def index_embedded_batch(self, batch: EmbeddedBatch) -> None:
+        """Index a column-wise batch as one columnar Qdrant upsert, without per-row points."""
+        if not len(batch):
+            return
+
+        documents = batch.documents
+        payloads = [
+            {
+                "time": time,
+                "timestamp": timestamp(time),
+                "location": location,
+                "account": account,
+                "message": message,
+                "embedding_model": batch.embedding_model,
+            }
+            for time, location, account, message in zip(
+                documents.time, documents.location, documents.account, documents.message
+            )
+        ]
+        for name, values in batch.payload.items():
+            for payload, value in zip(payloads, values):
+                payload[name] = value
+        self._upsert(
+            Batch(
+                ids=document_ids(documents),
+                # One C-level conversion of the whole matrix instead of one per row
+                vectors=batch.embeddings.tolist(),
+                payloads=payloads,
+            )
+        )
+
+    def upsert_batch(self, ids: List[int], vectors: np.ndarray, payloads: List[Dict[str, Any]]) -> None:
+        """
+        Upsert prepared points as one columnar batch, keeping their IDs.
+
+        Used to restore points exported from a collection, whose vectors and
+        payloads are stored as they are rather than derived from documents.
+
+        Args:
+            ids: Point IDs.
+            vectors: (points x dim) vector matrix.
+            payloads: One payload per point.
+        """
+        if not ids:
+            return
+        self._upsert(Batch(ids=list(ids), vectors=np.asarray(vectors, dtype=np.float32).tolist(), payloads=payloads))
+
+    def backfill_timestamps(self, page_size: int = 1024) -> int:
+        """
+        Add the numeric `timestamp` field to points indexed before it existed.
+
+        Args:
+            page_size: Points read per scroll request.
+
+        Returns:
+            Number of points updated.
+        """
+        missing = Filter(must=[IsEmptyCondition(is_empty=PayloadField(key="timestamp"))])
+        updated = 0
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=missing,
+                limit=page_size,
+                offset=offset,
+                with_payload=["time"],
+                with_vectors=False,
+            )
+            # One update per distinct time instead of one per point
+            by_timestamp: Dict[int, List[int]] = {}
+            for point in points:
+                value = timestamp((point.payload or {}).get("time"))
+                if value is not None:
+                    by_timestamp.setdefault(value, []).append(point.id)
+            if by_timestamp:
+                self.client.batch_update_points(
+                    collection_name=self.collection_name,
+                    update_operations=[
+                        SetPayloadOperation(set_payload=SetPayload(payload={"timestamp": value}, points=ids))
+                        for value, ids in by_timestamp.items()
+                    ],
+                )
+                updated += sum(len(ids) for ids in by_timestamp.values())
+            if offset is None:
+                return updated
+
+    @contextmanager
+    def bulk_load(
+        self, optimization_timeout: float = 600.0, indexing_threshold: Optional[int] = None
+    ) -> Iterator["QdrantIndexer"]:
+        """
+        Context manager for loading many points quickly.
+
+        Inside the block, upserts return as soon as Qdrant has accepted them
+        (wait=False) and HNSW indexing is switched off, so segments are not
+        re-indexed while points stream in. Call index_batch/index_embedded_batch
+        from several threads (e.g. Pipeline.run with index_workers > 1) to keep
+        multiple uploads in flight. On exit the last upsert is repeated with
+        wait=True as a barrier, the original indexing settings are restored and
+        the collection's optimizers are awaited. Points are only known to be
+        stored after that barrier; wrap the block in Checkpoint.hold() when
+        checkpointing.
+
+        Args:
+            optimization_timeout: Seconds to wait for the collection to finish
+                                  indexing after the load.
+            indexing_threshold: Indexing threshold to set after the load
+                                (default: the collection's, or Qdrant's
+                                default if the collection reports none).
+        """
+        config = self.client.get_collection(collection_name=self.collection_name).config
+        hnsw_m = config.hnsw_config.m
+        if indexing_threshold is None:
+            # Restoring None would change nothing and leave indexing switched off
+            indexing_threshold = config.optimizer_config.indexing_threshold
+            if indexing_threshold is None:
+                indexing_threshold = DEFAULT_INDEXING_THRESHOLD
+        self.client.update_collection(
+            collection_name=self.collection_name,
+            hnsw_config=HnswConfigDiff(m=0),
+            optimizers_config=OptimizersConfigDiff(indexing_threshold=0),
+        )
+        self.wait = False
+        try:
+            yield self
+            self._barrier()
+        finally:
+            self.wait = True
+            self.client.update_collection(
+                collection_name=self.collection_name,
+                hnsw_config=HnswConfigDiff(m=hnsw_m),
+                optimizers_config=OptimizersConfigDiff(indexing_threshold=indexing_threshold),
+            )
+        self.wait_for_optimization(optimization_timeout)
+
+    def wait_for_optimization(self, timeout: float = 600.0, poll_interval: float = 1.0) -> None:
+        """Block until the collection status is green, i.e. all segments are indexed."""
+        deadline = time.monotonic() + timeout
+        while self.client.get_collection(collection_name=self.collection_name).status != CollectionStatus.GREEN:
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Collection '{self.collection_name}' still optimizing after {timeout}s")
+            time.sleep(poll_interval)
+
+    def _upsert(self, points) -> None:
+        self.client.upsert(collection_name=self.collection_name, points=points, wait=self.wait)
+        if not self.wait:
+            with self._lock:
+                self._last_upsert = points
+
+    def _barrier(self) -> None:
+        """Wait until every upsert sent with wait=False has been applied."""
+        with self._lock:
+            points, self._last_upsert = self._last_upsert, None
+        if points is not None:
+            # Updates are applied in order and this repeat (idempotent: same IDs)
+            # is sent after every earlier upsert was accepted, so once it has
+            # been applied all of them have.
+            self.client.upsert(collection_name=self.collection_name, points=points, wait=True)
+
+    def existing_ids(self, ids: Iterable[int]) -> Set[int]:
+        """Return which of the given point IDs are already stored in the collection."""
+        ids = list(ids)
+        if not ids:
+            return set()
+        records = self.client.retrieve(
             collection_name=self.collection_name,
-            points=points
+            ids=ids,
+            with_payload=False,
+            with_vectors=False,
         )
+        return {record.id for record in records}
@@ -0,0 +1,99 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from src.embedding.embedder import Embedder
+from src.models.document import DocumentBatch, EmbeddedBatch
+
+
+def load_categories(path: Union[str, Path]) -> Dict[str, List[str]]:
+    """Load the category file: main category -> list of category terms."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class CategoryLabeler:
+    """
+    Labels messages with their closest category term by cosine similarity.
+
+    The category terms are embedded once, with the same embedder as the
+    messages. Labeling a batch is then one (rows x dim) @ (dim x terms)
+    product: every message gets the term with the highest score as `label`
+    (lowercased), that score as `best_score` and the term's main category as
+    `main_category`. With `top_k > 1` the `top_labels` and `top_scores`
+    columns hold the k best terms and their scores, best first.
+    """
+
+    def __init__(
+        self,
+        categories: Dict[str, List[str]],
+        embedder: Embedder,
+        top_k: int = 1,
+        min_score: Optional[float] = None,
+    ):
+        """
+        Initialize the labeler and embed the category terms.
+
+        Args:
+            categories: Main category -> category terms, as in data/categories.json.
+            embedder: Embedder that produced (or will produce) the message vectors.
+            top_k: Number of best terms kept per message in `top_labels`.
+            min_score: Messages whose best score is below this get no label or
+                       main category (their best_score is still recorded).
+        """
+        self.terms = [term for terms in categories.values() for term in terms]
+        if not self.terms:
+            raise ValueError("No category terms to label with")
+        self.labels = [term.lower() for term in self.terms]
+        self.main_categories = [main for main, terms in categories.items() for _ in terms]
+        self.top_k = min(top_k, len(self.terms))
+        self.min_score = min_score
+        none = [None] * len(self.terms)
+        embedded = embedder.embed_document_batch(DocumentBatch(none, none, none, list(self.terms)))
+        self.term_vectors = _normalize(embedded.embeddings)
+
+    def scores(self, embeddings: np.ndarray) -> np.ndarray:
+        """Cosine similarity of every message vector to every term, as a (rows x terms) matrix."""
+        return _normalize(embeddings) @ self.term_vectors.T
+
+    def label(self, embeddings: np.ndarray) -> Dict[str, List[Any]]:
+        """
+        Label message vectors.
+
+        Args:
+            embeddings: (rows x dim) message vectors.
+
+        Returns:
+            Payload columns (one value per row): label, best_score,
+            main_category, plus top_labels and top_scores if top_k > 1.
+        """
+        scores = self.scores(embeddings)
+        rows = np.arange(len(scores))
+        best = scores.argmax(axis=1)
+        best_scores = scores[rows, best]
+        labeled = best_scores >= self.min_score if self.min_score is not None else np.ones(len(rows), dtype=bool)
+        columns: Dict[str, List[Any]] = {
+            "label": [self.labels[i] if ok else None for i, ok in zip(best, labeled)],
+            "best_score": best_scores.tolist(),
+            "main_category": [self.main_categories[i] if ok else None for i, ok in zip(best, labeled)],
+        }
+        if self.top_k > 1:
+            top = np.argpartition(-scores, self.top_k - 1, axis=1)[:, :self.top_k]
+            top = np.take_along_axis(top, np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1), axis=1)
+            columns["top_labels"] = [[self.labels[i] for i in row] for row in top]
+            columns["top_scores"] = np.take_along_axis(scores, top, axis=1).tolist()
+        return columns
+
+    def label_batch(self, batch: EmbeddedBatch) -> EmbeddedBatch:
+        """Add the label columns to an embedded batch's payload; returns the same batch."""
+        if len(batch):
+            batch.payload.update(self.label(batch.embeddings))
+        return batch
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, np.finfo(np.float32).tiny)
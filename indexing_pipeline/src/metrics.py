@@ -0,0 +1,271 @@
+import cProfile
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Generator, Iterable, Iterator, List, Optional, Tuple, TypeVar, Union
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Upper bounds of the batch-size histogram buckets (rows); the last bucket is +Inf
+BATCH_SIZE_BUCKETS = (1, 8, 32, 64, 128, 256, 512, 1024, 4096)
+
+# Before Python 3.12 a cProfile profiler only sees the thread that enabled it;
+# from 3.12 it sees every thread, and only one can be active per process
+PROFILER_PER_THREAD = sys.version_info < (3, 12)
+
+
+@dataclass
+class StageMetrics:
+    """Counters for one pipeline stage (load, skip_existing, dedup, embed, label, index)."""
+
+    batches: int = 0
+    rows: int = 0
+    seconds: float = 0.0
+    errors: int = 0
+    # Number of batches per BATCH_SIZE_BUCKETS bucket, plus one for +Inf
+    batch_sizes: List[int] = field(default_factory=lambda: [0] * (len(BATCH_SIZE_BUCKETS) + 1))
+
+    @property
+    def rows_per_second(self) -> float:
+        """Rows per second of time spent inside the stage."""
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def observe(self, rows: int, seconds: float) -> None:
+        self.batches += 1
+        self.rows += rows
+        self.seconds += seconds
+        bucket = next((i for i, bound in enumerate(BATCH_SIZE_BUCKETS) if rows <= bound), len(BATCH_SIZE_BUCKETS))
+        self.batch_sizes[bucket] += 1
+
+
+@dataclass
+class QueueMetrics:
+    """Sampled depth of a queue between two stages."""
+
+    depth: int = 0
+    max_depth: int = 0
+
+
+class PipelineMetrics:
+    """
+    Per-stage timers, row counts, batch-size histograms, error counts and
+    queue depths of a pipeline run.
+
+    Stages record themselves with `stage()`. A summary line per stage is
+    logged every `report_interval` seconds (see `maybe_report`) and, if
+    `prometheus_path` is set, the same counters are written there in the
+    Prometheus text format (e.g. for node_exporter's textfile collector).
+    With `profile_dir` set, every stage runs under cProfile and
+    `write_profiles()` saves one `<stage>.prof` file per stage, which
+    `python -m pstats` or snakeviz can read. On Python 3.12+ only one
+    profiler can run at a time, so profiled stages then take turns: the
+    concurrent pipeline runs one stage at a time, and a profile also holds
+    whatever other threads did meanwhile. Pipeline threads are named
+    after their stage, so `py-spy dump` and `py-spy top` attribute samples
+    to stages as well.
+    """
+
+    def __init__(
+        self,
+        report_interval: float = 10.0,
+        prometheus_path: Optional[Union[str, Path]] = None,
+        profile_dir: Optional[Union[str, Path]] = None,
+    ):
+        """
+        Initialize empty metrics.
+
+        Args:
+            report_interval: Seconds between progress summaries.
+            prometheus_path: Optional file the counters are written to on every summary.
+            profile_dir: Optional directory for per-stage cProfile output.
+        """
+        self.report_interval = report_interval
+        self.prometheus_path = Path(prometheus_path) if prometheus_path else None
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+        self.stages: Dict[str, StageMetrics] = {}
+        self.queues: Dict[str, QueueMetrics] = {}
+        self.started = time.monotonic()
+        self._last_report = self.started
+        self._profiles: Dict[Tuple[str, int], cProfile.Profile] = {}
+        self._lock = threading.Lock()
+        # Held while a stage is profiled, where profilers see every thread
+        self._profile_lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str, rows: int = 0) -> Generator[None, None, None]:
+        """
+        Time one batch passing through a stage.
+
+        Args:
+            name: Stage name.
+            rows: Rows in the batch.
+
+        Raises:
+            Whatever the block raises; the stage's error count is incremented first.
+        """
+        with self._profiling(name):
+            started = time.perf_counter()
+            try:
+                yield
+            except BaseException:
+                with self._lock:
+                    self._stage(name).errors += 1
+                raise
+            seconds = time.perf_counter() - started
+        with self._lock:
+            self._stage(name).observe(rows, seconds)
+
+    def timed(self, name: str, iterable: Iterable[T], rows: Callable[[T], int] = len) -> Iterator[T]:
+        """
+        Yield the items of `iterable`, timing each `next()` as one batch of stage `name`.
+
+        Args:
+            name: Stage name, e.g. "load".
+            iterable: Lazily produced batches.
+            rows: Returns the number of rows in an item.
+        """
+        iterator = iter(iterable)
+        while True:
+            with self._profiling(name):
+                started = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                except BaseException:
+                    with self._lock:
+                        self._stage(name).errors += 1
+                    raise
+                seconds = time.perf_counter() - started
+            with self._lock:
+                self._stage(name).observe(rows(item), seconds)
+            yield item
+
+    def observe_queue(self, name: str, depth: int) -> None:
+        """Record a sample of a queue's depth."""
+        with self._lock:
+            metrics = self.queues.setdefault(name, QueueMetrics())
+            metrics.depth = depth
+            metrics.max_depth = max(metrics.max_depth, depth)
+
+    def maybe_report(self) -> None:
+        """Log a summary (and write the Prometheus file) if `report_interval` has passed."""
+        if time.monotonic() - self._last_report >= self.report_interval:
+            self.report()
+
+    def report(self) -> None:
+        """Log one key=value summary line per stage and queue, and write the Prometheus file."""
+        self._last_report = time.monotonic()
+        elapsed = self._last_report - self.started
+        with self._lock:
+            for name, stage in self.stages.items():
+                logger.info(
+                    "stage=%s batches=%d rows=%d seconds=%.3f rows_per_sec=%.1f errors=%d elapsed=%.1f",
+                    name, stage.batches, stage.rows, stage.seconds, stage.rows_per_second, stage.errors, elapsed,
+                )
+            for name, queue in self.queues.items():
+                logger.info("queue=%s depth=%d max_depth=%d", name, queue.depth, queue.max_depth)
+        if self.prometheus_path is not None:
+            self.write_prometheus(self.prometheus_path)
+
+    def prometheus_text(self) -> str:
+        """The counters in the Prometheus text exposition format."""
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str, samples: List[Tuple[str, float]]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(f"{name}{labels} {value}" for labels, value in samples)
+
+        with self._lock:
+            stages = sorted(self.stages.items())
+            queues = sorted(self.queues.items())
+            metric("pipeline_stage_batches_total", "counter", "Batches processed by the stage.",
+                   [(f'{{stage="{name}"}}', s.batches) for name, s in stages])
+            metric("pipeline_stage_rows_total", "counter", "Rows processed by the stage.",
+                   [(f'{{stage="{name}"}}', s.rows) for name, s in stages])
+            metric("pipeline_stage_seconds_total", "counter", "Time spent in the stage.",
+                   [(f'{{stage="{name}"}}', round(s.seconds, 6)) for name, s in stages])
+            metric("pipeline_stage_errors_total", "counter", "Batches that raised in the stage.",
+                   [(f'{{stage="{name}"}}', s.errors) for name, s in stages])
+
+            histogram = []
+            for name, s in stages:
+                cumulative = 0
+                for bound, count in zip(BATCH_SIZE_BUCKETS + ("+Inf",), s.batch_sizes):
+                    cumulative += count
+                    histogram.append((f'_bucket{{stage="{name}",le="{bound}"}}', cumulative))
+                histogram.append((f'_sum{{stage="{name}"}}', s.rows))
+                histogram.append((f'_count{{stage="{name}"}}', s.batches))
+            metric("pipeline_batch_size_rows", "histogram", "Rows per batch entering the stage.", histogram)
+
+            metric("pipeline_queue_depth", "gauge", "Batches waiting in the queue.",
+                   [(f'{{queue="{name}"}}', q.depth) for name, q in queues])
+            metric("pipeline_queue_depth_max", "gauge", "Highest sampled queue depth.",
+                   [(f'{{queue="{name}"}}', q.max_depth) for name, q in queues])
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Union[str, Path]) -> None:
+        """Write `prometheus_text()` to `path` atomically, so scrapers never read a partial file."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(self.prometheus_text(), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def write_profiles(self) -> List[Path]:
+        """Save the collected cProfile data as one `<stage>.prof` file per stage; returns the files."""
+        if self.profile_dir is None:
+            return []
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        by_stage: Dict[str, List[cProfile.Profile]] = {}
+        with self._lock:
+            for (name, _), profile in self._profiles.items():
+                by_stage.setdefault(name, []).append(profile)
+        paths = []
+        for name, profiles in sorted(by_stage.items()):
+            path = self.profile_dir / f"{name}.prof"
+            pstats.Stats(*profiles).dump_stats(path)
+            paths.append(path)
+        return paths
+
+    def _stage(self, name: str) -> StageMetrics:
+        # Callers hold self._lock
+        return self.stages.setdefault(name, StageMetrics())
+
+    @contextmanager
+    def _profiling(self, name: str) -> Generator[None, None, None]:
+        """Run the block under the stage's profiler, if profiling."""
+        if self.profile_dir is None:
+            yield
+        elif PROFILER_PER_THREAD:
+            with self._enabled(self._profile(name, threading.get_ident())):
+                yield
+        else:
+            # One profiler at a time, and it sees every thread: one per stage, taking turns
+            with self._profile_lock, self._enabled(self._profile(name, 0)):
+                yield
+
+    @staticmethod
+    @contextmanager
+    def _enabled(profile: cProfile.Profile) -> Generator[None, None, None]:
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+
+    def _profile(self, name: str, thread: int) -> cProfile.Profile:
+        with self._lock:
+            key = (name, thread)
+            if key not in self._profiles:
+                self._profiles[key] = cProfile.Profile()
+            return self._profiles[key]
@@ -1,5 +1,8 @@
-from dataclasses import dataclass
-from typing import List, Optional
+import calendar
+import hashlib
+from datetime import datetime
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
 import numpy as np
 
 
@@ -11,9 +14,109 @@ class Document:
     account: str
     message: str
 
+@dataclass
+class DocumentBatch:
+    """A batch of documents stored column-wise, one list per CSV column."""
+    time: List[Optional[str]]
+    location: List[Optional[str]]
+    account: List[Optional[str]]
+    message: List[Optional[str]]
+
+    def __len__(self) -> int:
+        return len(self.message)
+
+    def to_documents(self) -> List[Document]:
+        """Convert to one Document per row."""
+        return [Document(*row) for row in zip(self.time, self.location, self.account, self.message)]
+
+    @classmethod
+    def from_documents(cls, documents: List[Document]) -> "DocumentBatch":
+        """Build a batch from row-wise Documents."""
+        return cls(
+            time=[doc.time for doc in documents],
+            location=[doc.location for doc in documents],
+            account=[doc.account for doc in documents],
+            message=[doc.message for doc in documents],
+        )
+
+    def select(self, indices: Sequence[int]) -> "DocumentBatch":
+        """Return a new batch holding only the rows at `indices`, in that order."""
+        return DocumentBatch(
+            time=[self.time[i] for i in indices],
+            location=[self.location[i] for i in indices],
+            account=[self.account[i] for i in indices],
+            message=[self.message[i] for i in indices],
+        )
+
 @dataclass
 class EmbeddedDocument:
     """Represents a document with its embedding."""
     document: Document
     embedding: np.ndarray
-    embedding_model: str
\ No newline at end of file
+    embedding_model: str
+
+@dataclass
+class EmbeddedBatch:
+    """A DocumentBatch with its embeddings as one contiguous (rows x dim) float32 matrix."""
+    documents: DocumentBatch
+    embeddings: np.ndarray
+    embedding_model: str
+    # Extra payload columns stored with the points: field name -> one value per row
+    payload: Dict[str, List[Any]] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def to_embedded_documents(self) -> List[EmbeddedDocument]:
+        """Convert to one EmbeddedDocument per row; the embeddings are views into the matrix."""
+        return [
+            EmbeddedDocument(document=document, embedding=embedding, embedding_model=self.embedding_model)
+            for document, embedding in zip(self.documents.to_documents(), self.embeddings)
+        ]
+
+    @classmethod
+    def from_embedded_documents(cls, embedded_documents: List[EmbeddedDocument]) -> "EmbeddedBatch":
+        """Build a batch from row-wise EmbeddedDocuments."""
+        if not embedded_documents:
+            return cls(DocumentBatch([], [], [], []), np.empty((0, 0), dtype=np.float32), "")
+        return cls(
+            documents=DocumentBatch.from_documents([e.document for e in embedded_documents]),
+            embeddings=np.stack([np.asarray(e.embedding, dtype=np.float32) for e in embedded_documents]),
+            embedding_model=embedded_documents[0].embedding_model,
+        )
+
+
+def document_id(document: Document) -> int:
+    """
+    Stable 64-bit ID derived from a document's content.
+
+    Unlike Python's salted hash(), the same (time, location, account, message)
+    always maps to the same ID, so re-indexing a document overwrites its point.
+    """
+    return _content_id(document.time, document.location, document.account, document.message)
+
+
+def document_ids(batch: DocumentBatch) -> List[int]:
+    """document_id for every row of a DocumentBatch."""
+    return [_content_id(*row) for row in zip(batch.time, batch.location, batch.account, batch.message)]
+
+
+def _content_id(*values: Optional[str]) -> int:
+    key = "\x1f".join(value or "" for value in values)
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def timestamp(time: Optional[str]) -> Optional[int]:
+    """
+    Epoch seconds of a message time such as "2020-04-09 08:29:00".
+
+    Times carry no time zone and are read as UTC, so the stored number sorts
+    and compares exactly like the original string. Returns None if the time
+    cannot be parsed.
+    """
+    if not time:
+        return None
+    try:
+        return calendar.timegm(datetime.fromisoformat(time).utctimetuple())
+    except ValueError:
+        return None
@@ -1,9 +1,28 @@
-from typing import List
+import logging
+import queue
+import threading
+from typing import Any, Generator, Iterable, List, Optional, Tuple
 
+from src.checkpoint import Checkpoint
+from src.dedup import NearDuplicateDetector
 from src.embedding.embedder import Embedder
+from src.follower import FeedFollower
 from src.indexing.indexer import Indexer
+from src.labeling import CategoryLabeler
 from src.data_loader import DataLoader
-from src.models.document import Document
+from src.metrics import PipelineMetrics
+from src.models.document import DocumentBatch, EmbeddedBatch, document_ids
+
+logger = logging.getLogger(__name__)
+
+# A loaded batch: (documents, byte offset after its last row, file it was read from)
+Batch = Tuple[DocumentBatch, Optional[int], Optional[str]]
+
+# Marker put on a queue to tell the consumer that its producer has finished.
+_END = object()
+
+# How long a blocked put/get waits before re-checking the stop flag (seconds).
+_POLL_INTERVAL = 0.1
 
 
 class Pipeline:
@@ -14,25 +33,359 @@ class Pipeline:
         data_loader: DataLoader,
         embedder: Embedder,
         indexer: Indexer,
+        checkpoint: Optional[Checkpoint] = None,
+        metrics: Optional[PipelineMetrics] = None,
+        deduplicator: Optional[NearDuplicateDetector] = None,
+        labeler: Optional[CategoryLabeler] = None,
     ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            data_loader: Source of document batches.
+            embedder: Embedder for document batches.
+            indexer: Indexer that stores embedded batches.
+            checkpoint: Optional checkpoint. If set, each run resumes after the
+                        last batch a previous run fully indexed.
+            metrics: Per-stage metrics; progress is reported through them.
+                     Defaults to a PipelineMetrics that only logs summaries.
+            deduplicator: Optional near-duplicate detector. Only the first
+                          message of each near-duplicate group is encoded; the
+                          others reuse its vector and every point gets a
+                          `duplicate_group` payload field.
+            labeler: Optional category labeler; adds label, best_score and
+                     main_category to every point's payload.
+        """
         self.data_loader = data_loader
         self.embedder = embedder
         self.indexer = indexer
+        self.checkpoint = checkpoint
+        self.metrics = metrics or PipelineMetrics()
+        self.deduplicator = deduplicator
+        self.labeler = labeler
+
+    def run(
+        self,
+        batch_size: int = 32,
+        concurrent: bool = False,
+        queue_size: int = 4,
+        embed_workers: int = 1,
+        index_workers: int = 1,
+        ordered: bool = True,
+        skip_existing: bool = False,
+    ) -> None:
+        """
+        Run the complete pipeline.
+
+        Args:
+            batch_size: Number of documents per batch.
+            concurrent: If True, loading, embedding and indexing run as separate
+                        stages connected by bounded queues so they overlap.
+            queue_size: Maximum number of batches buffered between two stages
+                        in concurrent mode. A full queue blocks the upstream stage.
+            embed_workers: Number of embedding threads in concurrent mode.
+            index_workers: Number of indexing threads in concurrent mode.
+            ordered: In concurrent mode, hand batches to the indexer in the
+                     order they were loaded. If False, batches are indexed as
+                     soon as they are embedded.
+            skip_existing: Ask the indexer which documents are already stored
+                           and only embed and index the others.
+        """
+        batches = self.metrics.timed("load", self._load_batches(batch_size), rows=lambda batch: len(batch[0]))
+        try:
+            if concurrent:
+                self._run_concurrent(batches, queue_size, embed_workers, index_workers, ordered, skip_existing)
+            else:
+                logger.info("Starting pipeline...")
+                self._run_serial(batches, skip_existing)
+        finally:
+            self._finish()
+        indexed = self.metrics.stages.get("index")
+        logger.info("Pipeline completed successfully! Indexed %d documents", indexed.rows if indexed else 0)
+
+    def follow(self, follower: FeedFollower, skip_existing: bool = False, stop: Optional[threading.Event] = None) -> None:
+        """
+        Index messages continuously as they are appended to a growing feed.
+
+        Micro-batches produced by the follower are embedded and indexed as soon
+        as they are cut, so a message becomes searchable within roughly the
+        follower's `max_latency` plus one embed and upsert. With a checkpoint,
+        a restarted follow resumes at the last committed file and offset.
+
+        Args:
+            follower: Watches the feed file or directory and cuts micro-batches.
+            skip_existing: Ask the indexer which documents are already stored
+                           and only embed and index the others.
+            stop: Optional event that ends following once set.
+        """
+        start_file, start_offset = None, 0
+        if self.checkpoint is not None:
+            self.checkpoint.start()
+            start_file, start_offset = self.checkpoint.file, self.checkpoint.offset
+            if start_file is not None:
+                logger.info("Resuming feed at %s byte offset %d", start_file, start_offset)
+
+        logger.info("Following %s (max latency %ss)...", follower.path, follower.max_latency)
+        batches = (
+            (DocumentBatch.from_documents(documents), end_offset, source_file)
+            for documents, end_offset, source_file in follower.follow(start_file, start_offset, stop)
+        )
+        try:
+            self._run_serial(self.metrics.timed("load", batches, rows=lambda batch: len(batch[0])), skip_existing)
+        finally:
+            self._finish()
+        logger.info("Stopped following feed")
+
+    def _run_serial(self, batches: Iterable[Batch], skip_existing: bool) -> None:
+        """Embed and index batches one after another."""
+        for batch_idx, (documents, end_offset, source_file) in enumerate(batches):
+            rows = len(documents)
+
+            if skip_existing:
+                documents = self._drop_existing(documents)
+
+            if documents:
+                # Embed the message column into one embedding matrix
+                embedded = self._embed(documents)
+
+                # Index the embedded batch
+                self._index(embedded)
+
+            if self.checkpoint is not None:
+                self.checkpoint.ack(batch_idx, end_offset, rows, source_file)
+            self.metrics.maybe_report()
+
+    def _embed(self, documents: DocumentBatch) -> EmbeddedBatch:
+        if self.deduplicator is None:
+            return self._encode(documents)
+        with self.metrics.stage("dedup", len(documents)):
+            plan = self.deduplicator.plan(documents)
+        encoded = self._encode(documents.select(plan.embed_rows)) if plan.embed_rows else None
+        return self.deduplicator.complete(plan, encoded)
+
+    def _encode(self, documents: DocumentBatch) -> EmbeddedBatch:
+        with self.metrics.stage("embed", len(documents)):
+            return self.embedder.embed_document_batch(documents)
+
+    def _index(self, embedded: EmbeddedBatch) -> None:
+        if self.labeler is not None:
+            with self.metrics.stage("label", len(embedded)):
+                self.labeler.label_batch(embedded)
+        with self.metrics.stage("index", len(embedded)):
+            self.indexer.index_embedded_batch(embedded)
+
+    def _finish(self) -> None:
+        """Log the final summary and save profiles."""
+        self.metrics.report()
+        if self.deduplicator is not None:
+            logger.info(
+                "Near-duplicates: %d of %d documents reused a vector (%.1f%% of encodes saved)",
+                self.deduplicator.rows - self.deduplicator.encoded,
+                self.deduplicator.rows,
+                100 * self.deduplicator.saved_fraction,
+            )
+        for path in self.metrics.write_profiles():
+            logger.info("Wrote profile %s", path)
+
+    def _load_batches(self, batch_size: int) -> Generator[Batch, None, None]:
+        """Yield (documents, end byte offset, None) per batch, resuming from the checkpoint if set."""
+        start_offset = 0
+        if self.checkpoint is not None:
+            corpus_path = self.data_loader.corpus_path
+            file_size = corpus_path.stat().st_size if corpus_path and corpus_path.exists() else None
+            start_offset = self.checkpoint.start(file_size)
+            if start_offset:
+                logger.info("Resuming at byte offset %d (%d rows already indexed)", start_offset, self.checkpoint.rows)
+        for documents, end_offset in self.data_loader.load_column_batches_with_offsets(
+            batch_size, start_offset=start_offset
+        ):
+            yield documents, end_offset, None
+
+    def _drop_existing(self, documents: DocumentBatch) -> DocumentBatch:
+        """Remove documents whose points are already in the index."""
+        with self.metrics.stage("skip_existing", len(documents)):
+            ids = document_ids(documents)
+            present = self.indexer.existing_ids(ids)
+        if not present:
+            return documents
+        logger.debug("Skipping %d already indexed documents", len(present))
+        return documents.select([row for row, doc_id in enumerate(ids) if doc_id not in present])
+
+    def _run_concurrent(
+        self,
+        batches: Iterable[Batch],
+        queue_size: int,
+        embed_workers: int,
+        index_workers: int,
+        ordered: bool,
+        skip_existing: bool,
+    ) -> None:
+        """
+        Run loading, embedding and indexing as overlapping stages.
+
+        Each stage runs in its own thread(s). The stages are connected by bounded
+        queues, so a slow downstream stage applies back-pressure instead of
+        letting batches pile up in memory. The first exception raised by any
+        stage stops all stages and is re-raised in the calling thread.
+        """
+        if queue_size < 1 or embed_workers < 1 or index_workers < 1:
+            raise ValueError("queue_size, embed_workers and index_workers must be at least 1")
+
+        logger.info(
+            "Starting concurrent pipeline (%d embed / %d index workers, queue size %d)...",
+            embed_workers, index_workers, queue_size,
+        )
+
+        stop = threading.Event()
+        errors: List[BaseException] = []
+        embed_queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        index_queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        sequencer = _Sequencer(stop) if ordered else None
+        embedders_left = _Counter(embed_workers)
+
+        def fail(error: BaseException) -> None:
+            if not errors:
+                errors.append(error)
+            stop.set()
+
+        def load() -> None:
+            try:
+                for seq, (documents, end_offset, _) in enumerate(batches):
+                    if not _put(embed_queue, (seq, end_offset, documents), stop):
+                        return
+            except BaseException as e:
+                fail(e)
+            finally:
+                for _ in range(embed_workers):
+                    _put(embed_queue, _END, stop)
+
+        def embed() -> None:
+            try:
+                while True:
+                    item = _get(embed_queue, stop)
+                    if item is None or item is _END:
+                        return
+                    seq, end_offset, documents = item
+                    rows = len(documents)
+                    if skip_existing:
+                        documents = self._drop_existing(documents)
+                    embedded = self._embed(documents) if documents else None
+                    result = (seq, end_offset, rows, embedded)
+                    if sequencer is not None:
+                        if not sequencer.wait_turn(seq):
+                            return
+                        try:
+                            if not _put(index_queue, result, stop):
+                                return
+                        finally:
+                            sequencer.advance()
+                    elif not _put(index_queue, result, stop):
+                        return
+            except BaseException as e:
+                fail(e)
+            finally:
+                if embedders_left.decrement() == 0:
+                    for _ in range(index_workers):
+                        _put(index_queue, _END, stop)
+
+        def index() -> None:
+            try:
+                while True:
+                    item = _get(index_queue, stop)
+                    if item is None or item is _END:
+                        return
+                    seq, end_offset, rows, embedded = item
+                    if embedded is not None:
+                        self._index(embedded)
+                    if self.checkpoint is not None:
+                        self.checkpoint.ack(seq, end_offset, rows)
+            except BaseException as e:
+                fail(e)
+
+        threads = [threading.Thread(target=load, name="pipeline-load", daemon=True)]
+        threads += [
+            threading.Thread(target=embed, name=f"pipeline-embed-{i}", daemon=True)
+            for i in range(embed_workers)
+        ]
+        threads += [
+            threading.Thread(target=index, name=f"pipeline-index-{i}", daemon=True)
+            for i in range(index_workers)
+        ]
+
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(_POLL_INTERVAL)
+                    self.metrics.observe_queue("embed", embed_queue.qsize())
+                    self.metrics.observe_queue("index", index_queue.qsize())
+                    self.metrics.maybe_report()
+        except BaseException as e:
+            # e.g. KeyboardInterrupt: ask every stage to stop, then wait for them
+            fail(e)
+            for thread in threads:
+                thread.join()
+
+        if errors:
+            raise errors[0]
+
+
+class _Counter:
+    """Thread-safe integer counter."""
+
+    def __init__(self, value: int):
+        self.value = value
+        self._lock = threading.Lock()
+
+    def increment(self, amount: int = 1) -> int:
+        with self._lock:
+            self.value += amount
+            return self.value
+
+    def decrement(self) -> int:
+        return self.increment(-1)
+
+
+class _Sequencer:
+    """Lets workers hand off results strictly in sequence-number order."""
+
+    def __init__(self, stop: threading.Event):
+        self._next = 0
+        self._stop = stop
+        self._condition = threading.Condition()
+
+    def wait_turn(self, seq: int) -> bool:
+        """Block until `seq` is next in line. Returns False if the pipeline stopped."""
+        with self._condition:
+            while self._next != seq:
+                if self._stop.is_set():
+                    return False
+                self._condition.wait(_POLL_INTERVAL)
+            return True
+
+    def advance(self) -> None:
+        with self._condition:
+            self._next += 1
+            self._condition.notify_all()
+
+
+def _put(q: queue.Queue, item: Any, stop: threading.Event) -> bool:
+    """Put with back-pressure. Returns False if the pipeline stopped while waiting."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=_POLL_INTERVAL)
+            return True
+        except queue.Full:
+            continue
+    return False
+
 
-    def run(self, batch_size: int = 32) -> None:
-        """Run the complete pipeline."""
-        print("Starting pipeline...")
-        
-        # Load documents in batches
-        for batch_idx, documents in enumerate(self.data_loader.load_in_batches(batch_size)):
-            print(f"Processing batch {batch_idx + 1} with {len(documents)} documents...")
-            
-            # Embed documents directly
-            embedded_documents = self.embedder.embed_batch(documents)
-            print(f"Generated embeddings for {len(embedded_documents)} documents")
-            
-            # Index embedded documents
-            self.indexer.index_batch(embedded_documents)
-            print(f"Indexed {len(embedded_documents)} documents")
-        
-        print("Pipeline completed successfully!")
+def _get(q: queue.Queue, stop: threading.Event) -> Optional[Any]:
+    """Get that gives up (returns None) once the pipeline is stopped."""
+    while not stop.is_set():
+        try:
+            return q.get(timeout=_POLL_INTERVAL)
+        except queue.Empty:
+            continue
+    return None
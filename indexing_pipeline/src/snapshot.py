@@ -0,0 +1,311 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import PayloadSchemaType
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from pyarrow import ipc
+except ImportError:  # pyarrow is optional (the `fast` extra); only snapshots need it
+    pa = None
+
+from src.indexing.qdrant_indexer import PAYLOAD_INDEXES, QdrantIndexer
+
+# Point IDs are unsigned 64-bit integers (see document_id), spread evenly over this range
+ID_SPACE = 1 << 64
+
+# Snapshot file extension per format
+EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+# ids, (rows x dim) float32 vectors, payloads
+PointColumns = Tuple[List[int], np.ndarray, List[Dict[str, Any]]]
+
+
+def export_collection(
+    client: QdrantClient,
+    collection_name: str,
+    directory: Union[str, Path],
+    shards: int = 1,
+    workers: int = 1,
+    page_size: int = 1024,
+    format: str = "parquet",
+) -> int:
+    """
+    Stream every point of a collection, with its vector, into snapshot files.
+
+    Points are read with `scroll` pages, following each page's next offset
+    until the end, so nothing is truncated. With `shards > 1` the 64-bit ID
+    space is cut into equal ranges that are scrolled independently (by
+    `workers` threads) and written to their own files. Each file holds an
+    `id` column, one column per payload field and a `vector` column of
+    fixed-size float32 lists; the vector size, distance and source
+    collection are kept in the schema metadata. A file is started anew when
+    a page brings payload fields the current file does not have, or values
+    that do not fit a column's type.
+
+    Args:
+        client: Qdrant client.
+        collection_name: Collection to export.
+        directory: Directory receiving the snapshot files (created if needed).
+        shards: Number of ID ranges exported independently.
+        workers: Threads exporting shards concurrently. Use 1 with an
+                 in-process client, which is not thread-safe.
+        page_size: Points per scroll request.
+        format: "parquet" or "arrow" (Arrow IPC file).
+
+    Returns:
+        Number of exported points.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+        ValueError: If the format is unknown or the collection has named vectors.
+    """
+    _require_pyarrow()
+    if format not in EXTENSIONS:
+        raise ValueError(f"Unknown snapshot format: {format!r} (expected 'parquet' or 'arrow')")
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    params = client.get_collection(collection_name).config.params.vectors
+    if isinstance(params, dict):
+        raise ValueError("Collections with named vectors are not supported")
+    metadata = {
+        "collection": collection_name,
+        "vector_size": str(params.size),
+        "distance": params.distance.value,
+    }
+    bounds = [shard * ID_SPACE // shards for shard in range(shards + 1)]
+
+    def export_shard(shard: int) -> int:
+        writer = _ShardWriter(directory, f"part-{shard:05d}", format, metadata)
+        offset: Optional[int] = bounds[shard]
+        rows = 0
+        try:
+            while offset is not None:
+                points, offset = client.scroll(
+                    collection_name=collection_name,
+                    limit=page_size,
+                    offset=offset,
+                    with_payload=True,
+                    with_vectors=True,
+                )
+                # Pages are in ID order; stop at the next shard's range
+                points = [point for point in points if point.id < bounds[shard + 1]]
+                if offset is not None and offset >= bounds[shard + 1]:
+                    offset = None
+                if points:
+                    writer.write(points)
+                    rows += len(points)
+        finally:
+            writer.close()
+        return rows
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        return sum(executor.map(export_shard, range(shards)))
+
+
+def snapshot_files(directory: Union[str, Path]) -> List[Path]:
+    """The snapshot files in a directory, in export order."""
+    directory = Path(directory)
+    return sorted(path for ext in EXTENSIONS.values() for path in directory.glob(f"*{ext}"))
+
+
+def snapshot_metadata(directory: Union[str, Path]) -> Dict[str, str]:
+    """Schema metadata of a snapshot: source collection, vector_size and distance."""
+    _require_pyarrow()
+    files = snapshot_files(directory)
+    if not files:
+        raise FileNotFoundError(f"No snapshot files in {directory}")
+    metadata = _read_schema(files[0]).metadata or {}
+    return {key.decode(): value.decode() for key, value in metadata.items()}
+
+
+def read_snapshot(directory: Union[str, Path], batch_size: int = 1024) -> Iterator[PointColumns]:
+    """
+    Yield the points of a snapshot in batches.
+
+    Args:
+        directory: Snapshot directory written by `export_collection`.
+        batch_size: Maximum points per batch.
+
+    Yields:
+        (ids, vector matrix, payloads) per batch. Null payload values (fields
+        a point did not have) are left out of its payload.
+    """
+    _require_pyarrow()
+    for path in snapshot_files(directory):
+        for record_batch in _iter_batches(path, batch_size):
+            vectors = record_batch.column("vector")
+            dim = vectors.type.list_size
+            matrix = vectors.flatten().to_numpy(zero_copy_only=False).reshape(-1, dim)
+            fields = [name for name in record_batch.schema.names if name not in ("id", "vector")]
+            columns = [record_batch.column(name).to_pylist() for name in fields]
+            payloads = [
+                {name: value for name, value in zip(fields, values) if value is not None}
+                for values in zip(*columns)
+            ] if fields else [{} for _ in range(record_batch.num_rows)]
+            yield record_batch.column("id").to_pylist(), matrix, payloads
+
+
+def import_snapshot(
+    directory: Union[str, Path],
+    indexer: QdrantIndexer,
+    batch_size: int = 1024,
+    workers: int = 1,
+) -> int:
+    """
+    Bulk-load a snapshot into the indexer's collection, keeping point IDs.
+
+    Runs inside `indexer.bulk_load()`: uploads are not acknowledged one by
+    one and HNSW indexing waits until every point is in, so the restore is
+    bound by reading files and sending batches.
+
+    Args:
+        directory: Snapshot directory written by `export_collection`.
+        indexer: Indexer whose collection receives the points.
+        batch_size: Points per upsert.
+        workers: Concurrent uploads. Use 1 with an in-process client.
+
+    Returns:
+        Number of imported points.
+    """
+    rows = 0
+    with indexer.bulk_load():
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            # Bounded number of batches in flight, so memory does not grow with the snapshot
+            slots = threading.BoundedSemaphore(2 * max(1, workers))
+            futures = []
+            for ids, vectors, payloads in read_snapshot(directory, batch_size):
+                slots.acquire()
+                # Forget finished uploads; result() re-raises a failed upload's error right away
+                futures = [future for future in futures if not future.done() or future.result()]
+                future = executor.submit(indexer.upsert_batch, ids, vectors, payloads)
+                future.add_done_callback(lambda _: slots.release())
+                futures.append(future)
+                rows += len(ids)
+            for future in futures:
+                future.result()
+    return rows
+
+
+class _ShardWriter:
+    """Writes pages of points to `<prefix>-<n>` files, starting a new file when the payload fields or types change."""
+
+    def __init__(self, directory: Path, prefix: str, format: str, metadata: Dict[str, str]):
+        self.directory = directory
+        self.prefix = prefix
+        self.format = format
+        self.metadata = metadata
+        self.files = 0
+        self.schema = None
+        self._writer = None
+
+    def write(self, points: List[Any]) -> None:
+        table = self._table(points)
+        if self.schema is not None and not self._fits(table.schema):
+            self.close()
+        if self._writer is None:
+            self._open(table.schema)
+        self._writer.write_table(_conform(table, self.schema))
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def _open(self, schema: "pa.Schema") -> None:
+        fields = {field.name: field for field in schema}
+        if self.schema is not None:
+            # Keep the previous file's columns, and their types where this page's values fit them
+            previous = {field.name: field for field in self.schema}
+            fields = {
+                **previous,
+                **{
+                    name: field for name, field in fields.items()
+                    if name not in previous or not _type_fits(field.type, previous[name].type)
+                },
+            }
+        # A field that was None on the whole page gets its indexed type, or string
+        fields = [
+            field.with_type(_null_field_type(field.name)) if pa.types.is_null(field.type) else field
+            for field in fields.values()
+        ]
+        self.schema = pa.schema(fields, metadata=self.metadata)
+        path = self.directory / f"{self.prefix}-{self.files:05d}{EXTENSIONS[self.format]}"
+        self.files += 1
+        if self.format == "parquet":
+            self._writer = pq.ParquetWriter(path, self.schema)
+        else:
+            self._writer = ipc.new_file(path, self.schema)
+
+    def _fits(self, schema: "pa.Schema") -> bool:
+        """Whether a page can be written to the current file without new columns or lossy casts."""
+        known = {field.name: field.type for field in self.schema}
+        return all(field.name in known and _type_fits(field.type, known[field.name]) for field in schema)
+
+    @staticmethod
+    def _table(points: List[Any]) -> "pa.Table":
+        if isinstance(points[0].vector, dict):
+            raise ValueError("Collections with named vectors are not supported")
+        vectors = np.asarray([point.vector for point in points], dtype=np.float32)
+        payloads = [point.payload or {} for point in points]
+        fields = list(dict.fromkeys(name for payload in payloads for name in payload))
+        columns = {"id": pa.array([point.id for point in points], type=pa.uint64())}
+        for name in fields:
+            columns[name] = pa.array([payload.get(name) for payload in payloads])
+        columns["vector"] = pa.FixedSizeListArray.from_arrays(pa.array(vectors.ravel()), vectors.shape[1])
+        return pa.table(columns)
+
+
+def _type_fits(page_type: "pa.DataType", file_type: "pa.DataType") -> bool:
+    return (
+        pa.types.is_null(page_type)
+        or page_type == file_type
+        or (pa.types.is_integer(page_type) and pa.types.is_floating(file_type))
+    )
+
+
+def _null_field_type(name: str) -> "pa.DataType":
+    return {
+        PayloadSchemaType.INTEGER: pa.int64(),
+        PayloadSchemaType.FLOAT: pa.float64(),
+    }.get(PAYLOAD_INDEXES.get(name), pa.string())
+
+
+def _conform(table: "pa.Table", schema: "pa.Schema") -> "pa.Table":
+    """Reorder and cast a page's columns to the file schema, adding missing fields as nulls."""
+    columns = [
+        table.column(field.name).cast(field.type) if field.name in table.schema.names
+        else pa.nulls(table.num_rows, field.type)
+        for field in schema
+    ]
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def _iter_batches(path: Path, batch_size: int) -> Iterator["pa.RecordBatch"]:
+    if path.suffix == EXTENSIONS["parquet"]:
+        yield from pq.ParquetFile(path).iter_batches(batch_size=batch_size)
+        return
+    with pa.memory_map(str(path)) as source:
+        reader = ipc.open_file(source)
+        for index in range(reader.num_record_batches):
+            record_batch = reader.get_batch(index)
+            for start in range(0, record_batch.num_rows, batch_size):
+                yield record_batch.slice(start, batch_size)
+
+
+def _read_schema(path: Path) -> "pa.Schema":
+    if path.suffix == EXTENSIONS["parquet"]:
+        return pq.read_schema(path)
+    with pa.memory_map(str(path)) as source:
+        return ipc.open_file(source).schema
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("Snapshots need pyarrow: install the `fast` extra (uv sync --extra fast)")
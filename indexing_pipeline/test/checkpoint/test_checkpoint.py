@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from src.checkpoint import Checkpoint
+
+
+class TestCheckpoint:
+    """Test cases for Checkpoint class."""
+
+    @pytest.fixture
+    def checkpoint_path(self, tmp_path):
+        return tmp_path / "checkpoint.json"
+
+    def test_new_checkpoint_starts_at_zero(self, checkpoint_path):
+        """Test that a missing checkpoint file means starting from the beginning."""
+        checkpoint = Checkpoint(checkpoint_path, source="corpus.csv")
+
+        assert checkpoint.start() == 0
+        assert not checkpoint_path.exists()
+
+    def test_ack_persists_offset(self, checkpoint_path):
+        """Test that acknowledged batches are saved and reloaded."""
+        checkpoint = Checkpoint(checkpoint_path, source="corpus.csv")
+        checkpoint.start()
+        checkpoint.ack(0, end_offset=100, rows=2)
+        checkpoint.ack(1, end_offset=180, rows=2)
+
+        reloaded = Checkpoint(checkpoint_path, source="corpus.csv")
+
+        assert reloaded.start() == 180
+        assert reloaded.rows == 4
+
+    def test_out_of_order_acks_wait_for_gaps(self, checkpoint_path):
+        """Test that the offset only advances over contiguous acknowledged batches."""
+        checkpoint = Checkpoint(checkpoint_path, source="corpus.csv")
+        checkpoint.start()
+
+        checkpoint.ack(1, end_offset=180, rows=2)
+        assert checkpoint.offset == 0
+
+        checkpoint.ack(0, end_offset=100, rows=2)
+        assert checkpoint.offset == 180
+        assert json.loads(checkpoint_path.read_text())["offset"] == 180
+
+    def test_hold_saves_only_on_success(self, checkpoint_path):
+        """Test that progress acknowledged inside hold() is saved when the block exits, and not after an error."""
+        checkpoint = Checkpoint(checkpoint_path, source="corpus.csv")
+        checkpoint.start()
+        with checkpoint.hold():
+            checkpoint.ack(0, end_offset=100, rows=2)
+            assert not checkpoint_path.exists()
+        assert json.loads(checkpoint_path.read_text())["offset"] == 100
+
+        with pytest.raises(RuntimeError):
+            with checkpoint.hold():
+                checkpoint.ack(1, end_offset=180, rows=2)
+                raise RuntimeError("upload failed")
+        assert Checkpoint(checkpoint_path, source="corpus.csv").start() == 100
+
+    def test_other_source_is_ignored(self, checkpoint_path):
+        """Test that a checkpoint written for another corpus is not reused."""
+        checkpoint = Checkpoint(checkpoint_path, source="corpus.csv")
+        checkpoint.start()
+        checkpoint.ack(0, end_offset=100, rows=2)
+
+        assert Checkpoint(checkpoint_path, source="other.csv").start() == 0
+
+    def test_shrunken_file_restarts(self, checkpoint_path):
+        """Test that a corpus file smaller than the saved offset restarts from zero."""
+        checkpoint = Checkpoint(checkpoint_path, source="corpus.csv")
+        checkpoint.start()
+        checkpoint.ack(0, end_offset=100, rows=2)
+
+        assert checkpoint.start(file_size=50) == 0
+        assert checkpoint.rows == 0
+
+    def test_reset(self, checkpoint_path):
+        """Test that reset forgets all progress."""
+        checkpoint = Checkpoint(checkpoint_path, source="corpus.csv")
+        checkpoint.start()
+        checkpoint.ack(0, end_offset=100, rows=2)
+        checkpoint.reset()
+
+        assert Checkpoint(checkpoint_path, source="corpus.csv").start() == 0
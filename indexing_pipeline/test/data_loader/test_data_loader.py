@@ -7,8 +7,9 @@ from unittest.mock import patch
 import sys
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
+import src.data_loader
 from src.data_loader import DataLoader
-from src.models.document import Document
+from src.models.document import Document, DocumentBatch
 
 
 class TestDataLoader:
@@ -210,4 +211,131 @@ class TestDataLoader:
             assert doc.account == "用户1"
             assert "🚨" in doc.message
         finally:
-            Path(temp_path).unlink(missing_ok=True)
\ No newline at end of file
+            Path(temp_path).unlink(missing_ok=True)
+
+    def test_load_batches_with_offsets_resume(self, data_loader, sample_csv_data):
+        """Test that resuming from a yielded offset continues with the next row."""
+        batches = list(data_loader.load_batches_with_offsets(batch_size=2))
+        _, end_offset = batches[0]
+
+        resumed = list(data_loader.load_batches_with_offsets(batch_size=2, start_offset=end_offset))
+
+        assert [doc.message for doc in resumed[0][0]] == [row["message"] for row in sample_csv_data[2:4]]
+        assert sum(len(batch) for batch, _ in resumed) == len(sample_csv_data) - 2
+        assert resumed[-1][1] == Path(data_loader.corpus_path).stat().st_size
+
+    def test_load_batches_with_offsets_multiline_message(self):
+        """Test that offsets stay correct when a quoted message spans several lines."""
+        rows = [
+            {"time": "t1", "location": "Weston", "account": "a", "message": "line one\nline two"},
+            {"time": "t2", "location": "Weston", "account": "b", "message": "après"},
+        ]
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=["time", "location", "account", "message"])
+            writer.writeheader()
+            writer.writerows(rows)
+            temp_path = f.name
+
+        try:
+            loader = DataLoader(corpus_path=temp_path)
+            (first, offset), _ = list(loader.load_batches_with_offsets(batch_size=1))
+            assert first[0].message == "line one\nline two"
+
+            resumed = list(loader.load_messages_from_csv(start_offset=offset))
+            assert [doc.message for doc in resumed[0]] == ["après"]
+        finally:
+            Path(temp_path).unlink(missing_ok=True)
+
+    @pytest.mark.parametrize("use_pyarrow", [True, False])
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_load_column_batches_matches_row_loader(self, monkeypatch, use_pyarrow, workers):
+        """Test that the columnar loader returns the same rows as the row loader, in order."""
+        if use_pyarrow:
+            pytest.importorskip("pyarrow")
+        else:
+            monkeypatch.setattr(src.data_loader, "pa", None)
+        rows = [
+            {"time": f"t{i}", "location": "Weston", "account": f"user{i}",
+             "message": f"line one\nline \"{i}\"" if i % 7 == 0 else f"message {i}"}
+            for i in range(50)
+        ]
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=["time", "location", "account", "message"])
+            writer.writeheader()
+            writer.writerows(rows)
+            temp_path = f.name
+
+        try:
+            loader = DataLoader(corpus_path=temp_path)
+            expected = list(loader.load_messages_from_csv())[0]
+            batches = list(loader.load_column_batches(batch_size=8, workers=workers, chunk_bytes=100))
+
+            assert all(isinstance(batch, DocumentBatch) for batch in batches)
+            assert [len(batch) for batch in batches] == [8] * 6 + [2]
+            assert [doc for batch in batches for doc in batch.to_documents()] == expected
+        finally:
+            Path(temp_path).unlink(missing_ok=True)
+
+    @pytest.mark.parametrize("use_pyarrow", [True, False])
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_load_column_batches_with_offsets_resume(self, monkeypatch, use_pyarrow, workers):
+        """Test that column batch offsets match the row loader's and resume with the next row."""
+        if use_pyarrow:
+            pytest.importorskip("pyarrow")
+        else:
+            monkeypatch.setattr(src.data_loader, "pa", None)
+        rows = [
+            {"time": f"t{i}", "location": "Weston", "account": f"user{i}",
+             "message": f"line one\r\nline \"{i}\"" if i % 7 == 0 else f"message {i}"}
+            for i in range(50)
+        ]
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=["time", "location", "account", "message"])
+            writer.writeheader()
+            writer.writerows(rows)
+            f.write("\r\n")  # trailing blank line
+            temp_path = f.name
+
+        try:
+            loader = DataLoader(corpus_path=temp_path)
+            expected = [offset for _, offset in loader.load_batches_with_offsets(batch_size=8)]
+            batches = list(loader.load_column_batches_with_offsets(batch_size=8, workers=workers, chunk_bytes=100))
+            assert [offset for _, offset in batches[:-1]] == expected[:-1]
+            assert batches[-1][1] == Path(temp_path).stat().st_size - 2  # the blank line is not part of a row
+
+            resumed = list(loader.load_column_batches_with_offsets(
+                batch_size=8, workers=workers, chunk_bytes=100, start_offset=batches[2][1]
+            ))
+            assert resumed[0][0].account[0] == "user24"
+            assert sum(len(batch) for batch, _ in resumed) == 50 - 24
+        finally:
+            Path(temp_path).unlink(missing_ok=True)
+
+    def test_load_column_batches_missing_columns(self):
+        """Test that columns missing from the CSV are filled with None."""
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=["time", "account"])
+            writer.writeheader()
+            writer.writerow({"time": "2024-01-01 10:00:00", "account": "user1"})
+            temp_path = f.name
+
+        try:
+            batch = next(DataLoader(corpus_path=temp_path).load_column_batches())
+            assert batch.account == ["user1"]
+            assert batch.message == [None]
+        finally:
+            Path(temp_path).unlink(missing_ok=True)
+
+    def test_load_column_batches_file_not_found(self):
+        """Test the columnar loader with a non-existent file."""
+        with pytest.raises(FileNotFoundError, match="Corpus file not found"):
+            list(DataLoader(corpus_path="/non/existent/file.csv").load_column_batches())
+
+    def test_document_batch_round_trip(self, sample_csv_data):
+        """Test converting between Documents and a DocumentBatch."""
+        documents = [Document(**row) for row in sample_csv_data]
+        batch = DocumentBatch.from_documents(documents)
+
+        assert len(batch) == len(documents)
+        assert batch.location[1] == "Uptown"
+        assert batch.to_documents() == documents
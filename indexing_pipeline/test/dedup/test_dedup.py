@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from src.dedup import NearDuplicateDetector, normalize_for_dedup
+from src.models.document import Document, DocumentBatch, EmbeddedBatch, document_id
+
+BRIDGE = "The Jade Bridge is closed until further notice. This is a precautionary action pending safety inspection."
+
+
+def make_batch(messages):
+    return DocumentBatch.from_documents([Document("t", "l", f"a{i}", m) for i, m in enumerate(messages)])
+
+
+def encode(batch, plan):
+    """Encode the planned rows with one distinct vector per message (its length, a marker)."""
+    if not plan.embed_rows:
+        return None
+    rows = batch.select(plan.embed_rows)
+    vectors = np.array([[float(len(m)), 1.0] for m in rows.message], dtype=np.float32)
+    return EmbeddedBatch(rows, vectors, "model")
+
+
+def run(detector, messages):
+    batch = make_batch(messages)
+    plan = detector.plan(batch)
+    return plan, detector.complete(plan, encode(batch, plan))
+
+
+class TestNormalizeForDedup:
+    """Test cases for normalize_for_dedup."""
+
+    def test_strips_repost_prefixes_case_and_punctuation(self):
+        """Test that reposts, case and punctuation do not distinguish messages."""
+        assert normalize_for_dedup("re: RE:Fire on Main St.!!") == normalize_for_dedup("fire on main st")
+        assert normalize_for_dedup("see https://x.example/a now") == "see now"
+        assert normalize_for_dedup(None) == ""
+
+
+class TestNearDuplicateDetector:
+    """Test cases for NearDuplicateDetector class."""
+
+    def test_groups_reposts_and_small_edits(self):
+        """Test that reposts and slightly edited copies share the first message's group and vector."""
+        detector = NearDuplicateDetector()
+        messages = [BRIDGE, "re: " + BRIDGE.upper(), BRIDGE + " ok!!", "Power is out downtown"]
+
+        plan, embedded = run(detector, messages)
+
+        first = document_id(Document("t", "l", "a0", BRIDGE))
+        groups = embedded.payload["duplicate_group"]
+        assert groups[:3] == [first, first, first]
+        assert groups[3] != first
+        assert plan.embed_rows == [0, 3]
+        assert (embedded.embeddings[1] == embedded.embeddings[0]).all()
+        assert (embedded.embeddings[2] == embedded.embeddings[0]).all()
+
+    def test_templated_messages_with_different_names_stay_apart(self):
+        """Test that posts differing in a place name are not merged at the default threshold."""
+        detector = NearDuplicateDetector()
+
+        plan, embedded = run(detector, [BRIDGE, BRIDGE.replace("Jade", "Tranky Doo")])
+
+        assert len(set(embedded.payload["duplicate_group"])) == 2
+        assert plan.embed_rows == [0, 1]
+
+    def test_reuses_vectors_across_batches(self):
+        """Test that a duplicate of a message from an earlier batch is not encoded again."""
+        detector = NearDuplicateDetector()
+        _, first = run(detector, [BRIDGE])
+
+        plan, second = run(detector, ["Re: " + BRIDGE])
+
+        assert plan.embed_rows == []
+        assert plan.reused.keys() == {0}
+        assert (second.embeddings == first.embeddings).all()
+        assert second.embedding_model == "model"
+        assert second.payload["duplicate_group"] == first.payload["duplicate_group"]
+        assert detector.rows == 2 and detector.encoded == 1
+        assert detector.saved_fraction == pytest.approx(0.5)
+
+    def test_pending_group_is_encoded_by_its_duplicate(self):
+        """Test that a duplicate of a group still being encoded elsewhere is encoded itself."""
+        detector = NearDuplicateDetector()
+        detector.plan(make_batch([BRIDGE]))  # never completed, like a batch still in another worker
+
+        plan, embedded = run(detector, ["re: " + BRIDGE])
+
+        assert plan.embed_rows == [0]
+        assert embedded.embeddings[0, 0] == len("re: " + BRIDGE)
+
+    def test_evicts_oldest_groups(self):
+        """Test that groups beyond max_groups are forgotten."""
+        detector = NearDuplicateDetector(max_groups=1)
+        run(detector, [BRIDGE, "Power is out downtown"])
+
+        plan, _ = run(detector, ["re: " + BRIDGE])
+
+        assert plan.embed_rows == [0]
+
+    def test_rejects_uneven_bands(self):
+        """Test that the signature length must split evenly into bands."""
+        with pytest.raises(ValueError):
+            NearDuplicateDetector(num_perm=100, bands=16)
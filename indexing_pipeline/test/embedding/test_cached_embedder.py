@@ -0,0 +1,138 @@
+import pytest
+import numpy as np
+from unittest.mock import Mock
+
+from src.embedding.embedder import Embedder
+from src.embedding.cached_embedder import CachedEmbedder, EmbeddingCache, cache_key, normalize_text
+from src.models.document import Document, DocumentBatch, EmbeddedDocument
+
+
+def make_document(message):
+    return Document(time="2020-04-06 00:00:00", location="Weston", account="user1", message=message)
+
+
+def fake_embed_batch(documents):
+    """Deterministic 4-dimensional embedding derived from the message length."""
+    return [
+        EmbeddedDocument(
+            document=doc,
+            embedding=np.full(4, float(len(doc.message)), dtype=np.float32),
+            embedding_model="fake-model",
+        )
+        for doc in documents
+    ]
+
+
+class FakeEmbedder(Embedder):
+    model_name = "fake-model"
+
+    def embed_batch(self, documents):
+        return fake_embed_batch(documents)
+
+
+class TestEmbeddingCache:
+    """Test cases for EmbeddingCache class."""
+
+    def test_put_and_get(self, tmp_path):
+        """Test that stored vectors are returned as float32 arrays."""
+        cache = EmbeddingCache(tmp_path)
+        cache.put_many({"a": np.array([1.0, 2.0, 3.0]), "b": np.array([4.0, 5.0, 6.0])})
+
+        found = cache.get_many(["a", "b", "missing"])
+
+        assert set(found) == {"a", "b"}
+        assert found["b"].dtype == np.float32
+        assert np.array_equal(found["a"], [1.0, 2.0, 3.0])
+        assert len(cache) == 2
+
+    def test_persists_across_instances(self, tmp_path):
+        """Test that a reopened cache still holds earlier vectors."""
+        cache = EmbeddingCache(tmp_path, dtype="float16")
+        cache.put_many({"a": np.array([0.5, 0.25])})
+        cache.close()
+
+        reopened = EmbeddingCache(tmp_path)
+
+        assert reopened.dtype == np.float16
+        assert np.array_equal(reopened.get_many(["a"])["a"], [0.5, 0.25])
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Test that a full cache evicts the least recently used entry."""
+        cache = EmbeddingCache(tmp_path, max_bytes=2 * 2 * 4)  # two 2-dim float32 vectors
+        cache.put_many({"a": np.array([1.0, 1.0])})
+        cache.put_many({"b": np.array([2.0, 2.0])})
+        cache.get_many(["a"])  # "b" is now least recently used
+
+        cache.put_many({"c": np.array([3.0, 3.0])})
+
+        assert set(cache.get_many(["a", "b", "c"])) == {"a", "c"}
+        assert (tmp_path / "vectors.bin").stat().st_size <= 2 * 2 * 4
+
+    def test_rejects_dimension_mismatch(self, tmp_path):
+        """Test that vectors with a different dimension are rejected."""
+        cache = EmbeddingCache(tmp_path)
+        cache.put_many({"a": np.array([1.0, 2.0])})
+
+        with pytest.raises(ValueError, match="2-dimensional"):
+            cache.put_many({"b": np.array([1.0, 2.0, 3.0])})
+
+    def test_cache_key_normalizes_whitespace(self):
+        """Test that keys ignore whitespace differences but not model names."""
+        assert normalize_text("  re:  Power\toutage \n") == "re: Power outage"
+        assert cache_key("m", "Power  outage") == cache_key("m", "Power outage ")
+        assert cache_key("m", "Power outage") != cache_key("other", "Power outage")
+
+
+class TestCachedEmbedder:
+    """Test cases for CachedEmbedder class."""
+
+    @pytest.fixture
+    def inner_embedder(self):
+        """An Embedder whose embed_batch is a Mock, so the default batch path is exercised."""
+        embedder = FakeEmbedder()
+        embedder.embed_batch = Mock(side_effect=fake_embed_batch)
+        return embedder
+
+    def test_in_batch_duplicates_encoded_once(self, tmp_path, inner_embedder):
+        """Test that repeated texts within one batch are encoded once."""
+        embedder = CachedEmbedder(inner_embedder, tmp_path)
+        documents = [make_document("help"), make_document("fire!"), make_document("help")]
+
+        embedded = embedder.embed_batch(documents)
+
+        encoded = inner_embedder.embed_batch.call_args[0][0]
+        assert [doc.message for doc in encoded] == ["help", "fire!"]
+        assert [e.document for e in embedded] == documents
+        assert np.array_equal(embedded[2].embedding, embedded[0].embedding)
+        assert embedded[0].embedding_model == "fake-model"
+        assert (embedder.hits, embedder.misses) == (1, 2)
+
+    def test_second_run_served_from_disk(self, tmp_path, inner_embedder):
+        """Test that a new embedder over the same cache directory does not re-encode."""
+        documents = [make_document("help"), make_document("fire!")]
+        first = CachedEmbedder(inner_embedder, tmp_path).embed_batch(documents)
+        inner_embedder.embed_batch.reset_mock()
+
+        second = CachedEmbedder(inner_embedder, tmp_path).embed_batch(documents)
+
+        inner_embedder.embed_batch.assert_not_called()
+        for a, b in zip(first, second):
+            assert np.array_equal(a.embedding, b.embedding)
+
+    def test_empty_batch(self, tmp_path, inner_embedder):
+        """Test embedding an empty list of documents."""
+        assert CachedEmbedder(inner_embedder, tmp_path).embed_batch([]) == []
+        inner_embedder.embed_batch.assert_not_called()
+
+    def test_embed_document_batch(self, tmp_path, inner_embedder):
+        """Test that a column-wise batch gets one contiguous float32 matrix in row order."""
+        embedder = CachedEmbedder(inner_embedder, tmp_path)
+        batch = DocumentBatch.from_documents([make_document("a"), make_document("bbb"), make_document("a")])
+
+        embedded = embedder.embed_document_batch(batch)
+
+        assert embedded.documents is batch
+        assert embedded.embeddings.shape == (3, 4)
+        assert embedded.embeddings.dtype == np.float32
+        assert embedded.embeddings[:, 0].tolist() == [1.0, 3.0, 1.0]
+        assert inner_embedder.embed_batch.call_count == 1
@@ -6,7 +6,7 @@ import sys
 
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
-from src.embedding.sentence_tranformer_embedder import SentenceTransformerEmbedder
+from src.embedding.sentence_tranformer_embedder import SentenceTransformerEmbedder, length_buckets
 from src.models.document import Document, EmbeddedDocument
 
 
@@ -98,7 +98,8 @@ class TestSentenceTransformerEmbedder:
         expected_texts = [doc.message for doc in sample_documents]
         mock_sentence_transformer.encode.assert_called_once_with(
             expected_texts, 
-            batch_size=16
+            batch_size=16,
+            show_progress_bar=False,
         )
 
     def test_embed_batch_empty_list(self, mock_sentence_transformer):
@@ -153,7 +154,8 @@ class TestSentenceTransformerEmbedder:
             expected_texts = [doc.message for doc in sample_documents]
             mock_sentence_transformer.encode.assert_called_with(
                 expected_texts, 
-                batch_size=batch_size
+                batch_size=batch_size,
+                show_progress_bar=False,
             )
 
     def test_embed_batch_embedding_dimensions(self, mock_sentence_transformer, sample_documents):
@@ -209,4 +211,48 @@ class TestSentenceTransformerEmbedder:
         
         assert len(embedded_docs) == num_docs
         for i, embedded_doc in enumerate(embedded_docs):
-            assert embedded_doc.document == documents[i]
\ No newline at end of file
+            assert embedded_doc.document == documents[i]
+
+    def test_max_seq_length(self, mock_sentence_transformer):
+        """Test that max_seq_length is applied to the model."""
+        SentenceTransformerEmbedder(max_seq_length=64)
+
+        assert mock_sentence_transformer.max_seq_length == 64
+
+    def test_length_bucketed_encoding_restores_order(self, mock_sentence_transformer):
+        """Test that bucketed encoding groups texts by token length and returns rows in input order."""
+        mock_sentence_transformer.max_seq_length = 128
+        mock_sentence_transformer.tokenizer.side_effect = lambda texts, **kwargs: {
+            "input_ids": [text.split() for text in texts]
+        }
+        mock_sentence_transformer.encode.side_effect = lambda texts, **kwargs: np.array(
+            [[float(len(text.split()))] for text in texts]
+        )
+        documents = [
+            Document(time="", location="", account="", message=" ".join(["w"] * n)) for n in [5, 1, 9, 1, 5]
+        ]
+
+        embedder = SentenceTransformerEmbedder(token_budget=10)
+        embedded_docs = embedder.embed_batch(documents)
+
+        assert [e.embedding[0] for e in embedded_docs] == [5.0, 1.0, 9.0, 1.0, 5.0]
+        encoded_batches = [call.args[0] for call in mock_sentence_transformer.encode.call_args_list]
+        assert [len(batch) for batch in encoded_batches] == [2, 2, 1]
+        assert encoded_batches[1] == ["w w w w w", "w w w w w"]
+
+
+class TestLengthBuckets:
+    """Test cases for length_buckets."""
+
+    def test_buckets_respect_token_budget(self):
+        """Test that padded batch sizes stay within the budget and every row appears once."""
+        lengths = np.array([5, 100, 3, 50, 4, 4])
+
+        buckets = length_buckets(lengths, 16)
+
+        assert [list(bucket) for bucket in buckets] == [[2, 4, 5], [0], [3], [1]]
+        assert all(len(b) * lengths[b].max() <= 16 or len(b) == 1 for b in buckets)
+
+    def test_empty(self):
+        """Test that no rows give no buckets."""
+        assert length_buckets(np.array([], dtype=np.int64), 100) == []
@@ -0,0 +1,88 @@
+from pathlib import Path
+
+import pytest
+import numpy as np
+from unittest.mock import patch
+
+from src.embedding.embedder import Embedder
+from src.embedding.onnx_embedder import OnnxEmbedder, check_cosine_tolerance
+from src.models.document import EmbeddedDocument
+
+
+class VectorEmbedder(Embedder):
+    """Embedder stub returning a fixed vector per message."""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def embed_batch(self, documents):
+        return [
+            EmbeddedDocument(document=doc, embedding=np.array(self.vectors[doc.message]), embedding_model="fake")
+            for doc in documents
+        ]
+
+
+class TestOnnxEmbedder:
+    """Test cases for OnnxEmbedder class."""
+
+    @pytest.fixture
+    def sentence_transformer(self):
+        """Mock SentenceTransformer whose save() writes an exported model file."""
+        with patch('src.embedding.onnx_embedder.SentenceTransformer') as mock:
+            def save(path):
+                (Path(path) / "onnx").mkdir(parents=True)
+                (Path(path) / "onnx" / "model.onnx").touch()
+
+            mock.return_value.save.side_effect = save
+            yield mock
+
+    @pytest.fixture
+    def export_quantized(self):
+        """Mock the int8 export so that it writes a quantized model file."""
+        with patch('src.embedding.onnx_embedder.export_dynamic_quantized_onnx_model') as mock:
+            mock.side_effect = lambda model, config, path: (Path(path) / "onnx" / f"model_qint8_{config}.onnx").touch()
+            yield mock
+
+    def test_exports_once(self, tmp_path, sentence_transformer):
+        """Test that the ONNX export is saved and reused by later instances."""
+        OnnxEmbedder("org/model", export_dir=tmp_path)
+        OnnxEmbedder("org/model", export_dir=tmp_path)
+
+        exports = [c for c in sentence_transformer.call_args_list if c.args == ("org/model",)]
+        assert len(exports) == 1
+        assert exports[0].kwargs == {"backend": "onnx"}
+        last = sentence_transformer.call_args
+        assert last.args == (str(tmp_path / "org__model"),)
+        assert last.kwargs["model_kwargs"] == {"file_name": "onnx/model.onnx"}
+
+    def test_quantized_model(self, tmp_path, sentence_transformer, export_quantized):
+        """Test that quantization runs once and the quantized file is loaded."""
+        embedder = OnnxEmbedder("org/model", quantize=True, quantization_config="avx512_vnni", export_dir=tmp_path)
+        OnnxEmbedder("org/model", quantize=True, quantization_config="avx512_vnni", export_dir=tmp_path)
+
+        export_quantized.assert_called_once()
+        assert sentence_transformer.call_args.kwargs["model_kwargs"] == {
+            "file_name": "onnx/model_qint8_avx512_vnni.onnx"
+        }
+        assert embedder.model_name == "org/model+qint8-avx512_vnni"
+
+
+class TestCheckCosineTolerance:
+    """Test cases for check_cosine_tolerance."""
+
+    def test_within_tolerance(self):
+        """Test that scaled or slightly rotated vectors pass and the worst distance is returned."""
+        reference = VectorEmbedder({"a": [1.0, 0.0], "b": [0.0, 1.0]})
+        candidate = VectorEmbedder({"a": [2.0, 0.0], "b": [0.01, 1.0]})
+
+        worst = check_cosine_tolerance(candidate, reference, ["a", "b"], tolerance=0.01)
+
+        assert 0.0 < worst < 0.001
+
+    def test_exceeds_tolerance(self):
+        """Test that a diverging vector raises ValueError naming the text."""
+        reference = VectorEmbedder({"a": [1.0, 0.0], "b": [0.0, 1.0]})
+        candidate = VectorEmbedder({"a": [1.0, 0.0], "b": [1.0, 1.0]})
+
+        with pytest.raises(ValueError, match="'b'"):
+            check_cosine_tolerance(candidate, reference, ["a", "b"], tolerance=0.01)
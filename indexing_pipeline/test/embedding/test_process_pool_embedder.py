@@ -0,0 +1,98 @@
+import os
+
+import pytest
+import numpy as np
+
+from src.embedding.embedder import Embedder
+from src.embedding.process_pool_embedder import ProcessPoolEmbedder
+from src.models.document import Document, DocumentBatch, EmbeddedDocument
+
+
+class WorkerEmbedder(Embedder):
+    """Embeds a message as (message number, worker pid, pinned thread count)."""
+
+    def __init__(self, model_name="worker-model"):
+        self.model_name = model_name
+
+    def embed_batch(self, documents):
+        if any(doc.message == "fail" for doc in documents):
+            raise RuntimeError("worker failed")
+        return [
+            EmbeddedDocument(
+                document=doc,
+                embedding=np.array([float(doc.message), os.getpid(), float(os.environ["OMP_NUM_THREADS"])]),
+                embedding_model=self.model_name,
+            )
+            for doc in documents
+        ]
+
+
+class QuantizedWorkerEmbedder(WorkerEmbedder):
+    """Reports a model name derived from its arguments, like OnnxEmbedder(quantize=True)."""
+
+    def __init__(self, model_name="worker-model"):
+        super().__init__(f"{model_name}+qint8-avx2")
+
+
+def make_batch(messages):
+    return DocumentBatch.from_documents([Document("", "", "", message) for message in messages])
+
+
+@pytest.fixture(scope="module")
+def embedder():
+    """A two-worker pool with one pinned thread per worker, shared by the tests (workers start slowly)."""
+    with ProcessPoolEmbedder(
+        WorkerEmbedder, {"model_name": "m"}, workers=2, threads_per_worker=1, min_shard_size=2
+    ) as pool:
+        yield pool
+
+
+class TestProcessPoolEmbedder:
+    """Test cases for ProcessPoolEmbedder class."""
+
+    def test_shards_preserve_order(self, embedder):
+        """Test that shards are spread over workers and reassembled in input order."""
+        batch = make_batch([str(i) for i in range(10)])
+
+        embedded = embedder.embed_document_batch(batch)
+
+        assert embedded.documents is batch
+        assert embedded.embeddings[:, 0].tolist() == list(range(10))
+        assert embedded.embeddings.dtype == np.float32
+        assert embedded.embedding_model == "m"
+        assert set(embedded.embeddings[:, 2]) == {1.0}
+        assert os.getpid() not in set(embedded.embeddings[:, 1])
+
+    def test_embed_batch_and_empty(self, embedder):
+        """Test the row-wise interface and that empty batches do not reach the workers."""
+        documents = [Document("", "", "", "7"), Document("", "", "", "8")]
+
+        embedded = embedder.embed_batch(documents)
+
+        assert [e.document for e in embedded] == documents
+        assert [e.embedding[0] for e in embedded] == [7.0, 8.0]
+        assert embedder.embed_batch([]) == []
+        assert embedder.embed_document_batch(make_batch([])).embeddings.shape == (0, 0)
+
+    def test_worker_error_propagates(self, embedder):
+        """Test that an exception raised in a worker is re-raised to the caller."""
+        with pytest.raises(RuntimeError, match="worker failed"):
+            embedder.embed_document_batch(make_batch(["1", "fail", "2", "3"]))
+
+    def test_model_name_comes_from_workers(self, embedder):
+        """Test that the pool reports the model name its workers' embedder uses, not the constructor argument."""
+        assert embedder.model_name == "m"
+        with ProcessPoolEmbedder(QuantizedWorkerEmbedder, {"model_name": "m"}, workers=1) as pool:
+            assert pool.model_name == "m+qint8-avx2"
+            assert pool.embed_document_batch(make_batch(["1"])).embedding_model == pool.model_name
+
+    def test_close_and_restart(self, embedder):
+        """Test that close() stops the workers and a closed pool starts again on use."""
+        embedder.embed_document_batch(make_batch(["1", "2"]))
+        processes = list(embedder._executor._processes.values())
+
+        embedder.close()
+
+        assert embedder._executor is None
+        assert not any(process.is_alive() for process in processes)
+        assert embedder.embed_document_batch(make_batch(["3"])).embeddings[0, 0] == 3.0
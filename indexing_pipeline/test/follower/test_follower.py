@@ -0,0 +1,121 @@
+import json
+import threading
+import time
+
+import pytest
+from unittest.mock import Mock
+
+from src.checkpoint import Checkpoint
+from src.follower import FeedFollower
+from src.pipeline import Pipeline
+
+HEADER = "time,location,account,message\n"
+
+
+def csv_row(i, message=None):
+    return f'2020-04-06 00:{i:02d}:00,Weston,user{i},"{message or f"msg {i}"}"\n'
+
+
+class TestFeedFollower:
+    """Test cases for FeedFollower class."""
+
+    @pytest.fixture
+    def feed(self, tmp_path):
+        path = tmp_path / "YInt.csv"
+        path.write_text(HEADER + csv_row(0) + csv_row(1), encoding="utf-8")
+        return path
+
+    def test_batches_by_count(self, feed):
+        """Test that a batch is cut as soon as it reaches batch_size."""
+        batches = FeedFollower(feed, batch_size=2, max_latency=10).follow()
+
+        documents, end_offset, key = next(batches)
+
+        assert [doc.message for doc in documents] == ["msg 0", "msg 1"]
+        assert end_offset == feed.stat().st_size
+
+    def test_batches_by_latency(self, feed):
+        """Test that a partial batch is cut once max_latency has passed."""
+        batches = FeedFollower(feed, batch_size=100, max_latency=0.05, poll_interval=0.01).follow()
+
+        started = time.monotonic()
+        documents, _, _ = next(batches)
+
+        assert len(documents) == 2
+        assert time.monotonic() - started < 1
+
+    def test_waits_for_incomplete_rows(self, feed):
+        """Test that a row still being written (including a multi-line message) is read once complete."""
+        batches = FeedFollower(feed, batch_size=1, max_latency=0.05, poll_interval=0.01).follow()
+        next(batches), next(batches)
+
+        with open(feed, "a", encoding="utf-8") as f:
+            f.write('2020-04-06 00:02:00,Weston,user2,"line one\nline')
+            f.flush()
+            writer = threading.Timer(0.1, lambda: (f.write(' two"\n'), f.flush()))
+            writer.start()
+            documents, end_offset, _ = next(batches)
+            writer.join()
+
+        assert documents[0].message == "line one\nline two"
+        assert end_offset == feed.stat().st_size
+
+    def test_survives_rotation(self, feed):
+        """Test that rows appended before rotation and rows in the new file are both read."""
+        batches = FeedFollower(feed, batch_size=2, max_latency=10, poll_interval=0.01).follow()
+        first, _, first_key = next(batches)
+
+        with open(feed, "a", encoding="utf-8") as f:
+            f.write(csv_row(2))
+        feed.rename(feed.with_name("YInt.csv.1"))
+        feed.write_text(HEADER + csv_row(3), encoding="utf-8")
+
+        second, end_offset, second_key = next(batches)
+
+        assert [doc.message for doc in second] == ["msg 2", "msg 3"]
+        assert second_key != first_key
+        assert end_offset == feed.stat().st_size
+
+    def test_directory_resume(self, tmp_path):
+        """Test following a directory of CSV and NDJSON drops and resuming mid-file."""
+        (tmp_path / "001.csv").write_text(HEADER + csv_row(0) + csv_row(1), encoding="utf-8")
+        records = [{"time": "t", "location": "Weston", "account": f"user{i}", "message": f"msg {i}"} for i in (2, 3)]
+        (tmp_path / "002.ndjson").write_text("".join(json.dumps(r) + "\n" for r in records), encoding="utf-8")
+        follower = FeedFollower(tmp_path, batch_size=3, max_latency=0.05, poll_interval=0.01)
+
+        documents, end_offset, key = next(follower.follow())
+        assert [doc.message for doc in documents] == ["msg 0", "msg 1", "msg 2"]
+        assert key == "002.ndjson"
+
+        resumed, _, _ = next(follower.follow(key, end_offset))
+        assert [doc.message for doc in resumed] == ["msg 3"]
+
+    def test_stop_ends_following(self, feed):
+        """Test that a set stop event ends following instead of polling forever."""
+        stop = threading.Event()
+        stop.set()
+
+        batches = list(FeedFollower(feed, batch_size=100, max_latency=10).follow(stop=stop))
+
+        assert batches == []
+
+    def test_pipeline_follow_resumes_from_checkpoint(self, feed, tmp_path):
+        """Test that a restarted follow skips rows a previous follow already indexed."""
+        indexed = []
+        embedder = Mock()
+        embedder.embed_document_batch.side_effect = lambda batch: batch
+        indexer = Mock()
+        indexer.index_embedded_batch.side_effect = lambda batch: indexed.extend(batch.message)
+        follower = FeedFollower(feed, batch_size=100, max_latency=0.05, poll_interval=0.01)
+
+        def follow_briefly():
+            stop = threading.Event()
+            threading.Timer(0.3, stop.set).start()
+            Pipeline(Mock(), embedder, indexer, Checkpoint(tmp_path / "ckpt.json", "feed")).follow(follower, stop=stop)
+
+        follow_briefly()
+        with open(feed, "a", encoding="utf-8") as f:
+            f.write(csv_row(2))
+        follow_briefly()
+
+        assert indexed == ["msg 0", "msg 1", "msg 2"]
@@ -1,10 +1,10 @@
 import pytest
 import numpy as np
 from unittest.mock import Mock, patch, MagicMock
-from qdrant_client.models import Distance, VectorParams, PointStruct
+from qdrant_client.models import Batch, CollectionStatus, Distance, PayloadSchemaType, VectorParams, PointStruct
 
-from src.indexing.qdrant_indexer import QdrantIndexer
-from src.models.document import Document, EmbeddedDocument
+from src.indexing.qdrant_indexer import DEFAULT_INDEXING_THRESHOLD, CollectionConfig, QdrantIndexer
+from src.models.document import Document, EmbeddedBatch, EmbeddedDocument, document_id
 
 
 class TestQdrantIndexer:
@@ -87,6 +87,30 @@ class TestQdrantIndexer:
             vectors_config=VectorParams(size=384, distance=Distance.COSINE)
         )
 
+    def test_initialize_collection_with_quantization(self, mock_qdrant_client):
+        """Test that quantization, on-disk storage and HNSW settings reach create_collection."""
+        mock_qdrant_client.get_collection.side_effect = Exception("Collection not found")
+        config = CollectionConfig(quantization="scalar", on_disk=True, on_disk_payload=True, hnsw_m=32)
+
+        QdrantIndexer(collection_config=config)
+
+        kwargs = mock_qdrant_client.create_collection.call_args[1]
+        assert kwargs['vectors_config'].on_disk is True
+        assert kwargs['quantization_config'].scalar.type == "int8"
+        assert kwargs['quantization_config'].scalar.always_ram is True
+        assert kwargs['on_disk_payload'] is True
+        assert kwargs['hnsw_config'].m == 32
+
+    def test_collection_config_binary_and_invalid(self):
+        """Test binary quantization settings and rejection of unknown quantization types."""
+        kwargs = CollectionConfig(quantization="binary").create_collection_kwargs()
+        assert kwargs['quantization_config'].binary.always_ram is True
+        assert CollectionConfig(quantization="binary", on_disk=True).vector_bytes_in_ram() == 48
+        assert CollectionConfig().vector_bytes_in_ram() == 384 * 4
+
+        with pytest.raises(ValueError, match="Unknown quantization"):
+            CollectionConfig(quantization="pq").create_collection_kwargs()
+
     def test_initialize_collection_uses_existing_collection(self, mock_qdrant_client):
         """Test that existing collection is used when available."""
         # Mock get_collection to succeed (collection exists)
@@ -118,14 +142,15 @@ class TestQdrantIndexer:
         # Check first point
         point1 = points[0]
         assert isinstance(point1, PointStruct)
-        assert isinstance(point1.id, int)  # Hash-generated ID
+        assert isinstance(point1.id, int)  # Content-derived ID
         assert len(point1.vector) == 384  # Embedding dimension
         
         # Check payload structure
         payload1 = point1.payload
-        expected_keys = {"time", "location", "account", "message", "embedding_model"}
+        expected_keys = {"time", "timestamp", "location", "account", "message", "embedding_model"}
         assert set(payload1.keys()) == expected_keys
         assert payload1["time"] == "2024-01-01 10:00:00"
+        assert payload1["timestamp"] == 1704103200
         assert payload1["location"] == "Downtown"
         assert payload1["account"] == "user1"
         assert payload1["message"] == "Emergency situation reported"
@@ -159,8 +184,9 @@ class TestQdrantIndexer:
         
         # Verify IDs are deterministic (same content should generate same ID)
         doc1 = sample_embedded_documents[0].document
-        expected_id1 = hash(f"{doc1.time}_{doc1.location}_{doc1.account}_{doc1.message}")
+        expected_id1 = document_id(doc1)
         assert id1 == expected_id1
+        assert 0 <= id1 < 2 ** 64
 
     def test_index_batch_handles_qdrant_errors(self, mock_qdrant_client, sample_embedded_documents):
         """Test that QdrantIndexer handles Qdrant client errors properly."""
@@ -216,4 +242,188 @@ class TestQdrantIndexer:
         points = call_args[1]['points']
         
         assert points[0].payload["embedding_model"] == "model1"
-        assert points[1].payload["embedding_model"] == "model2"
\ No newline at end of file
+        assert points[1].payload["embedding_model"] == "model2"
+
+    def test_index_embedded_batch(self, mock_qdrant_client, sample_embedded_documents):
+        """Test that a column-wise batch is sent as one columnar Batch upsert."""
+        indexer = QdrantIndexer()
+        batch = EmbeddedBatch.from_embedded_documents(sample_embedded_documents)
+
+        indexer.index_embedded_batch(batch)
+
+        points = mock_qdrant_client.upsert.call_args[1]['points']
+        assert isinstance(points, Batch)
+        assert points.ids == [document_id(e.document) for e in sample_embedded_documents]
+        assert len(points.vectors) == 2 and len(points.vectors[0]) == 384
+        assert points.payloads[1]["location"] == "Uptown"
+        assert set(points.payloads[0]) == {"time", "timestamp", "location", "account", "message", "embedding_model"}
+        assert points.payloads[1]["timestamp"] == 1704103500
+
+    def test_index_embedded_batch_extra_payload(self, mock_qdrant_client, sample_embedded_documents):
+        """Test that extra payload columns of a batch are stored with each point."""
+        indexer = QdrantIndexer()
+        batch = EmbeddedBatch.from_embedded_documents(sample_embedded_documents)
+        batch.payload["duplicate_group"] = [7, 7]
+
+        indexer.index_embedded_batch(batch)
+
+        payloads = mock_qdrant_client.upsert.call_args[1]['points'].payloads
+        assert [payload["duplicate_group"] for payload in payloads] == [7, 7]
+
+    def test_index_embedded_batch_empty(self, mock_qdrant_client):
+        """Test that an empty column-wise batch is not sent to Qdrant."""
+        indexer = QdrantIndexer()
+
+        indexer.index_embedded_batch(EmbeddedBatch.from_embedded_documents([]))
+
+        mock_qdrant_client.upsert.assert_not_called()
+
+    def test_init_creates_payload_indexes(self, mock_qdrant_client):
+        """Test that missing payload indexes are created and existing ones are kept."""
+        mock_qdrant_client.get_collection.return_value.payload_schema = {"location": Mock()}
+
+        QdrantIndexer()
+
+        created = {
+            call[1]['field_name']: call[1]['field_schema']
+            for call in mock_qdrant_client.create_payload_index.call_args_list
+        }
+        assert created == {
+            "timestamp": PayloadSchemaType.INTEGER,
+            "account": PayloadSchemaType.KEYWORD,
+            "main_category": PayloadSchemaType.KEYWORD,
+            "label": PayloadSchemaType.KEYWORD,
+        }
+
+    def test_backfill_timestamps(self):
+        """Test that points without a timestamp get one derived from their time."""
+        indexer = QdrantIndexer(location=":memory:", collection_config=CollectionConfig(vector_size=2))
+        indexer.client.upsert(indexer.collection_name, points=[
+            PointStruct(id=1, vector=[1, 0], payload={"time": "2020-04-06 00:05:00"}),
+            PointStruct(id=2, vector=[0, 1], payload={"time": "2020-04-06 00:05:00"}),
+            PointStruct(id=3, vector=[1, 1], payload={"time": "not a time"}),
+            PointStruct(id=4, vector=[1, 1], payload={"time": "2020-04-06 00:00:00", "timestamp": 1586131200}),
+        ])
+
+        assert indexer.backfill_timestamps(page_size=2) == 2
+
+        points, _ = indexer.client.scroll(indexer.collection_name, with_payload=True)
+        timestamps = {point.id: point.payload.get("timestamp") for point in points}
+        assert timestamps == {1: 1586131500, 2: 1586131500, 3: None, 4: 1586131200}
+
+    def test_upsert_batch(self, mock_qdrant_client):
+        """Test that pre-built points keep their IDs and are sent as one columnar Batch upsert."""
+        indexer = QdrantIndexer()
+
+        indexer.upsert_batch([3, 5], np.ones((2, 4), dtype=np.float32), [{"label": "a"}, {}])
+
+        points = mock_qdrant_client.upsert.call_args[1]['points']
+        assert points.ids == [3, 5]
+        assert points.vectors == [[1.0] * 4, [1.0] * 4]
+        assert points.payloads == [{"label": "a"}, {}]
+
+    @pytest.mark.parametrize("location, kwargs", [
+        (":memory:", {"location": ":memory:"}),
+        ("http://qdrant:6333", {"location": "http://qdrant:6333"}),
+        ("/data/qdrant", {"path": "/data/qdrant"}),
+    ])
+    def test_init_with_location(self, location, kwargs):
+        """Test that URLs and ":memory:" are passed as location and directories as path."""
+        with patch('src.indexing.qdrant_indexer.QdrantClient') as mock_client:
+            QdrantIndexer(location=location)
+
+        for key, value in kwargs.items():
+            assert mock_client.call_args[1][key] == value
+
+    @pytest.fixture
+    def collection_config(self, mock_qdrant_client):
+        """Make get_collection report HNSW m=16 and an indexing threshold of 20000."""
+        info = Mock(status=CollectionStatus.GREEN)
+        info.config.hnsw_config.m = 16
+        info.config.optimizer_config.indexing_threshold = 20000
+        mock_qdrant_client.get_collection.return_value = info
+        return info
+
+    def test_bulk_load(self, mock_qdrant_client, collection_config, sample_embedded_documents):
+        """Test that bulk loads pause indexing, skip acknowledgements and end with a barrier."""
+        indexer = QdrantIndexer()
+
+        with indexer.bulk_load():
+            disabled = mock_qdrant_client.update_collection.call_args[1]
+            indexer.index_batch(sample_embedded_documents)
+            assert mock_qdrant_client.upsert.call_args[1]['wait'] is False
+
+        assert disabled['hnsw_config'].m == 0
+        assert disabled['optimizers_config'].indexing_threshold == 0
+        restored = mock_qdrant_client.update_collection.call_args[1]
+        assert restored['hnsw_config'].m == 16
+        assert restored['optimizers_config'].indexing_threshold == 20000
+        barrier = mock_qdrant_client.upsert.call_args[1]
+        assert barrier['wait'] is True
+        assert barrier['points'] == mock_qdrant_client.upsert.call_args_list[0][1]['points']
+        assert indexer.wait is True
+
+    @pytest.mark.parametrize("reported, argument, expected", [
+        (None, None, DEFAULT_INDEXING_THRESHOLD),
+        (None, 50000, 50000),
+        (20000, 50000, 50000),
+    ])
+    def test_bulk_load_indexing_threshold(self, mock_qdrant_client, collection_config, reported, argument, expected):
+        """Test that indexing is switched back on when the collection reports no threshold, or to a given one."""
+        collection_config.config.optimizer_config.indexing_threshold = reported
+        indexer = QdrantIndexer()
+
+        with indexer.bulk_load(indexing_threshold=argument):
+            pass
+
+        assert mock_qdrant_client.update_collection.call_args[1]['optimizers_config'].indexing_threshold == expected
+
+    def test_bulk_load_restores_settings_on_error(self, mock_qdrant_client, collection_config):
+        """Test that indexing settings are restored when the load fails."""
+        indexer = QdrantIndexer()
+
+        with pytest.raises(RuntimeError):
+            with indexer.bulk_load():
+                raise RuntimeError("load failed")
+
+        assert mock_qdrant_client.update_collection.call_count == 2
+        assert mock_qdrant_client.update_collection.call_args[1]['hnsw_config'].m == 16
+        assert indexer.wait is True
+
+    def test_wait_for_optimization_times_out(self, mock_qdrant_client, collection_config):
+        """Test that waiting for a collection that never turns green raises TimeoutError."""
+        collection_config.status = CollectionStatus.YELLOW
+        indexer = QdrantIndexer()
+
+        with pytest.raises(TimeoutError):
+            indexer.wait_for_optimization(timeout=0.05, poll_interval=0.01)
+
+    def test_document_id_is_stable_across_processes(self, sample_documents):
+        """Test that IDs do not depend on Python's per-process hash salt."""
+        import subprocess
+        import sys
+
+        doc = sample_documents[0]
+        code = (
+            "from src.models.document import Document, document_id;"
+            f"print(document_id(Document({doc.time!r}, {doc.location!r}, {doc.account!r}, {doc.message!r})))"
+        )
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        assert int(output.stdout) == document_id(doc)
+
+    def test_existing_ids(self, mock_qdrant_client):
+        """Test that existing_ids reports the IDs Qdrant returns."""
+        mock_qdrant_client.retrieve.return_value = [Mock(id=7)]
+        indexer = QdrantIndexer()
+
+        assert indexer.existing_ids([7, 8]) == {7}
+        call_args = mock_qdrant_client.retrieve.call_args
+        assert call_args[1]['ids'] == [7, 8]
+        assert call_args[1]['with_vectors'] is False
+
+    def test_existing_ids_empty(self, mock_qdrant_client):
+        """Test that existing_ids does not query Qdrant for an empty ID list."""
+        indexer = QdrantIndexer()
+
+        assert indexer.existing_ids([]) == set()
+        mock_qdrant_client.retrieve.assert_not_called()
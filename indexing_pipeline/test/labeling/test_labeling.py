@@ -0,0 +1,107 @@
+import csv
+
+import numpy as np
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, PointStruct, VectorParams
+
+from label_corpus import label_collection, write_labeled_csv
+from src.embedding.embedder import Embedder
+from src.labeling import CategoryLabeler, load_categories
+from src.models.document import DocumentBatch, EmbeddedBatch
+
+CATEGORIES = {
+    "Infrastructure Damage": ["Road damage", "Power outage"],
+    "Emergency Help": ["People trapped"],
+}
+
+# One axis per category term
+TERM_VECTORS = {"Road damage": [1, 0, 0], "Power outage": [0, 1, 0], "People trapped": [0, 0, 1]}
+
+
+class TermEmbedder(Embedder):
+    """Embeds category terms as unit axes and counts its calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed_batch(self, documents):
+        raise NotImplementedError
+
+    def embed_document_batch(self, batch):
+        self.calls += 1
+        vectors = np.array([TERM_VECTORS[message] for message in batch.message], dtype=np.float32)
+        return EmbeddedBatch(batch, vectors, "terms")
+
+
+class TestCategoryLabeler:
+    """Test cases for CategoryLabeler class."""
+
+    @pytest.fixture
+    def embedder(self):
+        return TermEmbedder()
+
+    def test_label_picks_best_term(self, embedder):
+        """Test that each message gets its highest-scoring term, that score and the term's main category."""
+        labeler = CategoryLabeler(CATEGORIES, embedder)
+
+        columns = labeler.label(np.array([[0.2, 3.0, 0.1], [0.0, 0.1, 0.5]]))
+
+        assert columns["label"] == ["power outage", "people trapped"]
+        assert columns["main_category"] == ["Infrastructure Damage", "Emergency Help"]
+        assert columns["best_score"] == pytest.approx([3.0 / np.sqrt(9.05), 0.5 / np.sqrt(0.26)])
+        assert "top_labels" not in columns
+        assert embedder.calls == 1
+
+    def test_top_k_and_min_score(self, embedder):
+        """Test top-k labels in score order and that weak matches stay unlabeled."""
+        labeler = CategoryLabeler(CATEGORIES, embedder, top_k=2, min_score=0.6)
+
+        columns = labeler.label(np.array([[0.3, 0.1, 0.9], [1.0, 1.0, 1.0]]))
+
+        assert columns["top_labels"][0] == ["people trapped", "road damage"]
+        assert columns["top_scores"][0][0] > columns["top_scores"][0][1]
+        assert columns["label"] == ["people trapped", None]
+        assert columns["main_category"][1] is None
+        assert columns["best_score"][1] == pytest.approx(1 / np.sqrt(3))
+
+    def test_label_batch_adds_payload(self, embedder):
+        """Test that labels are added as payload columns of an embedded batch."""
+        labeler = CategoryLabeler(CATEGORIES, embedder)
+        none = [None, None]
+        batch = EmbeddedBatch(DocumentBatch(none, none, none, ["a", "b"]), np.eye(3)[:2], "m")
+
+        labeler.label_batch(batch)
+
+        assert batch.payload["label"] == ["road damage", "power outage"]
+
+    def test_load_categories(self, tmp_path):
+        """Test reading the category file."""
+        path = tmp_path / "categories.json"
+        path.write_text('{"Emergency Help": ["People trapped"]}', encoding="utf-8")
+
+        assert load_categories(path) == {"Emergency Help": ["People trapped"]}
+
+    def test_label_collection_and_csv(self, embedder, tmp_path):
+        """Test that stored vectors are labeled page by page, written to the payloads and to CSV."""
+        client = QdrantClient(location=":memory:")
+        client.create_collection("messages", vectors_config=VectorParams(size=3, distance=Distance.COSINE))
+        client.upsert("messages", points=[
+            PointStruct(id=i, vector=vector, payload={"time": "t", "location": "l", "account": f"a{i}", "message": "m"})
+            for i, vector in enumerate([[1, 0, 0], [0, 1, 0], [0, 0.2, 1]])
+        ])
+        labeler = CategoryLabeler(CATEGORIES, embedder)
+
+        rows = label_collection(client, "messages", labeler, page_size=2)
+
+        assert sorted(row["label"] for row in rows) == ["people trapped", "power outage", "road damage"]
+        stored = client.retrieve("messages", ids=[2], with_payload=True)[0].payload
+        assert stored["main_category"] == "Emergency Help"
+        assert stored["account"] == "a2"
+
+        path = tmp_path / "labeled.csv"
+        write_labeled_csv(path, rows)
+        with open(path, encoding="utf-8") as f:
+            written = list(csv.DictReader(f))
+        assert list(written[0]) == ["time", "location", "account", "message", "label", "best_score", "main_category"]
+        assert len(written) == 3
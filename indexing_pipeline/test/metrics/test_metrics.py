@@ -0,0 +1,95 @@
+import pstats
+import threading
+
+import pytest
+
+from src.metrics import PipelineMetrics
+
+
+class TestPipelineMetrics:
+    """Test cases for PipelineMetrics class."""
+
+    def test_stage_counts_rows_batches_and_histogram(self):
+        """Test that every timed batch adds its rows and lands in the right batch-size bucket."""
+        metrics = PipelineMetrics()
+
+        for rows in (3, 32, 300):
+            with metrics.stage("embed", rows):
+                pass
+
+        stage = metrics.stages["embed"]
+        assert (stage.batches, stage.rows, stage.errors) == (3, 335, 0)
+        assert stage.seconds > 0
+        # buckets: ..., 8, 32, ..., 256, 512, ...
+        assert stage.batch_sizes[1] == 1
+        assert stage.batch_sizes[2] == 1
+        assert stage.batch_sizes[6] == 1
+
+    def test_stage_counts_errors(self):
+        """Test that an exception is counted and re-raised without counting the batch."""
+        metrics = PipelineMetrics()
+
+        with pytest.raises(ValueError):
+            with metrics.stage("index", 10):
+                raise ValueError("boom")
+
+        assert metrics.stages["index"].errors == 1
+        assert metrics.stages["index"].batches == 0
+
+    def test_timed_iterates_and_counts(self):
+        """Test that timed() yields every item and records one batch per item."""
+        metrics = PipelineMetrics()
+
+        items = list(metrics.timed("load", [[1, 2], [3]]))
+
+        assert items == [[1, 2], [3]]
+        assert (metrics.stages["load"].batches, metrics.stages["load"].rows) == (2, 3)
+
+    def test_prometheus_file(self, tmp_path):
+        """Test that report() writes counters, histogram and queue gauges in the text format."""
+        path = tmp_path / "metrics.prom"
+        metrics = PipelineMetrics(prometheus_path=path)
+        with metrics.stage("embed", 20):
+            pass
+        metrics.observe_queue("index", 3)
+        metrics.observe_queue("index", 1)
+
+        metrics.report()
+
+        lines = path.read_text().splitlines()
+        assert 'pipeline_stage_rows_total{stage="embed"} 20' in lines
+        assert 'pipeline_batch_size_rows_bucket{stage="embed",le="8"} 0' in lines
+        assert 'pipeline_batch_size_rows_bucket{stage="embed",le="32"} 1' in lines
+        assert 'pipeline_batch_size_rows_bucket{stage="embed",le="+Inf"} 1' in lines
+        assert 'pipeline_queue_depth{queue="index"} 1' in lines
+        assert 'pipeline_queue_depth_max{queue="index"} 3' in lines
+        assert "# TYPE pipeline_batch_size_rows histogram" in lines
+
+    def test_maybe_report_waits_for_interval(self, tmp_path):
+        """Test that summaries are only written once the report interval has passed."""
+        path = tmp_path / "metrics.prom"
+
+        PipelineMetrics(report_interval=3600, prometheus_path=path).maybe_report()
+        assert not path.exists()
+
+        PipelineMetrics(report_interval=0, prometheus_path=path).maybe_report()
+        assert path.exists()
+
+    def test_write_profiles_per_stage(self, tmp_path):
+        """Test that profiles from several threads are merged into one file per stage."""
+        metrics = PipelineMetrics(profile_dir=tmp_path)
+
+        def work():
+            with metrics.stage("embed", 1):
+                sum(range(1000))
+
+        threads = [threading.Thread(target=work) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        paths = metrics.write_profiles()
+
+        assert paths == [tmp_path / "embed.prof"]
+        assert pstats.Stats(str(paths[0])).total_calls > 0
@@ -0,0 +1,258 @@
+import csv
+import threading
+import time
+
+import pytest
+import numpy as np
+from unittest.mock import Mock
+
+from src.checkpoint import Checkpoint
+from src.dedup import NearDuplicateDetector
+from src.data_loader import DataLoader
+from src.embedding.embedder import Embedder
+from src.indexing.indexer import Indexer
+from src.metrics import PipelineMetrics
+from src.pipeline import Pipeline
+from src.models.document import Document, DocumentBatch, EmbeddedDocument, document_id
+
+
+class FakeEmbedder(Embedder):
+    """Embedder stub returning one constant vector per document."""
+
+    def __init__(self, delays=None, fail_on=None):
+        self.delays = delays or {}
+        self.fail_on = fail_on
+
+    def embed_batch(self, documents):
+        first = documents[0].message
+        if first == self.fail_on:
+            raise RuntimeError("embedding failed")
+        time.sleep(self.delays.get(first, 0))
+        return [
+            EmbeddedDocument(document=doc, embedding=np.zeros(4), embedding_model="fake")
+            for doc in documents
+        ]
+
+
+class RecordingIndexer(Indexer):
+    """Indexer stub that records the messages of every indexed batch."""
+
+    def __init__(self, fail_after=None):
+        self.batches = []
+        self.fail_after = fail_after
+        self._lock = threading.Lock()
+
+    def index_batch(self, embedded_documents):
+        with self._lock:
+            if self.fail_after is not None and len(self.batches) >= self.fail_after:
+                raise ConnectionError("Qdrant connection error")
+            self.batches.append([e.document.message for e in embedded_documents])
+
+
+class TestPipeline:
+    """Test cases for Pipeline class."""
+
+    @pytest.fixture
+    def documents(self):
+        """Create ten sample documents."""
+        return [
+            Document(time=f"2020-04-06 00:{i:02d}:00", location="Weston", account=f"user{i}", message=f"msg {i}")
+            for i in range(10)
+        ]
+
+    @pytest.fixture
+    def data_loader(self, documents):
+        """Create a mock DataLoader yielding the sample documents in batches."""
+        loader = Mock()
+        loader.load_column_batches_with_offsets.side_effect = lambda batch_size, start_offset: (
+            (DocumentBatch.from_documents(documents[i:i + batch_size]), None)
+            for i in range(0, len(documents), batch_size)
+        )
+        return loader
+
+    def test_run_serial(self, data_loader):
+        """Test the default serial mode indexes every batch in order."""
+        indexer = RecordingIndexer()
+        Pipeline(data_loader, FakeEmbedder(), indexer).run(batch_size=3)
+
+        assert indexer.batches[0] == ["msg 0", "msg 1", "msg 2"]
+        assert len(indexer.batches) == 4
+
+    def test_run_concurrent_preserves_order(self, data_loader):
+        """Test ordered concurrent mode indexes batches in load order even if embedding finishes out of order."""
+        embedder = FakeEmbedder(delays={"msg 0": 0.2, "msg 2": 0.1})
+        indexer = RecordingIndexer()
+
+        Pipeline(data_loader, embedder, indexer).run(batch_size=2, concurrent=True, embed_workers=3)
+
+        assert [batch[0] for batch in indexer.batches] == ["msg 0", "msg 2", "msg 4", "msg 6", "msg 8"]
+
+    def test_run_concurrent_unordered(self, tmp_path, csv_loader, documents):
+        """Test unordered concurrent mode indexes every batch once and checkpoints only finished prefixes."""
+        released = threading.Event()
+
+        class HoldingEmbedder(FakeEmbedder):
+            def embed_batch(self, documents):
+                # The first batch waits until every other batch is indexed
+                if documents[0].message == "msg 0":
+                    assert released.wait(5)
+                return super().embed_batch(documents)
+
+        class ReleasingIndexer(RecordingIndexer):
+            def index_batch(self, embedded_documents):
+                super().index_batch(embedded_documents)
+                if len(self.batches) == 4:
+                    released.set()
+
+        indexer = ReleasingIndexer()
+        checkpoint = Checkpoint(tmp_path / "checkpoint.json", "messages")
+
+        Pipeline(csv_loader, HoldingEmbedder(), indexer, checkpoint).run(
+            batch_size=2, concurrent=True, embed_workers=3, index_workers=2, ordered=False
+        )
+
+        assert sorted(indexer.batches) == [[doc.message for doc in documents[i:i + 2]] for i in range(0, 10, 2)]
+        assert indexer.batches[-1] == ["msg 0", "msg 1"]
+        assert checkpoint.rows == 10
+        assert checkpoint.offset == csv_loader.corpus_path.stat().st_size
+
+    def test_run_concurrent_propagates_embedder_error(self, data_loader):
+        """Test that an embedding failure stops the pipeline and is re-raised."""
+        indexer = RecordingIndexer()
+
+        with pytest.raises(RuntimeError, match="embedding failed"):
+            Pipeline(data_loader, FakeEmbedder(fail_on="msg 4"), indexer).run(
+                batch_size=2, concurrent=True, queue_size=1
+            )
+
+        assert len(indexer.batches) <= 2
+
+    def test_run_concurrent_propagates_indexer_error(self, data_loader):
+        """Test that an indexing failure stops the pipeline and is re-raised."""
+        with pytest.raises(ConnectionError, match="Qdrant connection error"):
+            Pipeline(data_loader, FakeEmbedder(), RecordingIndexer(fail_after=1)).run(
+                batch_size=1, concurrent=True, queue_size=1
+            )
+
+        assert not [t for t in threading.enumerate() if t.name.startswith("pipeline-")]
+
+    def test_run_concurrent_rejects_invalid_settings(self, data_loader):
+        """Test that non-positive queue sizes and worker counts are rejected."""
+        pipeline = Pipeline(data_loader, FakeEmbedder(), RecordingIndexer())
+
+        with pytest.raises(ValueError):
+            pipeline.run(concurrent=True, queue_size=0)
+        with pytest.raises(ValueError):
+            pipeline.run(concurrent=True, embed_workers=0)
+
+    @pytest.fixture
+    def csv_loader(self, tmp_path, documents):
+        """Create a DataLoader over a CSV file holding the sample documents."""
+        path = tmp_path / "messages.csv"
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["time", "location", "account", "message"])
+            writer.writeheader()
+            writer.writerows(doc.__dict__ for doc in documents)
+        return DataLoader(path)
+
+    @pytest.mark.parametrize("concurrent", [False, True])
+    def test_run_resumes_from_checkpoint(self, tmp_path, csv_loader, concurrent):
+        """Test that a crashed run resumes after the last acknowledged batch."""
+        checkpoint_path = tmp_path / "checkpoint.json"
+        crashing = RecordingIndexer(fail_after=2)
+        with pytest.raises(ConnectionError):
+            Pipeline(csv_loader, FakeEmbedder(), crashing, Checkpoint(checkpoint_path, "messages")).run(
+                batch_size=3, concurrent=concurrent, queue_size=1
+            )
+
+        indexer = RecordingIndexer()
+        checkpoint = Checkpoint(checkpoint_path, "messages")
+        Pipeline(csv_loader, FakeEmbedder(), indexer, checkpoint).run(batch_size=3, concurrent=concurrent)
+
+        assert indexer.batches == [["msg 6", "msg 7", "msg 8"], ["msg 9"]]
+        assert checkpoint.rows == 10
+        assert checkpoint.offset == csv_loader.corpus_path.stat().st_size
+
+    def test_run_skip_existing(self, data_loader, documents):
+        """Test that documents already in the index are not embedded again."""
+        indexer = RecordingIndexer()
+        indexer.existing_ids = Mock(
+            side_effect=lambda ids: {document_id(doc) for doc in documents[:5]} & set(ids)
+        )
+
+        Pipeline(data_loader, FakeEmbedder(), indexer).run(batch_size=4, skip_existing=True)
+
+        assert indexer.batches == [["msg 5", "msg 6", "msg 7"], ["msg 8", "msg 9"]]
+
+    @pytest.mark.parametrize("concurrent", [False, True])
+    def test_run_records_stage_metrics(self, tmp_path, data_loader, concurrent):
+        """Test that every stage reports its rows and batches and the final summary is written."""
+        path = tmp_path / "metrics.prom"
+        metrics = PipelineMetrics(prometheus_path=path)
+
+        Pipeline(data_loader, FakeEmbedder(), RecordingIndexer(), metrics=metrics).run(
+            batch_size=4, concurrent=concurrent
+        )
+
+        for stage in ("load", "embed", "index"):
+            assert (metrics.stages[stage].batches, metrics.stages[stage].rows) == (3, 10)
+        assert 'pipeline_stage_rows_total{stage="index"} 10' in path.read_text().splitlines()
+
+    @pytest.mark.parametrize("concurrent", [False, True])
+    def test_run_with_profile_dir(self, tmp_path, data_loader, documents, concurrent):
+        """Test that profiling overlapping stages works and writes one profile per stage."""
+        indexer = RecordingIndexer()
+        metrics = PipelineMetrics(profile_dir=tmp_path)
+
+        Pipeline(data_loader, FakeEmbedder(), indexer, metrics=metrics).run(
+            batch_size=2, concurrent=concurrent, embed_workers=2, index_workers=2
+        )
+
+        assert sorted(message for batch in indexer.batches for message in batch) == sorted(
+            doc.message for doc in documents
+        )
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["embed.prof", "index.prof", "load.prof"]
+
+    def test_run_counts_stage_errors(self, data_loader):
+        """Test that a failing stage is counted in the metrics."""
+        metrics = PipelineMetrics()
+
+        with pytest.raises(RuntimeError):
+            Pipeline(data_loader, FakeEmbedder(fail_on="msg 4"), RecordingIndexer(), metrics=metrics).run(
+                batch_size=2, concurrent=True
+            )
+
+        assert metrics.stages["embed"].errors == 1
+
+    def test_run_with_deduplicator(self, documents):
+        """Test that near-duplicates are not embedded and carry their group in the payload."""
+        messages = ["Bridge closed until further notice", "re: Bridge closed until further notice", "Fire"]
+        loader = Mock()
+        loader.load_column_batches_with_offsets.side_effect = lambda batch_size, start_offset: iter(
+            [(DocumentBatch.from_documents([Document("t", "l", "a", m) for m in messages]), None)]
+        )
+        indexer = RecordingIndexer()
+        indexer.index_embedded_batch = Mock()
+        embedder = FakeEmbedder()
+        embedder.embed_document_batch = Mock(side_effect=FakeEmbedder().embed_document_batch)
+        deduplicator = NearDuplicateDetector()
+
+        Pipeline(loader, embedder, indexer, deduplicator=deduplicator).run(batch_size=3)
+
+        assert embedder.embed_document_batch.call_args[0][0].message == [messages[0], messages[2]]
+        embedded = indexer.index_embedded_batch.call_args[0][0]
+        groups = embedded.payload["duplicate_group"]
+        assert groups[0] == groups[1] != groups[2]
+        assert deduplicator.saved_fraction == pytest.approx(1 / 3)
+
+    def test_run_with_labeler(self, data_loader):
+        """Test that the labeler adds its payload columns before the batch is indexed."""
+        labeler = Mock()
+        labeler.label_batch.side_effect = lambda batch: batch.payload.update(label=["x"] * len(batch))
+        indexer = RecordingIndexer()
+        indexer.index_embedded_batch = Mock()
+
+        Pipeline(data_loader, FakeEmbedder(), indexer, labeler=labeler).run(batch_size=5)
+
+        assert labeler.label_batch.call_count == 2
+        assert indexer.index_embedded_batch.call_args[0][0].payload["label"] == ["x"] * 5
@@ -0,0 +1,103 @@
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, PointStruct, VectorParams
+
+from src.indexing.qdrant_indexer import CollectionConfig, QdrantIndexer
+from src.snapshot import export_collection, import_snapshot, read_snapshot, snapshot_files, snapshot_metadata
+
+DIM = 8
+
+
+class TestSnapshot:
+    """Test cases for collection export and import."""
+
+    @pytest.fixture
+    def client(self):
+        """In-memory collection with 50 points spread over the 64-bit ID space."""
+        client = QdrantClient(":memory:")
+        client.create_collection("source", vectors_config=VectorParams(size=DIM, distance=Distance.COSINE))
+        rng = np.random.default_rng(0)
+        ids = [int(i) * 2 for i in rng.integers(0, 1 << 63, 50, dtype=np.uint64)]
+        points = [
+            PointStruct(
+                id=point_id,
+                vector=rng.random(DIM).tolist(),
+                payload={"message": f"message {i}", **({"label": "road damage"} if i % 2 else {})},
+            )
+            for i, point_id in enumerate(ids)
+        ]
+        client.upsert("source", points=points)
+        return client
+
+    @staticmethod
+    def _points(client, collection_name):
+        points, _ = client.scroll(collection_name, limit=1000, with_payload=True, with_vectors=True)
+        return {point.id: point for point in points}
+
+    @pytest.mark.parametrize("format", ["parquet", "arrow"])
+    def test_round_trip(self, client, tmp_path, format):
+        """Test that sharded export and bulk import restore every point, vector and payload."""
+        rows = export_collection(client, "source", tmp_path, shards=3, page_size=7, format=format)
+
+        assert rows == 50
+        assert len(snapshot_files(tmp_path)) == 3
+        assert snapshot_metadata(tmp_path) == {"collection": "source", "vector_size": str(DIM), "distance": "Cosine"}
+
+        with patch("src.indexing.qdrant_indexer.QdrantClient", return_value=client):
+            indexer = QdrantIndexer(collection_name="restored", collection_config=CollectionConfig(vector_size=DIM))
+        assert import_snapshot(tmp_path, indexer, batch_size=16) == 50
+
+        source, restored = self._points(client, "source"), self._points(client, "restored")
+        assert source.keys() == restored.keys()
+        for point_id, point in source.items():
+            assert restored[point_id].payload == point.payload
+            np.testing.assert_allclose(restored[point_id].vector, point.vector, rtol=1e-6)
+
+    def test_new_payload_fields_start_a_new_file(self, client, tmp_path):
+        """Test that a page bringing new payload fields is written to a new file."""
+        points, _ = client.scroll("source", limit=1000)
+        client.set_payload("source", payload={"best_score": 0.5}, points=[max(point.id for point in points)])
+
+        export_collection(client, "source", tmp_path, page_size=10)
+
+        assert [path.name for path in snapshot_files(tmp_path)] == ["part-00000-00000.parquet", "part-00000-00001.parquet"]
+        payloads = [payload for _, _, batch in read_snapshot(tmp_path) for payload in batch]
+        assert len(payloads) == 50
+        assert sum("best_score" in payload for payload in payloads) == 1
+
+    def test_payload_types_survive_pages_without_values(self, client, tmp_path):
+        """Test that a field that is None on a whole page keeps the type of its later values."""
+        points, _ = client.scroll("source", limit=1000)
+        ids = sorted(point.id for point in points)
+        client.set_payload("source", payload={"timestamp": None, "best_score": None}, points=ids[:10])
+        client.set_payload("source", payload={"timestamp": 1586131200, "best_score": 0.5}, points=ids[10:])
+
+        export_collection(client, "source", tmp_path, page_size=10)
+
+        # The indexed timestamp field is an integer column from the start; best_score needs a new file
+        assert len(snapshot_files(tmp_path)) == 2
+        payloads = [payload for _, _, batch in read_snapshot(tmp_path) for payload in batch]
+        assert [payload["timestamp"] for payload in payloads if "timestamp" in payload] == [1586131200] * 40
+        assert [payload["best_score"] for payload in payloads if "best_score" in payload] == [0.5] * 40
+
+    def test_read_snapshot_batches(self, client, tmp_path):
+        """Test that snapshots are read in batches of at most batch_size points."""
+        export_collection(client, "source", tmp_path, format="arrow")
+
+        batches = list(read_snapshot(tmp_path, batch_size=20))
+
+        assert [len(ids) for ids, _, _ in batches] == [20, 20, 10]
+        assert batches[0][1].shape == (20, DIM) and batches[0][1].dtype == np.float32
+
+    def test_unknown_format(self, client, tmp_path):
+        """Test that an unknown snapshot format is rejected."""
+        with pytest.raises(ValueError, match="Unknown snapshot format"):
+            export_collection(client, "source", tmp_path, format="csv")
+
+    def test_metadata_of_empty_directory(self, tmp_path):
+        """Test that reading the metadata of a directory without snapshot files fails."""
+        with pytest.raises(FileNotFoundError):
+            snapshot_metadata(tmp_path)
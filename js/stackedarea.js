@@ -14,6 +14,48 @@ class StackedAreaChart {
         this.regionName = null; // 新增属性：地区名称
     }
 
+    // 一次请求搜索多个词条：服务端批量编码、批量检索并合并去重，每条消息带最匹配的词条
+    async searchTermsBatch(terms) {
+        try {
+            // 时间范围交给服务端过滤（Qdrant 按 timestamp 索引），只返回所需的消息
+            const timeFilter = window.filterManager ? window.filterManager.getTimeFilter() : {};
+            const filters = {
+                start: timeFilter.startTime || null,
+                end: timeFilter.endTime || null
+            };
+            
+            const searchResponse = await fetch('http://127.0.0.1:8000/search/batch', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({ queries: terms, limit: 20000, merge: true, filters })
+            });
+            
+            if (!searchResponse.ok) {
+                console.warn(`批量搜索失败: HTTP ${searchResponse.status}`);
+                return [];
+            }
+            
+            const searchData = await searchResponse.json();
+            console.log(`批量搜索 ${terms.length} 个词条，找到 ${searchData.results.length} 条去重后的结果`);
+            
+            // 将搜索结果转换为统一格式
+            return searchData.results.map(result => ({
+                payload: {
+                    time: result.time,
+                    location: result.location,
+                    account: result.account,
+                    message: result.message,
+                    label: result.label || result.main_category || 'all data'
+                }
+            }));
+        } catch (searchError) {
+            console.warn('批量搜索失败:', searchError);
+            return [];
+        }
+    }
+
     // 从Qdrant向量数据库获取数据的函数
     async fetchDataFromQdrant(selectedFilters = null) {
         try {
@@ -26,35 +68,8 @@ class StackedAreaChart {
                     // 向量搜索模式
                     const searchTerms = selectedFilters.vector_search;
                     
-                    for (const term of searchTerms) {
-                        try {
-                            console.log(`堆叠面积图正在进行向量搜索: "${term}"`);
-                            
-                            // 调用Python搜索API
-                            const searchResponse = await fetch(`http://127.0.0.1:8000/search/vector?query=${encodeURIComponent(term)}&limit=20000`, {
-                                method: 'GET'
-                            });
-                            
-                            if (searchResponse.ok) {
-                                const searchData = await searchResponse.json();
-                                console.log(`向量搜索 "${term}" 找到 ${searchData.results.length} 条结果`);
-                                
-                                // 将搜索结果转换为统一格式
-                                const formattedResults = searchData.results.map(result => ({
-                                    payload: {
-                                        time: result.time,
-                                        location: result.location,
-                                        account: result.account,
-                                        message: result.message,
-                                        label: result.label || result.main_category || 'all data'
-                                    }
-                                }));
-                                allResults.push(...formattedResults);
-                            }
-                        } catch (searchError) {
-                            console.warn(`向量搜索 "${term}" 失败:`, searchError);
-                        }
-                    }
+                    console.log(`堆叠面积图正在进行向量搜索: ${searchTerms.join(", ")}`);
+                    allResults = await this.searchTermsBatch(searchTerms);
                 } else if (Object.keys(selectedFilters).some(key => selectedFilters[key].length > 0)) {
                     // 常规分类筛选模式
                     // 收集所有选中的词条
@@ -68,36 +83,8 @@ class StackedAreaChart {
                     if (selectedTerms.length > 0) {
                         console.log('堆叠面积图选中的搜索关键词:', selectedTerms);
                         
-                        // 对每个选中的词条进行向量搜索
-                        for (const term of selectedTerms) {
-                            try {
-                                console.log(`堆叠面积图正在搜索关键词: "${term}"`);
-                                
-                                // 调用Python搜索API
-                                const searchResponse = await fetch(`http://127.0.0.1:8000/search/vector?query=${encodeURIComponent(term)}&limit=20000`, {
-                                    method: 'GET'
-                                });
-                                
-                                if (searchResponse.ok) {
-                                    const searchData = await searchResponse.json();
-                                    console.log(`关键词 "${term}" 搜索到 ${searchData.results.length} 条结果`);
-                                    
-                                    // 将搜索结果转换为统一格式
-                                    const formattedResults = searchData.results.map(result => ({
-                                        payload: {
-                                            time: result.time,
-                                            location: result.location,
-                                            account: result.account,
-                                            message: result.message,
-                                            label: result.label || result.main_category || 'all data'
-                                        }
-                                    }));
-                                    allResults.push(...formattedResults);
-                                }
-                            } catch (searchError) {
-                                console.warn(`搜索词条 "${term}" 失败:`, searchError);
-                            }
-                        }
+                        // 所有选中的词条一次批量搜索
+                        allResults = await this.searchTermsBatch(selectedTerms);
                     } else {
                         // 有筛选条件但没有选中任何词条，返回空数组
                         return [];
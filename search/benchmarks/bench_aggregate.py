@@ -0,0 +1,90 @@
+"""
+Response size and latency of /aggregate against downloading the raw messages.
+
+Builds the aggregate cube from data/YInt_w_label.csv (optionally repeated
+`--scale` times with distinct accounts, to see how the cube grows) and runs
+the queries behind each dashboard view: messages and users per neighborhood
+(map), messages per 5-minute bucket and category (stacked area) and per main
+and sub category (circle packing), each also with a one-day time slice and a
+location filter. Reported per query: rows returned, JSON bytes of the
+AggregateResponse and p50 latency. The baseline is the JSON the dashboards
+download today: every message with time, location, account, message and
+label. No Qdrant server or model needed; run from the search directory:
+
+    uv run python -m benchmarks.bench_aggregate --scale 10
+"""
+import argparse
+import csv
+import json
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from src.cube import AggregateCube
+from src.models.models import AggregateResponse
+
+RAW_FIELDS = ["time", "location", "account", "message", "label"]
+
+QUERIES = {
+    "map: location": dict(group_by=["location"]),
+    "map: location, one day": dict(group_by=["location"], start="2020-04-08 00:00:00", end="2020-04-08 23:59:59"),
+    "stacked area: time x category": dict(group_by=["time", "category"]),
+    "stacked area: one location": dict(group_by=["time", "category"], locations=["Downtown"]),
+    "stacked area: hourly": dict(group_by=["time", "category"], bucket_seconds=3600),
+    "circle packing: main x category": dict(group_by=["main_category", "category"]),
+}
+
+
+def load_corpus(path: Path, scale: int) -> List[Dict[str, str]]:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        rows = list(csv.DictReader(f))
+    return [{**row, "account": f"{row['account']}#{copy}"} for copy in range(scale) for row in rows]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default="../data/YInt_w_label.csv")
+    parser.add_argument("--scale", type=int, default=1, help="copies of the corpus (with distinct accounts)")
+    parser.add_argument("--bucket-seconds", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per query")
+    args = parser.parse_args()
+
+    rows = load_corpus(Path(args.corpus), args.scale)
+    started = time.perf_counter()
+    cube = AggregateCube(
+        [row["time"] for row in rows],
+        [row["location"] for row in rows],
+        [row["account"] for row in rows],
+        [row["label"] for row in rows],
+        [row["main_category"] for row in rows],
+        bucket_seconds=args.bucket_seconds,
+    )
+    build = time.perf_counter() - started
+    raw = len(json.dumps([{field: row[field] for field in RAW_FIELDS} for row in rows]).encode())
+    print(f"{cube.rows} messages, {cube.cells} non-empty cells, built in {build:.2f} s")
+    print(f"raw messages as JSON: {raw / 1024:,.0f} KB\n")
+
+    print(f"{'query':<34} {'rows':>7} {'KB':>9} {'vs raw':>8} {'p50 ms':>8}")
+    for name, query in QUERIES.items():
+        latencies = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            result = cube.query(**query)
+            latencies.append(time.perf_counter() - started)
+        response = AggregateResponse(
+            rows=result,
+            group_by=query["group_by"],
+            bucket_seconds=query.get("bucket_seconds", args.bucket_seconds),
+            total_rows=len(result),
+        )
+        size = len(response.model_dump_json(exclude_none=True).encode())
+        print(
+            f"{name:<34} {len(result):>7} {size / 1024:>9,.1f} {size / raw:>8.1%} "
+            f"{np.median(latencies) * 1000:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Latency of QdrantSearchClient.search for cold, half-warm and hot queries.
+
+The messages in data/YInt_w_label.csv are embedded and indexed once, then
+every category term from data/categories.json is searched three ways:
+
+    cold    both caches empty: encode the query and search Qdrant
+    warm    query embedding cached, results not: search Qdrant only
+    hot     results cached: no model call, no Qdrant call
+
+Reported per pass: p50/p99 latency; the hot pass follows a prewarm of all
+terms, which is timed too. The caches' hit rates are printed at the end.
+Finally one point is added to the collection to show that cached results are
+dropped when the point count changes. Run from the search directory, against
+a server or in-process:
+
+    uv run python -m benchmarks.bench_cache --location http://localhost:6333
+"""
+import argparse
+import csv
+import json
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+from qdrant_client.models import Batch, Distance, PointStruct, VectorParams
+
+from src.clients.qdrant_client import QdrantSearchClient
+
+COLLECTION = "bench_cache"
+
+
+def load_corpus(path: Path, rows: int) -> List[Dict[str, str]]:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return [row for _, row in zip(range(rows), csv.DictReader(f))]
+
+
+def load_terms(path: Path) -> List[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [term for terms in json.load(f).values() for term in terms]
+
+
+def timed_pass(terms: List[str], search: Callable[[str], object], before: Callable[[], None]) -> List[float]:
+    latencies = []
+    for term in terms:
+        before()
+        started = time.perf_counter()
+        search(term)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--location", default="http://localhost:6333", help='Qdrant URL, local path or ":memory:"')
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L12-v2")
+    parser.add_argument("--corpus", default="../data/YInt_w_label.csv")
+    parser.add_argument("--categories", default="../data/categories.json")
+    parser.add_argument("--rows", type=int, default=10_000, help="messages to index")
+    parser.add_argument("--limit", type=int, default=20_000, help="results per query, as the dashboards ask")
+    args = parser.parse_args()
+
+    client = QdrantSearchClient(
+        model_name=args.model, location=args.location, collection_name=COLLECTION, version_check_interval=0
+    )
+    rows = load_corpus(Path(args.corpus), args.rows)
+    terms = load_terms(Path(args.categories))
+    vectors = client.model.encode([row["message"] for row in rows], batch_size=256)
+    if client.client.collection_exists(COLLECTION):
+        client.client.delete_collection(COLLECTION)
+    client.client.create_collection(
+        COLLECTION, vectors_config=VectorParams(size=vectors.shape[1], distance=Distance.COSINE)
+    )
+    client.client.upsert(
+        COLLECTION, points=Batch(ids=list(range(len(rows))), vectors=vectors.tolist(), payloads=rows), wait=True
+    )
+    print(f"{len(rows)} points, {len(terms)} query terms, limit {args.limit}\n")
+
+    def clear_all() -> None:
+        client.embedding_cache.clear()
+        client.result_cache.clear()
+
+    def search(term: str) -> object:
+        return client.search(term, limit=args.limit)
+
+    passes = {
+        "cold": timed_pass(terms, search, clear_all),
+        "warm (embedding cached)": timed_pass(terms, search, client.result_cache.clear),
+    }
+    started = time.perf_counter()
+    client.prewarm(terms, limit=args.limit)
+    prewarm = time.perf_counter() - started
+    passes["hot (results cached)"] = timed_pass(terms, search, lambda: None)
+    print(f"{'pass':<26} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, latencies in passes.items():
+        latencies_ms = np.array(latencies) * 1000
+        print(f"{name:<26} {np.percentile(latencies_ms, 50):>8.2f} {np.percentile(latencies_ms, 99):>8.2f}")
+
+    print(f"\nprewarming all {len(terms)} terms (one batch): {prewarm * 1000:.0f} ms")
+    for name, stats in client.cache_stats().items():
+        print(f"{name} cache: {stats['hits']} hits, {stats['misses']} misses, hit rate {stats['hit_rate']:.1%}")
+
+    client.client.upsert(
+        COLLECTION, points=[PointStruct(id=len(rows), vector=vectors[0].tolist(), payload=rows[0])], wait=True
+    )
+    misses = client.result_cache.misses
+    search(terms[0])
+    print(f"\nafter adding a point: result cache {'missed' if client.result_cache.misses > misses else 'hit'}")
+
+
+if __name__ == "__main__":
+    main()
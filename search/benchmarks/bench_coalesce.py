@@ -0,0 +1,116 @@
+"""
+Throughput and latency of coalesced searches for several wait and batch settings.
+
+The messages in data/YInt_w_label.csv are embedded and indexed once. Then
+`--clients` coroutines each send single searches (category terms, caches
+off) through AsyncQdrantSearchClient.asearch as fast as they get answers,
+for `--requests` searches per run, with the coalescer set to:
+
+    off          max_batch 1: every search encoded and sent on its own
+    wait 0 ms    searches submitted in the same loop iteration share a batch
+    wait N ms    the first search of a batch waits up to N ms for others
+
+Reported per setting and client count: searches per second, p50/p99
+latency and the mean batch size. With one client, waiting only adds
+latency; with many, batches fill up and one encode call serves them all.
+Run from the search directory, against a server or in-process:
+
+    uv run python -m benchmarks.bench_coalesce --location http://localhost:6333 --clients 1,4,16,64
+"""
+import argparse
+import asyncio
+import csv
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+from qdrant_client.models import Batch, Distance, VectorParams
+
+from src.clients.async_qdrant_client import AsyncQdrantSearchClient
+
+COLLECTION = "bench_coalesce"
+
+
+def load_corpus(path: Path, rows: int) -> List[Dict[str, str]]:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return [row for _, row in zip(range(rows), csv.DictReader(f))]
+
+
+def load_terms(path: Path) -> List[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [term for terms in json.load(f).values() for term in terms]
+
+
+async def run_clients(
+    client: AsyncQdrantSearchClient, clients: int, terms: List[str], requests: int, limit: int
+) -> Tuple[float, np.ndarray]:
+    queue = [terms[i % len(terms)] for i in range(requests)]
+    latencies: List[float] = []
+
+    async def search_loop() -> None:
+        while queue:
+            query = queue.pop()
+            started = time.perf_counter()
+            await client.asearch(query, limit=limit)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(search_loop() for _ in range(clients)))
+    return requests / (time.perf_counter() - started), np.array(latencies) * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--location", default="http://localhost:6333", help='Qdrant URL, local path or ":memory:"')
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L12-v2")
+    parser.add_argument("--corpus", default="../data/YInt_w_label.csv")
+    parser.add_argument("--categories", default="../data/categories.json")
+    parser.add_argument("--rows", type=int, default=10_000, help="messages to index")
+    parser.add_argument("--clients", default="1,4,16,64", help="concurrent clients, comma separated")
+    parser.add_argument("--requests", type=int, default=256, help="searches per run")
+    parser.add_argument("--limit", type=int, default=100, help="results per search")
+    parser.add_argument("--waits", default="0,2,5", help="max wait settings in ms, comma separated")
+    parser.add_argument("--max-batch", type=int, default=32)
+    args = parser.parse_args()
+
+    client = AsyncQdrantSearchClient(
+        model_name=args.model,
+        location=args.location,
+        collection_name=COLLECTION,
+        embedding_cache_size=0,
+        result_cache_size=0,
+    )
+    rows = load_corpus(Path(args.corpus), args.rows)
+    terms = load_terms(Path(args.categories))
+    vectors = client.model.encode([row["message"] for row in rows], batch_size=256)
+    if client.client.collection_exists(COLLECTION):
+        client.client.delete_collection(COLLECTION)
+    client.client.create_collection(
+        COLLECTION, vectors_config=VectorParams(size=vectors.shape[1], distance=Distance.COSINE)
+    )
+    client.client.upsert(
+        COLLECTION, points=Batch(ids=list(range(len(rows))), vectors=vectors.tolist(), payloads=rows), wait=True
+    )
+    print(f"{len(rows)} points, {args.requests} searches per run, limit {args.limit}\n")
+
+    settings = [("off", 0.0, 1)] + [
+        (f"wait {wait} ms", float(wait) / 1000, args.max_batch) for wait in args.waits.split(",")
+    ]
+    print(f"{'coalescer':<12} {'clients':>7} {'search/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'mean batch':>11}")
+    for clients in sorted(int(value) for value in args.clients.split(",")):
+        for name, max_wait, max_batch in settings:
+            client.coalescer.max_wait, client.coalescer.max_batch = max_wait, max_batch
+            batches, items = client.coalescer.batches, client.coalescer.items
+            throughput, latencies_ms = await run_clients(client, clients, terms, args.requests, args.limit)
+            mean_batch = (client.coalescer.items - items) / max(1, client.coalescer.batches - batches)
+            print(
+                f"{name:<12} {clients:>7} {throughput:>9.1f} {np.percentile(latencies_ms, 50):>8.1f} "
+                f"{np.percentile(latencies_ms, 99):>8.1f} {mean_batch:>11.1f}"
+            )
+    await client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,137 @@
+"""
+Throughput and event loop stalls of blocking versus async search under concurrent clients.
+
+The messages in data/YInt_w_label.csv are embedded and indexed once. Then
+`--clients` coroutines on one event loop each search category terms as fast
+as they can, for `--requests` searches in total, two ways:
+
+    blocking    VectorSearchUseCase.run called from the coroutine, as the
+                /search/vector route did: encoding and the Qdrant call hold
+                the event loop, so requests are served one at a time
+    async       VectorSearchUseCase.arun: encoding in the encode pool,
+                Qdrant through AsyncQdrantClient with pooled connections
+
+Both caches are off, so every search encodes and queries Qdrant. Reported
+per mode and client count: searches per second, p50/p99 latency, and the
+longest stall of a 10 ms heartbeat task standing in for every other request
+on the worker. Against a server, async throughput grows with the clients
+while Qdrant works on several queries at once; in-process (":memory:" or a
+path) Qdrant runs in the encode pool and, being Python, still holds the GIL
+much of the time, so the stalls only shrink. Run from the search directory:
+
+    uv run python -m benchmarks.bench_concurrency --location http://localhost:6333 --clients 1,4,16
+"""
+import argparse
+import asyncio
+import csv
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+from qdrant_client.models import Batch, Distance, VectorParams
+
+from src.clients.async_qdrant_client import AsyncQdrantSearchClient
+from src.use_cases.vector_search import VectorSearchInput, VectorSearchUseCase
+
+COLLECTION = "bench_concurrency"
+
+
+def load_corpus(path: Path, rows: int) -> List[Dict[str, str]]:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return [row for _, row in zip(range(rows), csv.DictReader(f))]
+
+
+def load_terms(path: Path) -> List[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [term for terms in json.load(f).values() for term in terms]
+
+
+async def heartbeat(stop: asyncio.Event, interval: float = 0.01) -> float:
+    """Longest delay past `interval` between ticks until `stop` is set."""
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+
+async def run_clients(
+    use_case: VectorSearchUseCase, mode: str, clients: int, terms: List[str], requests: int, limit: int
+) -> Tuple[float, np.ndarray, float]:
+    queue = [terms[i % len(terms)] for i in range(requests)]
+    latencies: List[float] = []
+
+    async def client() -> None:
+        while queue:
+            input_data = VectorSearchInput(queue.pop(), limit=limit)
+            started = time.perf_counter()
+            if mode == "blocking":
+                use_case.run(input_data)
+            else:
+                await use_case.arun(input_data)
+            latencies.append(time.perf_counter() - started)
+
+    stop = asyncio.Event()
+    beat = asyncio.create_task(heartbeat(stop))
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    return requests / elapsed, np.array(latencies) * 1000, await beat * 1000
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--location", default="http://localhost:6333", help='Qdrant URL, local path or ":memory:"')
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L12-v2")
+    parser.add_argument("--corpus", default="../data/YInt_w_label.csv")
+    parser.add_argument("--categories", default="../data/categories.json")
+    parser.add_argument("--rows", type=int, default=10_000, help="messages to index")
+    parser.add_argument("--clients", default="1,4,16", help="concurrent clients, comma separated")
+    parser.add_argument("--requests", type=int, default=64, help="searches per run")
+    parser.add_argument("--limit", type=int, default=1000, help="results per search")
+    parser.add_argument("--encode-workers", type=int, default=None, help="encode pool size (ENCODE_WORKERS)")
+    args = parser.parse_args()
+
+    client = AsyncQdrantSearchClient(
+        model_name=args.model,
+        location=args.location,
+        collection_name=COLLECTION,
+        embedding_cache_size=0,
+        result_cache_size=0,
+        encode_workers=args.encode_workers,
+    )
+    use_case = VectorSearchUseCase(client)
+    rows = load_corpus(Path(args.corpus), args.rows)
+    terms = load_terms(Path(args.categories))
+    vectors = client.model.encode([row["message"] for row in rows], batch_size=256)
+    if client.client.collection_exists(COLLECTION):
+        client.client.delete_collection(COLLECTION)
+    client.client.create_collection(
+        COLLECTION, vectors_config=VectorParams(size=vectors.shape[1], distance=Distance.COSINE)
+    )
+    client.client.upsert(
+        COLLECTION, points=Batch(ids=list(range(len(rows))), vectors=vectors.tolist(), payloads=rows), wait=True
+    )
+    print(f"{len(rows)} points, {args.requests} searches per run, limit {args.limit}, "
+          f"{client.encode_workers} encode worker(s)\n")
+
+    print(f"{'mode':<9} {'clients':>7} {'search/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'max stall ms':>13}")
+    for clients in sorted(int(value) for value in args.clients.split(",")):
+        for mode in ("blocking", "async"):
+            throughput, latencies_ms, stall_ms = await run_clients(
+                use_case, mode, clients, terms, args.requests, args.limit
+            )
+            print(
+                f"{mode:<9} {clients:>7} {throughput:>9.1f} {np.percentile(latencies_ms, 50):>8.1f} "
+                f"{np.percentile(latencies_ms, 99):>8.1f} {stall_ms:>13.1f}"
+            )
+    await client.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,114 @@
+"""
+Rows returned and latency of filtered versus unfiltered searches as the corpus grows.
+
+The messages in data/YInt_w_label.csv are embedded once and indexed
+`--scales` times over (copies get distinct IDs and accounts), with the same
+payload indexes the indexing pipeline creates. For every size, each category
+term is searched without filters, then with the filters the dashboards use:
+one day, one neighborhood, one main category. Filtering in the browser
+transfers all unfiltered hits; Qdrant returns only the matching rows and
+uses the payload indexes to avoid scoring the rest. Payload indexes have no
+effect in the in-process local mode, so run against a server, from the
+search directory:
+
+    uv run python -m benchmarks.bench_filters --location http://localhost:6333 --scales 1,4,16
+"""
+import argparse
+import csv
+import json
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+from qdrant_client.models import Batch, Distance, PayloadSchemaType, VectorParams
+
+from src.clients.qdrant_client import QdrantSearchClient
+from src.filters import epoch_seconds
+from src.models.models import SearchFilters
+
+COLLECTION = "bench_filters"
+
+# Same as the indexing pipeline's CollectionConfig.payload_indexes
+PAYLOAD_INDEXES = {
+    "timestamp": PayloadSchemaType.INTEGER,
+    "location": PayloadSchemaType.KEYWORD,
+    "account": PayloadSchemaType.KEYWORD,
+    "main_category": PayloadSchemaType.KEYWORD,
+    "label": PayloadSchemaType.KEYWORD,
+}
+
+FILTERS = {
+    "none": None,
+    "one day": SearchFilters(start="2020-04-08 00:00:00", end="2020-04-08 23:59:59"),
+    "one neighborhood": SearchFilters(locations=["Downtown"]),
+    "one main category": SearchFilters(main_categories=["Emergency Help"]),
+    "day + neighborhood": SearchFilters(start="2020-04-08 00:00:00", end="2020-04-08 23:59:59", locations=["Downtown"]),
+}
+
+
+def load_corpus(path: Path) -> List[Dict[str, str]]:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def load_terms(path: Path) -> List[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [term for terms in json.load(f).values() for term in terms]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--location", default="http://localhost:6333", help='Qdrant URL, local path or ":memory:"')
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L12-v2")
+    parser.add_argument("--corpus", default="../data/YInt_w_label.csv")
+    parser.add_argument("--categories", default="../data/categories.json")
+    parser.add_argument("--scales", default="1,4,16", help="corpus copies to index, comma separated")
+    parser.add_argument("--limit", type=int, default=20_000, help="results per query, as the dashboards ask")
+    args = parser.parse_args()
+
+    # No result cache: every search goes to Qdrant
+    client = QdrantSearchClient(
+        model_name=args.model, location=args.location, collection_name=COLLECTION, result_cache_size=0
+    )
+    rows = load_corpus(Path(args.corpus))
+    terms = load_terms(Path(args.categories))
+    vectors = client.model.encode([row["message"] for row in rows], batch_size=256)
+    if client.client.collection_exists(COLLECTION):
+        client.client.delete_collection(COLLECTION)
+    client.client.create_collection(
+        COLLECTION, vectors_config=VectorParams(size=vectors.shape[1], distance=Distance.COSINE)
+    )
+    for field_name, schema in PAYLOAD_INDEXES.items():
+        client.client.create_payload_index(COLLECTION, field_name=field_name, field_schema=schema)
+    client.prewarm(terms, limit=1)  # encode the terms once; latencies below are Qdrant only
+
+    print(f"{'points':>8} {'filter':<20} {'rows/query':>11} {'p50 ms':>8} {'p99 ms':>8}")
+    indexed = 0
+    for scale in sorted(int(value) for value in args.scales.split(",")):
+        while indexed < scale:
+            payloads = [
+                {**row, "label": row["label"].lower(), "account": f"{row['account']}#{indexed}",
+                 "timestamp": epoch_seconds(row["time"])}
+                for row in rows
+            ]
+            ids = list(range(indexed * len(rows), (indexed + 1) * len(rows)))
+            client.client.upsert(COLLECTION, points=Batch(ids=ids, vectors=vectors.tolist(), payloads=payloads))
+            indexed += 1
+
+        for name, filters in FILTERS.items():
+            latencies, returned = [], []
+            for term in terms:
+                started = time.perf_counter()
+                results = client.search(term, limit=args.limit, filters=filters)
+                latencies.append(time.perf_counter() - started)
+                returned.append(len(results))
+            latencies_ms = np.array(latencies) * 1000
+            print(
+                f"{indexed * len(rows):>8} {name:<20} {np.mean(returned):>11.0f} "
+                f"{np.percentile(latencies_ms, 50):>8.1f} {np.percentile(latencies_ms, 99):>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
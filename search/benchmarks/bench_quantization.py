@@ -0,0 +1,151 @@
+"""
+Compare collection storage settings for QdrantSearchClient.search.
+
+The messages in data/YInt_w_label.csv are embedded once and indexed into one
+collection per variant (plain float32, scalar int8, binary, each quantized
+variant with its original vectors on disk). Every category term from
+data/categories.json is then searched through QdrantSearchClient.search and
+compared with an exact (brute-force) search over the plain collection.
+
+Reported per variant: approximate vector RAM, p50/p99 query latency and
+recall@k. Latency includes encoding the query, which is the same for every
+variant. Qdrant's in-process local mode ignores quantization and HNSW, so run
+against a server, from the search directory:
+
+    uv run python -m benchmarks.bench_quantization --location http://localhost:6333
+"""
+import argparse
+import csv
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+from qdrant_client.models import (
+    Batch,
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    CollectionStatus,
+    Distance,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    VectorParams,
+)
+
+from src.clients.qdrant_client import QdrantSearchClient
+
+DIM = 384
+
+INT8 = ScalarQuantization(scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True))
+BINARY = BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+
+# name: (quantization config, original vectors on disk, quantized bytes per vector)
+VARIANTS = {
+    "float32 (current)": (None, False, 0),
+    "int8": (INT8, False, DIM),
+    "int8, originals on disk": (INT8, True, DIM),
+    "binary, originals on disk": (BINARY, True, DIM // 8),
+}
+
+
+def load_corpus(path: Path, rows: int) -> List[Dict[str, str]]:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return [row for _, row in zip(range(rows), csv.DictReader(f))]
+
+
+def load_terms(path: Path) -> List[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [term for terms in json.load(f).values() for term in terms]
+
+
+def result_key(time_: str, account: str, message: str) -> Tuple[str, str, str]:
+    return time_, account, message
+
+
+def create_variant(client, name: str, quantization, on_disk: bool, vectors: np.ndarray, payloads) -> None:
+    if client.collection_exists(name):
+        client.delete_collection(name)
+    client.create_collection(
+        collection_name=name,
+        vectors_config=VectorParams(size=DIM, distance=Distance.COSINE, on_disk=on_disk or None),
+        quantization_config=quantization,
+    )
+    for start in range(0, len(vectors), 1024):
+        client.upsert(
+            collection_name=name,
+            points=Batch(
+                ids=list(range(start, start + len(vectors[start:start + 1024]))),
+                vectors=vectors[start:start + 1024].tolist(),
+                payloads=payloads[start:start + 1024],
+            ),
+        )
+    while client.get_collection(name).status != CollectionStatus.GREEN:
+        time.sleep(0.5)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--location", default="http://localhost:6333", help='Qdrant URL, local path or ":memory:"')
+    parser.add_argument("--corpus", default="../data/YInt_w_label.csv")
+    parser.add_argument("--categories", default="../data/categories.json")
+    parser.add_argument("--rows", type=int, default=10_000, help="messages to index")
+    parser.add_argument("--limit", type=int, default=100, help="results per query (recall@limit)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed passes over the query terms")
+    parser.add_argument("--oversampling", type=float, default=2.0, help="candidates fetched before rescoring")
+    args = parser.parse_args()
+
+    search_client = QdrantSearchClient(location=args.location, rescore=True, oversampling=args.oversampling)
+    client = search_client.client
+
+    rows = load_corpus(Path(args.corpus), args.rows)
+    terms = load_terms(Path(args.categories))
+    payloads = [{key: row[key] for key in ("time", "location", "account", "message")} for row in rows]
+    vectors = search_client.model.encode([row["message"] for row in rows], batch_size=64).astype(np.float32)
+    query_vectors = search_client.model.encode(terms)
+    print(f"{len(rows)} points, {len(terms)} query terms, limit {args.limit}")
+
+    collections = {}
+    for index, (label, (quantization, on_disk, quantized_bytes)) in enumerate(VARIANTS.items()):
+        name = f"bench_quantization_{index}"
+        create_variant(client, name, quantization, on_disk, vectors, payloads)
+        collections[label] = (name, (0 if on_disk else DIM * 4) + quantized_bytes)
+
+    # Ground truth: exact search over the float32 collection, same score threshold as the service
+    baseline = collections["float32 (current)"][0]
+    truth: List[Set[Tuple[str, str, str]]] = []
+    for vector in query_vectors:
+        points = client.query_points(
+            collection_name=baseline,
+            query=vector.tolist(),
+            limit=args.limit,
+            score_threshold=0.2,
+            search_params=SearchParams(exact=True),
+        ).points
+        truth.append({result_key(p.payload["time"], p.payload["account"], p.payload["message"]) for p in points})
+
+    print(f"{'variant':<28} {'vector RAM':>12} {'p50 ms':>8} {'p99 ms':>8} {'recall':>8}")
+    for label, (name, bytes_per_vector) in collections.items():
+        search_client.collection_name = name
+        latencies = []
+        recalls = []
+        for repeat in range(args.repeat):
+            for term, expected in zip(terms, truth):
+                started = time.perf_counter()
+                results = search_client.search(term, limit=args.limit)
+                latencies.append(time.perf_counter() - started)
+                if repeat == 0 and expected:
+                    found = {result_key(r.time, r.account, r.message) for r in results}
+                    recalls.append(len(found & expected) / len(expected))
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        ram = bytes_per_vector * len(rows) / 1e6
+        print(f"{label:<28} {ram:>9.1f} MB {p50:>8.1f} {p99:>8.1f} {np.mean(recalls):>8.3f}")
+
+    for name, _ in collections.values():
+        client.delete_collection(name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Encode time and payload size of the /search/vector response formats.
+
+Search results are built from the messages in data/YInt_w_label.csv (as
+many as `--rows`, the corpus repeated if needed, labeled with one query as
+/search/vector does) and encoded four ways:
+
+    pydantic        SearchResponse.model_dump_json: a lower bound for the
+                    current response
+    fastapi         what FastAPI does with response_model=SearchResponse:
+                    validate the response, dump it to Python, json.dumps
+    columnar        format=columnar: column arrays, orjson
+    arrow           format=arrow: Arrow IPC stream
+
+Reported per format: p50 encode time, bytes, and bytes after gzip (as sent
+with HTTP compression). No Qdrant server or model needed; run from the
+search directory:
+
+    uv run --extra fast python -m benchmarks.bench_response_format --rows 20000
+"""
+import argparse
+import csv
+import gzip
+import json
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from src.columnar import encode_arrow, encode_columnar
+from src.models.models import SearchResponse, SearchResult
+
+QUERY = "Road damage"
+
+
+def load_results(path: Path, rows: int) -> List[SearchResult]:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        corpus = list(csv.DictReader(f))
+    scores = np.linspace(0.9, 0.2, rows)
+    return [
+        SearchResult(
+            time=row["time"],
+            location=row["location"],
+            account=row["account"],
+            message=row["message"],
+            label=QUERY,
+            score=float(score),
+        )
+        for row, score in zip((corpus[i % len(corpus)] for i in range(rows)), scores)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default="../data/YInt_w_label.csv")
+    parser.add_argument("--rows", type=int, default=20_000, help="results per response")
+    parser.add_argument("--repeat", type=int, default=10, help="timed runs per format")
+    args = parser.parse_args()
+
+    results = load_results(Path(args.corpus), args.rows)
+
+    def fastapi_json() -> bytes:
+        response = SearchResponse(results=results, query=QUERY, total_results=len(results))
+        validated = SearchResponse.model_validate(response.model_dump())
+        return json.dumps(validated.model_dump(mode="json"), ensure_ascii=False).encode()
+
+    formats: Dict[str, Callable[[], bytes]] = {
+        "pydantic": lambda: SearchResponse(
+            results=results, query=QUERY, total_results=len(results)
+        ).model_dump_json().encode(),
+        "fastapi": fastapi_json,
+        "columnar": lambda: encode_columnar(results, QUERY),
+        "arrow": lambda: encode_arrow(results, QUERY),
+    }
+
+    timings, bodies = {}, {}
+    for name, encode in formats.items():
+        latencies = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            bodies[name] = encode()
+            latencies.append(time.perf_counter() - started)
+        timings[name] = np.median(latencies)
+
+    print(f"{len(results)} results\n")
+    print(f"{'format':<10} {'p50 ms':>8} {'KB':>9} {'gzip KB':>9} {'vs fastapi':>11}")
+    for name, body in bodies.items():
+        print(
+            f"{name:<10} {timings[name] * 1000:>8.1f} {len(body) / 1024:>9,.0f} "
+            f"{len(gzip.compress(body)) / 1024:>9,.0f} {len(body) / len(bodies['fastapi']):>11.1%}"
+        )
+
+if __name__ == "__main__":
+    main()
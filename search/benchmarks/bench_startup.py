@@ -0,0 +1,136 @@
+"""
+Cold start of the search service: eager loading on import versus background startup.
+
+A small collection is indexed from data/YInt_w_label.csv once. Then each mode
+runs `--runs` times in a fresh Python process, so imports, model loading and
+first calls are paid every time, as when a worker is (re)started:
+
+    eager         the client and use cases are created while the routes
+                  module is imported, as src/routes.py did: the server
+                  cannot accept connections until the model is loaded, and
+                  the first search pays for the first model call
+    background    SearchService: the routes import without loading
+                  anything, start() loads the model in a worker thread and
+                  warms up the encoder and the Qdrant connection
+
+Reported per mode (medians): seconds from process start until the server
+could bind its port, until searches are served (/ready), and the latency of
+the first and second search. Point EMBEDDING_MODEL_DIR (or --model) at local
+weights to leave out the Hugging Face Hub. Run from the search directory:
+
+    uv run python -m benchmarks.bench_startup --location http://localhost:6333
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import Batch, Distance, VectorParams
+
+COLLECTION = "bench_startup"
+QUERIES = ("Road damage", "Power outage")
+MODES = ("eager", "background")
+
+
+def load_corpus(path: Path, rows: int) -> List[Dict[str, str]]:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return [row for _, row in zip(range(rows), csv.DictReader(f))]
+
+
+def build_collection(location: str, model_name: str, corpus: Path, rows: int) -> None:
+    from src.clients.encoder import LOCAL_MODEL_DIR, load_encoder
+
+    model = load_encoder(model_name, local_dir=os.getenv("EMBEDDING_MODEL_DIR") or LOCAL_MODEL_DIR)
+    documents = load_corpus(corpus, rows)
+    vectors = model.encode([row["message"] for row in documents], batch_size=256)
+    client = QdrantClient(url=location) if "://" in location else QdrantClient(path=location)
+    if client.collection_exists(COLLECTION):
+        client.delete_collection(COLLECTION)
+    client.create_collection(COLLECTION, vectors_config=VectorParams(size=vectors.shape[1], distance=Distance.COSINE))
+    client.upsert(
+        COLLECTION,
+        points=Batch(ids=list(range(len(documents))), vectors=vectors.tolist(), payloads=documents),
+        wait=True,
+    )
+    # Local storage can only be opened by one process at a time
+    client.close()
+
+
+async def child(mode: str, spawned: float, location: str, model_name: str) -> Dict[str, float]:
+    """Start the service one way and time it; `spawned` is the parent's time.time() at launch."""
+    client_kwargs = dict(model_name=model_name, location=location, collection_name=COLLECTION)
+    if mode == "eager":
+        from src.clients.async_qdrant_client import AsyncQdrantSearchClient
+        from src.use_cases.vector_search import VectorSearchUseCase
+
+        use_case = VectorSearchUseCase(AsyncQdrantSearchClient(**client_kwargs))
+        bound = ready = time.time() - spawned
+        search_client = use_case.search_client
+    else:
+        from src.service import SearchService
+
+        service = SearchService(**client_kwargs)
+        bound = time.time() - spawned
+        await service.start()
+        ready = time.time() - spawned
+        if service.error:
+            raise RuntimeError(service.error)
+        search_client = service.search_client
+
+    latencies = []
+    for query in QUERIES:
+        started = time.perf_counter()
+        await search_client.asearch(query, limit=100)
+        latencies.append((time.perf_counter() - started) * 1000)
+    await search_client.aclose()
+    return {"bind_s": bound, "ready_s": ready, "first_ms": latencies[0], "second_ms": latencies[1]}
+
+
+def run_child(mode: str, location: str, model_name: str) -> Dict[str, float]:
+    command = [sys.executable, "-m", "benchmarks.bench_startup", "--child", mode, "--spawned", repr(time.time()),
+               "--location", location, "--model", model_name]
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--location", default="http://localhost:6333", help="Qdrant URL or local path")
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L12-v2")
+    parser.add_argument("--corpus", default="../data/YInt_w_label.csv")
+    parser.add_argument("--rows", type=int, default=2_000, help="messages to index")
+    parser.add_argument("--runs", type=int, default=3, help="processes started per mode")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--spawned", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(child(args.child, args.spawned, args.location, args.model))))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # ":memory:" would not be shared with the child processes
+        location = os.path.join(tmp, "qdrant") if args.location == ":memory:" else args.location
+        build_collection(location, args.model, Path(args.corpus), args.rows)
+        print(f"{args.rows} points, {args.runs} runs per mode, medians\n")
+        print(f"{'mode':<11} {'bind s':>7} {'ready s':>8} {'1st search ms':>14} {'2nd search ms':>14}")
+        for mode in MODES:
+            runs = [run_child(mode, location, args.model) for _ in range(args.runs)]
+            median = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+            print(
+                f"{mode:<11} {median['bind_s']:>7.2f} {median['ready_s']:>8.2f} "
+                f"{median['first_ms']:>14.1f} {median['second_ms']:>14.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
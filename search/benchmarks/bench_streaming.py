@@ -0,0 +1,117 @@
+"""
+Time to first byte and peak memory of one JSON response versus NDJSON streaming.
+
+The messages in data/YInt_w_label.csv are embedded and indexed once, then
+every category term is searched with a large `limit` two ways:
+
+    json      /search/vector: the full result list, serialized as one
+              SearchResponse document
+    ndjson    /search/vector/stream: a first page of `--page-size`
+              results, then growing pages, each serialized as NDJSON lines
+              as soon as it is fetched
+
+Reported per mode: p50 time until the first serialized chunk, p50 total
+time, and the largest Python heap peak of one request (tracemalloc, which
+also slows both modes down by the same factor). The result cache is off.
+In-process (":memory:" or a path) Qdrant runs in the measured process and
+scores the whole collection for every page, so total time and peak memory
+describe the search service only against a server. Run from the search
+directory:
+
+    uv run python -m benchmarks.bench_streaming --location http://localhost:6333
+"""
+import argparse
+import csv
+import json
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List
+
+import numpy as np
+from qdrant_client.models import Batch, Distance, VectorParams
+
+from src.clients.qdrant_client import QdrantSearchClient
+from src.models.models import SearchResponse
+from src.use_cases.vector_search import VectorSearchInput, VectorSearchUseCase
+
+COLLECTION = "bench_streaming"
+
+
+def load_corpus(path: Path, rows: int) -> List[Dict[str, str]]:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return [row for _, row in zip(range(rows), csv.DictReader(f))]
+
+
+def load_terms(path: Path) -> List[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [term for terms in json.load(f).values() for term in terms]
+
+
+def measure(chunks: Callable[[], Iterator[str]]) -> Dict[str, float]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    first = None
+    for _ in chunks():
+        if first is None:
+            first = time.perf_counter() - started
+    total = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"first": first or total, "total": total, "peak": peak}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--location", default="http://localhost:6333", help='Qdrant URL, local path or ":memory:"')
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L12-v2")
+    parser.add_argument("--corpus", default="../data/YInt_w_label.csv")
+    parser.add_argument("--categories", default="../data/categories.json")
+    parser.add_argument("--rows", type=int, default=50_000, help="messages to index")
+    parser.add_argument("--limit", type=int, default=40_000, help="results per query, the /search/vector default")
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--terms", type=int, default=10, help="category terms to search")
+    args = parser.parse_args()
+
+    client = QdrantSearchClient(
+        model_name=args.model, location=args.location, collection_name=COLLECTION, result_cache_size=0
+    )
+    use_case = VectorSearchUseCase(client)
+    rows = load_corpus(Path(args.corpus), args.rows)
+    terms = load_terms(Path(args.categories))[:args.terms]
+    vectors = client.model.encode([row["message"] for row in rows], batch_size=256)
+    if client.client.collection_exists(COLLECTION):
+        client.client.delete_collection(COLLECTION)
+    client.client.create_collection(
+        COLLECTION, vectors_config=VectorParams(size=vectors.shape[1], distance=Distance.COSINE)
+    )
+    client.client.upsert(
+        COLLECTION, points=Batch(ids=list(range(len(rows))), vectors=vectors.tolist(), payloads=rows), wait=True
+    )
+    client.prewarm(terms, limit=1)  # encode the terms once
+    print(f"{len(rows)} points, {len(terms)} query terms, limit {args.limit}, page size {args.page_size}\n")
+
+    def full_json(term: str) -> Callable[[], Iterator[str]]:
+        def chunks() -> Iterator[str]:
+            results = use_case.run(VectorSearchInput(term, limit=args.limit))
+            yield SearchResponse(results=results, query=term, total_results=len(results)).model_dump_json()
+        return chunks
+
+    def ndjson(term: str) -> Callable[[], Iterator[str]]:
+        def chunks() -> Iterator[str]:
+            for page in use_case.stream(VectorSearchInput(term, limit=args.limit, page_size=args.page_size)):
+                yield "".join(result.model_dump_json() + "\n" for result in page)
+        return chunks
+
+    print(f"{'mode':<8} {'first chunk ms':>15} {'total ms':>10} {'peak MB':>9}")
+    for name, mode in (("json", full_json), ("ndjson", ndjson)):
+        runs = [measure(mode(term)) for term in terms]
+        print(
+            f"{name:<8} {np.median([run['first'] for run in runs]) * 1000:>15.0f} "
+            f"{np.median([run['total'] for run in runs]) * 1000:>10.0f} "
+            f"{max(run['peak'] for run in runs) / 2**20:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,26 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from src.routes import router
+from src.routes import router, service
 
 # Load environment variables
 load_dotenv()
 
-app = FastAPI(title="RAG Search API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the model and warm up in the background: the server accepts requests at once,
+    # /health answers and /ready reports when searches can be served
+    startup = asyncio.create_task(service.start())
+    yield
+    startup.cancel()
+    await service.close()
+
+
+app = FastAPI(title="RAG Search API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """
+    Bounded least-recently-used cache with an optional time-to-live.
+
+    Thread-safe. Counts hits and misses; an expired entry counts as a miss. A
+    cache with `max_size` 0 stores nothing. Entries can carry a cost (e.g.
+    the number of results in a list): with `max_cost` set, the least recently
+    used entries are also evicted while the total cost exceeds it, and an
+    entry costing more than `max_entry_cost` is not stored at all.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: Optional[float] = None,
+        max_cost: Optional[int] = None,
+        max_entry_cost: Optional[int] = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of entries; the least recently used one
+                      is evicted when it is exceeded
+            ttl: Seconds an entry stays valid after it is stored (None: forever)
+            max_cost: Maximum total cost of the entries (None: unbounded)
+            max_entry_cost: Entries costing more are not stored (None: `max_cost`)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_cost = max_cost
+        self.max_entry_cost = max_entry_cost if max_entry_cost is not None else max_cost
+        self.cost = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, count_miss: bool = True) -> Optional[Any]:
+        """
+        Return the value stored under `key`, or None if it is missing or expired.
+
+        Args:
+            key: Cache key
+            count_miss: Whether a miss is counted; False for a first look
+                        whose misses are looked up (and counted) again later
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is not None and entry[1] < time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                if count_miss:
+                    self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, cost: int = 1) -> None:
+        """Store a value, evicting the least recently used entries if the cache is full."""
+        if self.max_size <= 0 or (self.max_entry_cost is not None and cost > self.max_entry_cost):
+            return
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, expires, cost)
+            self.cost += cost
+            while len(self._entries) > self.max_size or (self.max_cost is not None and self.cost > self.max_cost):
+                self._remove(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        """Drop every entry (the hit and miss counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self.cost = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and hit counters, for monitoring."""
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "cost": self.cost,
+            "max_cost": self.max_cost,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        self.cost -= self._entries.pop(key)[2]
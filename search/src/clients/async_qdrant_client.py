@@ -0,0 +1,191 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+import numpy as np
+from qdrant_client import AsyncQdrantClient
+from src.clients.qdrant_client import QdrantSearchClient, ResultKey, SearchRequest
+from src.coalescer import Coalescer
+from src.filters import payload_filter
+from src.models.models import SearchFilters, SearchResult
+
+
+class AsyncQdrantSearchClient(QdrantSearchClient):
+    """
+    QdrantSearchClient with search methods that do not block the event loop.
+
+    Queries are encoded in a bounded thread pool (the model releases the GIL
+    while it computes) and Qdrant is queried through an AsyncQdrantClient
+    that keeps a pool of open connections. Concurrent single searches are
+    coalesced: those arriving within `coalesce_max_wait` of each other are
+    encoded in one model call and sent as one Qdrant batch. Caches, filters
+    and search parameters are shared with the blocking methods, which keep
+    working.
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        encode_workers: Optional[int] = None,
+        pool_size: Optional[int] = None,
+        coalesce_max_wait: Optional[float] = None,
+        coalesce_max_batch: Optional[int] = None,
+        **kwargs: Any,
+    ):
+        """
+        Initialize the async Qdrant search client.
+
+        Args:
+            *args, **kwargs: As for QdrantSearchClient
+            encode_workers: Threads encoding queries at the same time
+                            (ENCODE_WORKERS, default 1)
+            pool_size: Connections kept open to the Qdrant server
+                       (QDRANT_POOL_SIZE, default 16)
+            coalesce_max_wait: Seconds a search waits for others to share its
+                               batch (COALESCE_MAX_WAIT_MS / 1000, default 2 ms)
+            coalesce_max_batch: Searches per batch at most; 1 disables
+                                coalescing (COALESCE_MAX_BATCH, default 32)
+        """
+        super().__init__(*args, **kwargs)
+        self.encode_workers = encode_workers or int(os.getenv("ENCODE_WORKERS", "1"))
+        self.pool_size = pool_size or int(os.getenv("QDRANT_POOL_SIZE", "16"))
+        self.encode_executor = ThreadPoolExecutor(max_workers=self.encode_workers, thread_name_prefix="encode")
+        self.async_client = create_async_client(self.host, self.port, self.location, self.pool_size)
+        self.coalescer = Coalescer(
+            self._asearch_many,
+            max_wait=(
+                coalesce_max_wait if coalesce_max_wait is not None
+                else float(os.getenv("COALESCE_MAX_WAIT_MS", "2")) / 1000
+            ),
+            max_batch=coalesce_max_batch or int(os.getenv("COALESCE_MAX_BATCH", "32")),
+        )
+
+    async def asearch(
+        self, query: str, limit: int = 40000, filters: Optional[SearchFilters] = None
+    ) -> List[SearchResult]:
+        """
+        Search for documents similar to the query, like search().
+
+        Cached results are returned at once; otherwise the search joins the
+        open coalescing batch, which looks the key up again and counts the miss.
+
+        Raises:
+            QdrantConnectionError: If there are any issues with Qdrant operations
+            ValueError: If a filter time cannot be read
+        """
+        query_filter = payload_filter(filters)
+        cached = await self._acached_results(self._result_key(query, limit, query_filter))
+        if cached is not None:
+            return list(cached)
+        return await self.coalescer.submit((query, limit, query_filter))
+
+    async def asearch_batch(
+        self, queries: List[str], limit: int = 40000, filters: Optional[SearchFilters] = None
+    ) -> List[List[SearchResult]]:
+        """
+        Search for documents similar to each of several queries, like search_batch().
+
+        Raises:
+            QdrantConnectionError: If there are any issues with Qdrant operations
+            ValueError: If a filter time cannot be read
+        """
+        query_filter = payload_filter(filters)
+        return await self._asearch_many([(query, limit, query_filter) for query in queries])
+
+    async def aencode(self, queries: List[str]) -> np.ndarray:
+        """Embed queries in the encode pool (cached embeddings are reused)."""
+        return await self._run_in_pool(self._encode, queries)
+
+    async def acollection_exists(self) -> bool:
+        """
+        Whether Qdrant answers and has the collection.
+
+        Raises:
+            Exception: If Qdrant cannot be reached
+        """
+        if self.async_client is None:
+            return await self._run_in_pool(self.client.collection_exists, self.collection_name)
+        return await self.async_client.collection_exists(self.collection_name)
+
+    def cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Size and hit counters of the caches, and the coalescer's batch sizes."""
+        return {**super().cache_stats(), "coalescer": self.coalescer.stats()}
+
+    async def aclose(self) -> None:
+        """Close the Qdrant connections and stop the encode pool."""
+        if self.async_client is not None:
+            await self.async_client.close()
+        self.encode_executor.shutdown(wait=False)
+
+    async def _asearch_many(self, requests: List[SearchRequest]) -> List[List[SearchResult]]:
+        """
+        Like _search_many, without blocking the event loop.
+
+        With local storage (":memory:" or a directory), which only the
+        blocking client can open, the whole search runs in the encode pool.
+        """
+        if self.async_client is None:
+            return await self._run_in_pool(self._search_many, requests)
+        if self.result_cache.max_size > 0:
+            await self._acheck_version()
+        keys, found, missing = self._lookup(requests)
+        if missing:
+            query_vectors = await self.aencode([query for query, _, _ in missing.values()])
+            try:
+                responses = await self.async_client.query_batch_points(
+                    collection_name=self.collection_name,
+                    requests=self._query_requests(list(missing.values()), query_vectors),
+                )
+            except Exception as e:
+                raise self._operation_error(e)
+            self._store(found, missing, responses)
+        return [list(found[key]) for key in keys]
+
+    async def _acached_results(self, key: ResultKey) -> Optional[List[SearchResult]]:
+        """Like _cached_results, without blocking the event loop; misses are not counted."""
+        if self.result_cache.max_size <= 0:
+            return None
+        await self._acheck_version()
+        return self.result_cache.get(key, count_miss=False)
+
+    async def _acheck_version(self) -> None:
+        if self.async_client is None:
+            return await self._run_in_pool(self._check_version)
+        if not self._version_check_due():
+            return
+        try:
+            info = await self.async_client.get_collection(self.collection_name)
+            version = self._collection_version(info.points_count)
+        except Exception:
+            version = None
+        self._set_version(version)
+
+    async def _run_in_pool(self, func: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self.encode_executor, partial(func, *args))
+
+
+def create_async_client(
+    host: str, port: int, location: Optional[str] = None, pool_size: int = 16
+) -> Optional[AsyncQdrantClient]:
+    """
+    Create an async Qdrant client that keeps up to `pool_size` connections open.
+
+    Args:
+        host: Qdrant server host
+        port: Qdrant server port
+        location: Qdrant URL, local directory or ":memory:"; overrides host and port
+        pool_size: Connections kept alive (qdrant-client disables keep-alive
+                   for localhost by default)
+
+    Returns:
+        The client, or None for local storage, which only one client can open
+    """
+    limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+    if location and "://" in location:
+        return AsyncQdrantClient(url=location, limits=limits)
+    if location:
+        return None
+    return AsyncQdrantClient(host=host, port=port, limits=limits)
@@ -0,0 +1,95 @@
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger(__name__)
+
+# Query encoder backends: PyTorch, ONNX Runtime, ONNX Runtime with int8 weights
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+# Vendored model weights: <LOCAL_MODEL_DIR>/<model name without organization>, e.g. all-MiniLM-L12-v2
+LOCAL_MODEL_DIR = Path(__file__).resolve().parents[2] / "sentence-transformers"
+
+
+def load_encoder(
+    model_name: str,
+    backend: str = "torch",
+    export_dir: Union[str, Path] = ".cache/onnx",
+    quantization_config: str = "avx2",
+    local_dir: Optional[Union[str, Path]] = LOCAL_MODEL_DIR,
+) -> "SentenceTransformer":
+    """
+    Load the query encoder for the given backend.
+
+    Weights found under `local_dir` (or at `model_name`, if it is a path)
+    are loaded from there without any network access; otherwise the model
+    is fetched from the Hugging Face Hub (or its local cache). ONNX models are exported (and for "onnx-int8"
+    quantized) on first use and saved under `export_dir`, the same layout
+    the indexing pipeline's OnnxEmbedder uses. Queries should be encoded
+    with the backend the collection was indexed with, or one whose vectors
+    match it closely.
+
+    sentence-transformers (and torch) are imported here rather than on
+    module import, so the service can start before they are loaded.
+
+    Args:
+        model_name: Name or path of the sentence-transformers model
+        backend: One of BACKENDS
+        export_dir: Directory the exported ONNX models are kept in
+        quantization_config: Target instruction set for int8 quantization
+        local_dir: Directory holding vendored models (None: always use `model_name`)
+
+    Returns:
+        A SentenceTransformer whose encode() runs on the chosen backend
+    """
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown encoder backend: {backend!r} (expected one of {BACKENDS})")
+    source, offline = local_model(model_name, local_dir)
+    if backend == "torch":
+        return SentenceTransformer(source, local_files_only=offline)
+
+    model_dir = Path(export_dir) / model_name.replace("/", "__")
+    if not (model_dir / "onnx" / "model.onnx").exists():
+        SentenceTransformer(source, backend="onnx", local_files_only=offline).save(str(model_dir))
+    if backend == "onnx":
+        return SentenceTransformer(str(model_dir), backend="onnx", model_kwargs={"file_name": "onnx/model.onnx"})
+
+    quantized = _quantized_files(model_dir, quantization_config)
+    if not quantized:
+        model = SentenceTransformer(str(model_dir), backend="onnx", model_kwargs={"file_name": "onnx/model.onnx"})
+        export_dynamic_quantized_onnx_model(model, quantization_config, str(model_dir))
+        quantized = _quantized_files(model_dir, quantization_config)
+    return SentenceTransformer(
+        str(model_dir), backend="onnx", model_kwargs={"file_name": f"onnx/{quantized[0].name}"}
+    )
+
+
+def _quantized_files(model_dir: Path, quantization_config: str) -> List[Path]:
+    return sorted((model_dir / "onnx").glob(f"model_*int8_{quantization_config}.onnx"))
+
+
+def local_model(model_name: str, local_dir: Optional[Union[str, Path]]) -> Tuple[str, bool]:
+    """
+    Where to load a model from.
+
+    Args:
+        model_name: Hub name (e.g. sentence-transformers/all-MiniLM-L12-v2) or path
+        local_dir: Directory holding vendored models, or None
+
+    Returns:
+        The model's local path and True if `model_name` is a directory or
+        the model is vendored under `local_dir`, else `model_name` and False
+    """
+    if Path(model_name).is_dir():
+        return model_name, True
+    if local_dir:
+        path = Path(local_dir) / model_name.rstrip("/").split("/")[-1]
+        if (path / "modules.json").exists():
+            return str(path), True
+        logger.warning("No local weights for %s in %s; loading from the Hugging Face Hub", model_name, local_dir)
+    return model_name, False
@@ -1,11 +1,34 @@
 import os
 import socket
-from typing import List, Optional
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
+import numpy as np
 from qdrant_client import QdrantClient as OriginalQdrantClient
-from sentence_transformers import SentenceTransformer
+from qdrant_client.models import (
+    Filter,
+    QuantizationSearchParams,
+    QueryRequest,
+    QueryResponse,
+    ScoredPoint,
+    SearchParams,
+)
+from src.cache import LRUCache
+from src.clients.encoder import LOCAL_MODEL_DIR, load_encoder
 from src.clients.search_client import SearchClient
-from src.models.models import SearchResult
+from src.filters import payload_filter
+from src.models.models import SearchFilters, SearchResult
+
+
+# Hits scoring below this cosine similarity are not returned
+SCORE_THRESHOLD = 0.2
+
+# One search of a batch: query text, result limit and Qdrant filter
+SearchRequest = Tuple[str, int, Optional[Filter]]
+
+# Result cache key of a search request
+ResultKey = Tuple[Any, ...]
 
 
 class QdrantConnectionError(Exception):
@@ -23,6 +46,18 @@ class QdrantSearchClient(SearchClient):
         host: Optional[str] = None,
         port: Optional[int] = None,
         collection_name: Optional[str] = None,
+        location: Optional[str] = None,
+        hnsw_ef: Optional[int] = None,
+        rescore: Optional[bool] = None,
+        oversampling: Optional[float] = None,
+        backend: Optional[str] = None,
+        embedding_cache_size: Optional[int] = None,
+        result_cache_size: Optional[int] = None,
+        result_cache_ttl: Optional[float] = None,
+        result_cache_max_results: Optional[int] = None,
+        result_cache_max_entry_results: Optional[int] = None,
+        version_check_interval: Optional[float] = None,
+        version_file: Optional[str] = None,
     ):
         """
         Initialize the Qdrant search client.
@@ -32,63 +67,429 @@ class QdrantSearchClient(SearchClient):
             host: Qdrant server host
             port: Qdrant server port
             collection_name: Name of the collection to search in
+            location: Qdrant URL, local path or ":memory:"; overrides host and port
+            hnsw_ef: Search-time HNSW beam width (higher: better recall, slower)
+            rescore: For quantized collections, re-rank candidates with the
+                     original vectors (default True)
+            oversampling: For quantized collections, fetch this many times
+                          `limit` candidates before rescoring
+            backend: Query encoder backend: "torch", "onnx" or "onnx-int8"
+            embedding_cache_size: Query embeddings kept in memory (LRU); 0 disables
+            result_cache_size: Result lists kept in memory (LRU); 0 disables
+            result_cache_ttl: Seconds a cached result list stays valid
+            result_cache_max_results: Results kept in the result cache over
+                                      all lists (about 1.3 KB each)
+            result_cache_max_entry_results: Longer result lists are not cached
+            version_check_interval: Minimum seconds between checks of the
+                                    collection version (point count and
+                                    version file); cached results are
+                                    dropped when it changes
+            version_file: File whose content and modification time are a
+                          version marker: rewrite or touch it after changing
+                          payloads to drop cached results
         """
-        self.model = SentenceTransformer(model_name)
+        self.backend = backend or os.getenv("EMBEDDING_BACKEND", "torch")
+        self.model = load_encoder(
+            model_name, self.backend, local_dir=os.getenv("EMBEDDING_MODEL_DIR") or LOCAL_MODEL_DIR
+        )
         self.host = host or os.getenv("QDRANT_HOST", "localhost")
         self.port = port or int(os.getenv("QDRANT_PORT", "6333"))
         self.collection_name = collection_name or os.getenv(
             "QDRANT_COLLECTION", "earthquake_messages"
         )
-        self.client = OriginalQdrantClient(host=self.host, port=self.port)
+        self.location = location or os.getenv("QDRANT_LOCATION")
+        self.client = create_client(self.host, self.port, self.location)
+        self.search_params = _search_params(
+            hnsw_ef if hnsw_ef is not None else _env_number("QDRANT_HNSW_EF", int),
+            rescore if rescore is not None else _env_flag("QDRANT_QUANTIZATION_RESCORE"),
+            oversampling if oversampling is not None else _env_number("QDRANT_QUANTIZATION_OVERSAMPLING", float),
+        )
+        self.embedding_cache = LRUCache(
+            embedding_cache_size if embedding_cache_size is not None
+            else int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024"))
+        )
+        self.result_cache = LRUCache(
+            result_cache_size if result_cache_size is not None else int(os.getenv("RESULT_CACHE_SIZE", "128")),
+            ttl=result_cache_ttl if result_cache_ttl is not None else float(os.getenv("RESULT_CACHE_TTL", "300")),
+            max_cost=(
+                result_cache_max_results if result_cache_max_results is not None
+                else int(os.getenv("RESULT_CACHE_MAX_RESULTS", "200000"))
+            ),
+            max_entry_cost=(
+                result_cache_max_entry_results if result_cache_max_entry_results is not None
+                else int(os.getenv("RESULT_CACHE_MAX_ENTRY_RESULTS", "20000"))
+            ),
+        )
+        self.version_check_interval = (
+            version_check_interval if version_check_interval is not None
+            else float(os.getenv("RESULT_CACHE_CHECK_INTERVAL", "5"))
+        )
+        self.version_file = version_file or os.getenv("RESULT_CACHE_VERSION_FILE")
+        self._version = None
+        self._version_checked = float("-inf")
+        self._version_lock = threading.Lock()
 
-    def search(self, query: str, limit: int = 40000) -> List[SearchResult]:
+    def search(self, query: str, limit: int = 40000, filters: Optional[SearchFilters] = None) -> List[SearchResult]:
         """
         Search for documents similar to the query.
 
+        Filters are applied by Qdrant, using the collection's payload indexes.
+        Results are served from the result cache while the collection is
+        unchanged; the query embedding is cached separately.
+
         Args:
             query: The search query text
             limit: Maximum number of results to return
+            filters: Time range, location and category restrictions
 
         Returns:
             List of search results
 
         Raises:
             QdrantConnectionError: If there are any issues with Qdrant operations
+            ValueError: If a filter time cannot be read
         """
+        query_filter = payload_filter(filters)
+        key = self._result_key(query, limit, query_filter)
+        cached = self._cached_results(key)
+        if cached is not None:
+            return list(cached)
+
         # Convert query to embedding vector
-        query_vector = self.model.encode(query).tolist()
+        query_vector = self._encode([query])[0].tolist()
 
         # Search in Qdrant
         try:
-            search_results = self.client.search(
+            search_results = self.client.query_points(
                 collection_name=self.collection_name,
-                query_vector=query_vector,
+                query=query_vector,
+                query_filter=query_filter,
                 limit=limit,
                 with_payload=True,
-                score_threshold=0.2,
-            )
+                score_threshold=SCORE_THRESHOLD,
+                search_params=self.search_params,
+            ).points
         except Exception as e:
-            error_msg = str(e)
-            if isinstance(e, (socket.error, ConnectionError, ConnectionRefusedError)):
-                error_msg = f"Unable to connect to Qdrant server at {self.host}:{self.port}: {error_msg}"
+            raise self._operation_error(e)
+
+        results = _format_results(search_results, query)
+        self.result_cache.put(key, results, cost=len(results))
+        return list(results)
+
+    def search_batch(
+        self, queries: List[str], limit: int = 40000, filters: Optional[SearchFilters] = None
+    ) -> List[List[SearchResult]]:
+        """
+        Search for documents similar to each of several queries.
+
+        Queries without cached results are encoded in one model call (only
+        those whose embedding is not cached) and sent to Qdrant in one batch
+        request.
+
+        Args:
+            queries: The search query texts
+            limit: Maximum number of results per query
+            filters: Time range, location and category restrictions, applied
+                     to every query
+
+        Returns:
+            One list of search results per query, in query order
+
+        Raises:
+            QdrantConnectionError: If there are any issues with Qdrant operations
+            ValueError: If a filter time cannot be read
+        """
+        query_filter = payload_filter(filters)
+        return self._search_many([(query, limit, query_filter) for query in queries])
+
+    def search_pages(
+        self,
+        query: str,
+        limit: int = 40000,
+        page_size: int = 1000,
+        offset: int = 0,
+        filters: Optional[SearchFilters] = None,
+        max_page_size: Optional[int] = None,
+    ) -> Iterator[List[SearchResult]]:
+        """
+        Search for documents similar to the query, one page at a time.
+
+        The query is encoded once and each page is a separate Qdrant request,
+        so only one page is held in memory at a time. Qdrant pages by offset,
+        which costs a search for offset + page size results per page; letting
+        pages grow (`max_page_size`) keeps the first page quick and the number
+        of requests logarithmic. If the full result list for `limit` is
+        cached, pages are sliced from it instead.
+
+        Args:
+            query: The search query text
+            limit: Maximum number of results over all pages, counted from the
+                   first result (not from `offset`)
+            page_size: Maximum number of results of the first page
+            offset: Number of leading results to skip
+            filters: Time range, location and category restrictions
+            max_page_size: If larger than `page_size`, each page may be twice
+                           the size of the previous one, up to this size
+
+        Yields:
+            Lists of search results, best first; the last page is shorter
+            or ends at `limit`
+
+        Raises:
+            QdrantConnectionError: If there are any issues with Qdrant operations
+            ValueError: If a filter time cannot be read
+        """
+        query_filter = payload_filter(filters)
+        cached = self._cached_results(self._result_key(query, limit, query_filter))
+        if cached is not None:
+            for start in range(offset, len(cached), page_size):
+                yield list(cached[start:start + page_size])
+            return
+
+        query_vector = self._encode([query])[0].tolist()
+        while offset < limit:
+            size = min(page_size, limit - offset)
+            try:
+                points = self.client.query_points(
+                    collection_name=self.collection_name,
+                    query=query_vector,
+                    query_filter=query_filter,
+                    limit=size,
+                    offset=offset,
+                    with_payload=True,
+                    score_threshold=SCORE_THRESHOLD,
+                    search_params=self.search_params,
+                ).points
+            except Exception as e:
+                raise self._operation_error(e)
+            if points:
+                yield _format_results(points, query)
+            if len(points) < size:
+                return
+            offset += size
+            page_size = max(page_size, min(2 * page_size, max_page_size or page_size))
+
+    def points_count(self) -> Optional[int]:
+        """
+        Number of points in the collection.
+
+        Raises:
+            QdrantConnectionError: If there are any issues with Qdrant operations
+        """
+        try:
+            return self.client.get_collection(self.collection_name).points_count
+        except Exception as e:
+            raise self._operation_error(e)
+
+    def prewarm(self, queries: List[str], limit: int = 20000) -> None:
+        """
+        Fill the embedding and result caches for the given queries.
+
+        Args:
+            queries: Queries expected to be searched, e.g. the category terms
+            limit: Result limit the queries will be searched with
+
+        Raises:
+            QdrantConnectionError: If there are any issues with Qdrant operations
+        """
+        self.search_batch(list(queries), limit=limit)
+
+    def cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Size and hit counters of the embedding and result caches."""
+        return {"embeddings": self.embedding_cache.stats(), "results": self.result_cache.stats()}
+
+    def _encode(self, queries: List[str]) -> np.ndarray:
+        """Embed queries, encoding only those not in the embedding cache (in one model call)."""
+        vectors = {}
+        for query in queries:
+            vector = self.embedding_cache.get(query)
+            if vector is not None:
+                vectors[query] = vector
+        missing = [query for query in dict.fromkeys(queries) if query not in vectors]
+        if missing:
+            for query, vector in zip(missing, self.model.encode(missing)):
+                vectors[query] = vector
+                self.embedding_cache.put(query, vector)
+        return np.stack([vectors[query] for query in queries])
+
+    def _search_many(self, requests: List[SearchRequest]) -> List[List[SearchResult]]:
+        """
+        Search several (query, limit, filter) requests at once.
+
+        Cached results are reused; the other queries are encoded in one model
+        call and sent to Qdrant as one batch, each with its own limit and
+        filter. Repeated requests are searched once.
+        """
+        if self.result_cache.max_size > 0:
+            self._check_version()
+        keys, found, missing = self._lookup(requests)
+        if missing:
+            query_vectors = self._encode([query for query, _, _ in missing.values()])
+            try:
+                responses = self.client.query_batch_points(
+                    collection_name=self.collection_name,
+                    requests=self._query_requests(list(missing.values()), query_vectors),
+                )
+            except Exception as e:
+                raise self._operation_error(e)
+            self._store(found, missing, responses)
+        return [list(found[key]) for key in keys]
+
+    def _lookup(
+        self, requests: List[SearchRequest]
+    ) -> Tuple[List[ResultKey], Dict[ResultKey, List[SearchResult]], Dict[ResultKey, SearchRequest]]:
+        """Result keys of the requests, the cached results found, and the distinct requests still to search."""
+        keys = [self._result_key(*request) for request in requests]
+        found = {}
+        missing = {}
+        for key, request in zip(keys, requests):
+            if key in found or key in missing:
+                continue
+            cached = self.result_cache.get(key) if self.result_cache.max_size > 0 else None
+            if cached is not None:
+                found[key] = cached
             else:
-                error_msg = f"Qdrant search operation failed: {error_msg}"
-            raise QdrantConnectionError(error_msg)
-
-        # Process and format results
-        formatted_results = []
-        for result in search_results:
-            payload = result.payload
-            if payload is not None:
-                formatted_results.append(
-                    SearchResult(
-                        time=payload.get("time", ""),
-                        location=payload.get("location", ""),
-                        account=payload.get("account", ""),
-                        message=payload.get("message", ""),
-                        label=query,
-                        score=result.score,  # 添加相似度分数
-                    )
+                missing[key] = request
+        return keys, found, missing
+
+    def _query_requests(self, requests: List[SearchRequest], query_vectors: np.ndarray) -> List[QueryRequest]:
+        return [
+            QueryRequest(
+                query=vector.tolist(),
+                filter=query_filter,
+                limit=limit,
+                with_payload=True,
+                score_threshold=SCORE_THRESHOLD,
+                params=self.search_params,
+            )
+            for (_, limit, query_filter), vector in zip(requests, query_vectors)
+        ]
+
+    def _store(
+        self,
+        found: Dict[ResultKey, List[SearchResult]],
+        missing: Dict[ResultKey, SearchRequest],
+        responses: List[QueryResponse],
+    ) -> None:
+        """Format the batch responses for the missing requests into `found` and the result cache."""
+        for (key, (query, _, _)), response in zip(missing.items(), responses):
+            found[key] = _format_results(response.points, query)
+            self.result_cache.put(key, found[key], cost=len(found[key]))
+
+    def _result_key(self, query: str, limit: int, query_filter: Optional[Filter]) -> ResultKey:
+        # Keyed by the Qdrant filter, so equivalent filter inputs share an entry
+        return query, limit, SCORE_THRESHOLD, query_filter.model_dump_json() if query_filter else None
+
+    def _cached_results(self, key: ResultKey) -> Optional[List[SearchResult]]:
+        """Cached results for a key, after dropping all results if the collection has changed."""
+        if self.result_cache.max_size <= 0:
+            return None
+        self._check_version()
+        return self.result_cache.get(key)
+
+    def _check_version(self) -> None:
+        if not self._version_check_due():
+            return
+        try:
+            version = self._collection_version(self.client.get_collection(self.collection_name).points_count)
+        except Exception:
+            # Unknown state: do not serve results that may be stale
+            version = None
+        self._set_version(version)
+
+    def _version_check_due(self) -> bool:
+        """Whether the collection version should be checked now; marks it as checked if so."""
+        with self._version_lock:
+            now = time.monotonic()
+            if now - self._version_checked < self.version_check_interval:
+                return False
+            self._version_checked = now
+            return True
+
+    def _set_version(self, version: Optional[Tuple[Any, ...]]) -> None:
+        """Record the collection version, dropping cached results if it changed or is unknown."""
+        with self._version_lock:
+            if version is None or version != self._version:
+                self.result_cache.clear()
+            self._version = version
+
+    def _collection_version(self, points: int) -> Tuple[Any, ...]:
+        """Point count of the collection and the version file's modification time and content."""
+        if not self.version_file or not os.path.exists(self.version_file):
+            return points, None
+        with open(self.version_file, "r", encoding="utf-8") as f:
+            return points, os.path.getmtime(self.version_file), f.read()
+
+    def _operation_error(self, e: Exception) -> QdrantConnectionError:
+        error_msg = str(e)
+        if isinstance(e, (socket.error, ConnectionError, ConnectionRefusedError)):
+            error_msg = f"Unable to connect to Qdrant server at {self.host}:{self.port}: {error_msg}"
+        else:
+            error_msg = f"Qdrant search operation failed: {error_msg}"
+        return QdrantConnectionError(error_msg)
+
+
+def _format_results(points: List[ScoredPoint], query: str) -> List[SearchResult]:
+    """Convert Qdrant hits to search results labeled with the query."""
+    formatted_results = []
+    for result in points:
+        payload = result.payload
+        if payload is not None:
+            formatted_results.append(
+                SearchResult(
+                    time=payload.get("time", ""),
+                    location=payload.get("location", ""),
+                    account=payload.get("account", ""),
+                    message=payload.get("message", ""),
+                    label=query,
+                    score=result.score,  # 添加相似度分数
                 )
+            )
+    return formatted_results
+
+
+def create_client(
+    host: Optional[str] = None, port: Optional[int] = None, location: Optional[str] = None
+) -> OriginalQdrantClient:
+    """
+    Create a Qdrant client, falling back to QDRANT_LOCATION / QDRANT_HOST / QDRANT_PORT.
+
+    Args:
+        host: Qdrant server host
+        port: Qdrant server port
+        location: Qdrant URL, local directory or ":memory:"; overrides host and port
+
+    Returns:
+        A client for the server, or an in-process store for ":memory:" and directories
+    """
+    location = location or os.getenv("QDRANT_LOCATION")
+    if location == ":memory:" or (location and "://" in location):
+        return OriginalQdrantClient(location=location)
+    if location:
+        return OriginalQdrantClient(path=location)
+    return OriginalQdrantClient(
+        host=host or os.getenv("QDRANT_HOST", "localhost"),
+        port=port or int(os.getenv("QDRANT_PORT", "6333")),
+    )
+
+
+def _search_params(
+    hnsw_ef: Optional[int], rescore: Optional[bool], oversampling: Optional[float]
+) -> Optional[SearchParams]:
+    """Build SearchParams from the optional tuning knobs; None leaves everything to Qdrant."""
+    quantization = None
+    if rescore is not None or oversampling is not None:
+        quantization = QuantizationSearchParams(rescore=rescore, oversampling=oversampling)
+    if hnsw_ef is None and quantization is None:
+        return None
+    return SearchParams(hnsw_ef=hnsw_ef, quantization=quantization)
+
+
+def _env_number(name: str, kind: type):
+    value = os.getenv(name)
+    return kind(value) if value else None
+
 
-        return formatted_results
+def _env_flag(name: str) -> Optional[bool]:
+    value = os.getenv(name)
+    return None if not value else value.lower() in ("1", "true", "yes")
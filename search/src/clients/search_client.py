@@ -1,22 +1,84 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterator, List, Optional
 
-from src.models.models import SearchResult
+from src.models.models import SearchFilters, SearchResult
 
 
 class SearchClient(ABC):
     """Abstract base class for search client implementations."""
 
     @abstractmethod
-    def search(self, query: str, limit: int = 10) -> List[SearchResult]:
+    def search(self, query: str, limit: int = 10, filters: Optional[SearchFilters] = None) -> List[SearchResult]:
         """
         Search for documents similar to the query.
 
         Args:
             query: The search query text
             limit: Maximum number of results to return
+            filters: Time range, location and category restrictions
 
         Returns:
             List of search results
         """
         pass
+
+    def search_batch(
+        self, queries: List[str], limit: int = 10, filters: Optional[SearchFilters] = None
+    ) -> List[List[SearchResult]]:
+        """
+        Search for documents similar to each of several queries.
+
+        Implementations should override this to encode and search all
+        queries at once; the default runs one search per query.
+
+        Args:
+            queries: The search query texts
+            limit: Maximum number of results per query
+            filters: Time range, location and category restrictions, applied
+                     to every query
+
+        Returns:
+            One list of search results per query, in query order
+        """
+        return [self.search(query, limit=limit, filters=filters) for query in queries]
+
+    def search_pages(
+        self,
+        query: str,
+        limit: int = 10,
+        page_size: int = 1000,
+        offset: int = 0,
+        filters: Optional[SearchFilters] = None,
+        max_page_size: Optional[int] = None,
+    ) -> Iterator[List[SearchResult]]:
+        """
+        Search for documents similar to the query, one page at a time.
+
+        Implementations should override this to fetch one page per request;
+        the default runs the full search and slices it.
+
+        Args:
+            query: The search query text
+            limit: Maximum number of results over all pages, counted from the
+                   first result (not from `offset`)
+            page_size: Maximum number of results of the first page
+            offset: Number of leading results to skip
+            filters: Time range, location and category restrictions
+            max_page_size: Later pages may grow up to this size (the default
+                           implementation keeps `page_size`)
+
+        Yields:
+            Lists of search results, best first
+        """
+        results = self.search(query, limit=limit, filters=filters)
+        for start in range(offset, len(results), page_size):
+            yield results[start:start + page_size]
+
+    def points_count(self) -> Optional[int]:
+        """
+        Number of points in the searched collection, or None if unknown.
+
+        Paging compares it across pages to notice that the collection changed
+        (and that page offsets may have shifted); the default reports None.
+        """
+        return None
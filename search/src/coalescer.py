@@ -0,0 +1,108 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Generic, List, Optional, Set, Tuple, TypeVar
+
+Item = TypeVar("Item")
+Result = TypeVar("Result")
+
+
+class Coalescer(Generic[Item, Result]):
+    """
+    Gathers concurrent calls into batches for one handler call.
+
+    Items submitted while a batch is open are held for up to `max_wait`
+    seconds after the first one, or until `max_batch` items are waiting, and
+    then handed to the handler together; each caller gets the result at its
+    own position. If the handler fails, or returns a different number of
+    results, every caller of the batch gets the exception; if the dispatch
+    is cancelled, so are the callers. Must be used from one event loop.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[Item]], Awaitable[List[Result]]],
+        max_wait: float = 0.002,
+        max_batch: int = 32,
+    ):
+        """
+        Initialize the coalescer.
+
+        Args:
+            handler: Coroutine function taking a batch of items and returning
+                     one result per item, in order
+            max_wait: Seconds the first item of a batch waits for others
+                      (0: only items submitted in the same loop iteration)
+            max_batch: Largest batch; a full batch is dispatched at once
+                       (1 disables coalescing)
+        """
+        self.handler = handler
+        self.max_wait = max_wait
+        self.max_batch = max(1, max_batch)
+        self.batches = 0
+        self.items = 0
+        self._pending: List[Tuple[Item, asyncio.Future]] = []
+        self._timer: Optional[asyncio.Handle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, item: Item) -> Result:
+        """Add an item to the open batch and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def stats(self) -> Dict[str, Any]:
+        """Batches dispatched and their mean size, for monitoring."""
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch": self.items / self.batches if self.batches else 0.0,
+            "max_wait": self.max_wait,
+            "max_batch": self.max_batch,
+        }
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self.batches += 1
+        self.items += len(batch)
+        # Keep a reference, or the task may be garbage collected before it finishes
+        task = asyncio.ensure_future(self._dispatch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        # A task cancelled before it started never runs _dispatch
+        task.add_done_callback(lambda _: self._fail(batch, asyncio.CancelledError()))
+
+    async def _dispatch(self, batch: List[Tuple[Item, asyncio.Future]]) -> None:
+        error: BaseException = asyncio.CancelledError()
+        try:
+            results = await self.handler([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"Batch handler returned {len(results)} results for {len(batch)} items")
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except BaseException as e:
+            error = e
+            if not isinstance(e, Exception):
+                raise
+        finally:
+            # Also on cancellation (e.g. at shutdown): no caller is left waiting
+            self._fail(batch, error)
+
+    @staticmethod
+    def _fail(batch: List[Tuple[Item, asyncio.Future]], error: BaseException) -> None:
+        for _, future in batch:
+            if future.done():
+                continue
+            if isinstance(error, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(error)
@@ -0,0 +1,162 @@
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from src.filters import epoch_seconds
+from src.models.models import SearchResult
+
+try:
+    import orjson
+except ImportError:  # orjson is optional (the `fast` extra); the json module is used without it
+    orjson = None
+
+try:
+    import pyarrow as pa
+    from pyarrow import ipc
+except ImportError:  # pyarrow is optional (the `fast` extra); only the Arrow format needs it
+    pa = None
+
+COLUMNAR_MEDIA_TYPE = "application/vnd.search.columnar+json"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# Result fields sent as a dictionary (distinct values) plus one index per row
+DICTIONARY_FIELDS = ("location", "account", "label")
+
+
+def columns(results: List[SearchResult]) -> Dict[str, Any]:
+    """
+    Column arrays of search results.
+
+    `time` holds epoch seconds (UTC, None if unreadable), `score` float32
+    values, `message` the texts; location, account and label are dictionary
+    encoded as {"values": distinct values, "codes": index per row}.
+
+    Args:
+        results: Search results, in response order
+
+    Returns:
+        The columns, all of the same length
+    """
+    epochs: Dict[str, Optional[int]] = {}
+    for result in results:
+        if result.time not in epochs:
+            epochs[result.time] = epoch_seconds(result.time)
+
+    encoded: Dict[str, Any] = {
+        "time": [epochs[result.time] for result in results],
+        "message": [result.message for result in results],
+        "score": np.array([result.score for result in results], dtype=np.float32),
+    }
+    for field in DICTIONARY_FIELDS:
+        index: Dict[str, int] = {}
+        codes = [index.setdefault(getattr(result, field), len(index)) for result in results]
+        encoded[field] = {"values": list(index), "codes": np.array(codes, dtype=np.int32)}
+    return encoded
+
+
+def encode_columnar(results: List[SearchResult], query: str, next_cursor: Optional[str] = None) -> bytes:
+    """
+    Search results as one JSON document of column arrays (see columns).
+
+    Serialized with orjson when it is installed, which writes the numpy
+    columns directly; float32 scores are written with their shortest
+    representation either way.
+
+    Args:
+        results: Search results, in response order
+        query: The search query
+        next_cursor: Cursor of the next page, if paging
+
+    Returns:
+        UTF-8 JSON with the query, total_results, next_cursor (if any) and
+        the columns
+    """
+    document = {"query": query, "total_results": len(results), **columns(results)}
+    if next_cursor:
+        document["next_cursor"] = next_cursor
+    if orjson is not None:
+        return orjson.dumps(document, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(document, separators=(",", ":"), default=_to_list).encode()
+
+
+def encode_arrow(results: List[SearchResult], query: str, next_cursor: Optional[str] = None) -> bytes:
+    """
+    Search results as an Apache Arrow IPC stream holding one record batch.
+
+    Columns: time (int64 epoch seconds, nullable), location, account and
+    label (dictionary<int32, string>), message (string), score (float32).
+    The query and next_cursor are stored in the schema metadata.
+
+    Args:
+        results: Search results, in response order
+        query: The search query
+        next_cursor: Cursor of the next page, if paging
+
+    Returns:
+        The IPC stream bytes
+
+    Raises:
+        ImportError: If pyarrow is not installed
+    """
+    if pa is None:
+        raise ImportError("The Arrow format needs pyarrow: install the `fast` extra (uv sync --extra fast)")
+    encoded = columns(results)
+    arrays = {
+        "time": pa.array(encoded["time"], type=pa.int64()),
+        "message": pa.array(encoded["message"], type=pa.string()),
+        "score": pa.array(encoded["score"], type=pa.float32()),
+    }
+    for field in DICTIONARY_FIELDS:
+        arrays[field] = pa.DictionaryArray.from_arrays(
+            pa.array(encoded[field]["codes"], type=pa.int32()), pa.array(encoded[field]["values"], type=pa.string())
+        )
+    metadata = {"query": query, "total_results": str(len(results))}
+    if next_cursor:
+        metadata["next_cursor"] = next_cursor
+    table = pa.table({name: arrays[name] for name in ("time", *DICTIONARY_FIELDS, "message", "score")})
+    table = table.replace_schema_metadata(metadata)
+
+    sink = pa.BufferOutputStream()
+    with ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+# Response format name: media type and encoder
+FORMATS: Dict[str, Tuple[str, Callable[..., bytes]]] = {
+    "columnar": (COLUMNAR_MEDIA_TYPE, encode_columnar),
+    "arrow": (ARROW_MEDIA_TYPE, encode_arrow),
+}
+
+
+def response_format(name: Optional[str], accept: Optional[str]) -> str:
+    """
+    Pick the response format from an explicit name or the Accept header.
+
+    Args:
+        name: "json", "columnar" or "arrow", or None to go by `accept`
+        accept: The request's Accept header
+
+    Returns:
+        "json" (the SearchResponse model) or a key of FORMATS
+
+    Raises:
+        ValueError: If the name is unknown
+    """
+    if name:
+        if name != "json" and name not in FORMATS:
+            raise ValueError(f"Unknown format {name!r} (expected json, {', '.join(FORMATS)})")
+        return name
+    for format_name, (media_type, _) in FORMATS.items():
+        if accept and media_type in accept:
+            return format_name
+    return "json"
+
+
+def _to_list(value: Any) -> Any:
+    if isinstance(value, np.ndarray) and value.dtype == np.float32:
+        # Through their shortest decimal form, so 0.52 is written as 0.52 and not 0.5199999809265137
+        return value.astype(str).astype(np.float64).tolist()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,278 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from qdrant_client import QdrantClient
+from src.filters import epoch_seconds
+
+# Dimensions a query can group by
+DIMENSIONS = ("location", "time", "main_category", "category")
+
+# Payload fields the cube is built from
+PAYLOAD_FIELDS = ["time", "location", "account", "label", "main_category"]
+
+TimeValue = Union[str, int, float, datetime]
+
+
+class AggregateCube:
+    """
+    Message and distinct-user counts by location x time bucket x category.
+
+    Built once from the message columns and then queried without touching the
+    rows again. Only non-empty cells are stored: one entry per (location,
+    bucket, category) with its message count, plus the distinct (cell,
+    account) pairs, so distinct users stay exact when cells are merged. A
+    category is a (main category, label) pair; unlabeled messages have ""
+    for both. Grouping by `category` merges the pairs with the same label.
+    """
+
+    def __init__(
+        self,
+        time: Sequence[TimeValue],
+        location: Sequence[Optional[str]],
+        account: Sequence[Optional[str]],
+        label: Sequence[Optional[str]],
+        main_category: Sequence[Optional[str]],
+        bucket_seconds: int = 300,
+    ):
+        """
+        Build the cube from message columns (one value per message).
+
+        Args:
+            time: Message times: "YYYY-MM-DD HH:MM:SS" strings or epoch seconds.
+                  Messages whose time cannot be read are left out.
+            location: Neighborhood of each message.
+            account: Sender of each message.
+            label: Category term of each message.
+            main_category: Main category of each message.
+            bucket_seconds: Width of the finest time bucket. Buckets are aligned
+                            to the epoch, so 300 gives whole 5-minute steps.
+        """
+        if bucket_seconds <= 0:
+            raise ValueError("bucket_seconds must be positive")
+        self.bucket_seconds = bucket_seconds
+
+        # Unreadable times become NaN
+        epochs = np.array([epoch_seconds(value) for value in time], dtype=np.float64)
+        keep = ~np.isnan(epochs)
+        epochs = epochs[keep].astype(np.int64)
+        self.rows = len(epochs)
+
+        def encode(values: Sequence[Any]) -> Tuple[List[str], np.ndarray]:
+            kept = np.array([value or "" for value in values], dtype=object)[keep]
+            if not len(kept):
+                return [], np.zeros(0, dtype=np.int64)
+            names, codes = np.unique(kept.astype(str), return_inverse=True)
+            return names.tolist(), codes.astype(np.int64)
+
+        self.locations, locations = encode(location)
+        accounts = encode(account)[1]
+        categories = [
+            f"{main or ''}\x1f{(term or '').lower()}" for main, term in zip(main_category, label)
+        ]
+        pairs, category_codes = encode(categories)
+        self.categories = [pair.split("\x1f") for pair in pairs]  # [main_category, label]
+        self.main_categories = sorted({main for main, _ in self.categories})
+        self._main_codes = np.array(
+            [self.main_categories.index(main) for main, _ in self.categories], dtype=np.int64
+        )
+        self.labels = sorted({label for _, label in self.categories})
+        self._label_codes = np.array(
+            [self.labels.index(label) for _, label in self.categories], dtype=np.int64
+        )
+
+        buckets = epochs // bucket_seconds
+        self.first_bucket = int(buckets.min()) if self.rows else 0
+        buckets = buckets - self.first_bucket
+        self.buckets = int(buckets.max()) + 1 if self.rows else 0
+
+        # Non-empty cells and their message counts
+        shape = (max(len(self.locations), 1), max(self.buckets, 1), max(len(self.categories), 1))
+        cells = np.ravel_multi_index((locations, buckets, category_codes), shape)
+        cell_ids, counts = np.unique(cells, return_counts=True)
+        self._shape = shape
+        self._cells = np.unravel_index(cell_ids, shape)
+        self._counts = counts.astype(np.int64)
+
+        # Distinct (cell, account) pairs, for distinct users
+        accounts_per_cell = np.int64(accounts.max()) + 1 if self.rows else 1
+        pair_ids = np.unique(cells * accounts_per_cell + accounts)
+        self._pairs = np.unravel_index(pair_ids // accounts_per_cell, shape)
+        self._pair_accounts = pair_ids % accounts_per_cell
+
+    @property
+    def cells(self) -> int:
+        """Number of non-empty cells."""
+        return len(self._counts)
+
+    def query(
+        self,
+        start: Optional[TimeValue] = None,
+        end: Optional[TimeValue] = None,
+        locations: Optional[Iterable[str]] = None,
+        main_categories: Optional[Iterable[str]] = None,
+        categories: Optional[Iterable[str]] = None,
+        group_by: Sequence[str] = (),
+        bucket_seconds: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Slice the cube and aggregate it by the given dimensions.
+
+        Time filters select whole buckets: a bucket is included if it starts
+        within [start, end].
+
+        Args:
+            start: Earliest bucket start, as a time string or epoch seconds.
+            end: Latest bucket start.
+            locations: Keep only these locations.
+            main_categories: Keep only these main categories.
+            categories: Keep only these category labels (case-insensitive).
+            group_by: Dimensions (from DIMENSIONS) to group by; none gives
+                      one row with the totals.
+            bucket_seconds: Width of the time groups, a positive multiple of
+                            the cube's bucket_seconds (default: the cube's).
+
+        Returns:
+            One row per non-empty group, sorted by the group values: the
+            grouped dimensions (time as "YYYY-MM-DD HH:MM:SS" bucket start),
+            `messages` and distinct `users`.
+
+        Raises:
+            ValueError: If a dimension is unknown or bucket_seconds does not
+                        fit the cube's buckets.
+        """
+        unknown = [name for name in group_by if name not in DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Unknown group_by dimension(s): {unknown} (expected some of {DIMENSIONS})")
+        if bucket_seconds is None:
+            bucket_seconds = self.bucket_seconds
+        if bucket_seconds <= 0 or bucket_seconds % self.bucket_seconds:
+            raise ValueError(f"bucket_seconds must be a positive multiple of {self.bucket_seconds}")
+        factor = bucket_seconds // self.bucket_seconds
+
+        keep_locations = self._selection(self.locations, locations)
+        keep_categories = self._selection([label for _, label in self.categories], categories, str.lower)
+        if main_categories is not None:
+            keep_categories &= self._selection(self.main_categories, main_categories)[self._main_codes]
+        bucket_starts = (self.first_bucket + np.arange(self._shape[1])) * self.bucket_seconds
+        keep_buckets = np.ones(self._shape[1], dtype=bool)
+        if start is not None:
+            keep_buckets &= bucket_starts >= _required_epoch(start)
+        if end is not None:
+            keep_buckets &= bucket_starts <= _required_epoch(end)
+
+        first_group = self.first_bucket // factor
+        sizes = {
+            "location": self._shape[0],
+            "time": (self.first_bucket + self._shape[1] - 1) // factor - first_group + 1,
+            "main_category": len(self.main_categories) or 1,
+            "category": len(self.labels) or 1,
+        }
+        dims = tuple(sizes[name] for name in group_by)
+
+        def group_keys(cells: Tuple[np.ndarray, ...]) -> Tuple[np.ndarray, np.ndarray]:
+            location, bucket, category = cells
+            mask = keep_locations[location] & keep_buckets[bucket] & keep_categories[category]
+            if not group_by:
+                return mask, np.zeros(int(mask.sum()), dtype=np.int64)
+            columns = {
+                "location": location,
+                "time": (self.first_bucket + bucket) // factor - first_group,
+                "main_category": self._main_codes[category],
+                "category": self._label_codes[category],
+            }
+            # One integer key per group
+            return mask, np.ravel_multi_index(tuple(columns[name][mask] for name in group_by), dims)
+
+        mask, keys = group_keys(self._cells)
+        groups, inverse = np.unique(keys, return_inverse=True)
+        messages = np.bincount(inverse, weights=self._counts[mask], minlength=len(groups))
+        # Every pair lies in a non-empty cell, so its group is one of `groups`
+        pair_mask, pair_keys = group_keys(self._pairs)
+        pair_groups = np.searchsorted(groups, pair_keys)
+        accounts = np.int64(self._pair_accounts.max()) + 1 if len(self._pair_accounts) else 1
+        distinct = np.unique(pair_groups * accounts + self._pair_accounts[pair_mask])
+        users = np.bincount(distinct // accounts, minlength=len(groups))
+
+        values = np.unravel_index(groups, dims) if group_by else ()
+        decoded = {
+            name: self._decode(name, column, first_group, factor) for name, column in zip(group_by, values)
+        }
+        return [
+            {**{name: decoded[name][row] for name in group_by}, "messages": int(count), "users": int(user_count)}
+            for row, (count, user_count) in enumerate(zip(messages, users))
+        ]
+
+    def _decode(self, dimension: str, values: np.ndarray, first_group: int, factor: int) -> List[str]:
+        if dimension == "location":
+            return [self.locations[value] for value in values]
+        if dimension == "time":
+            starts = ((first_group + values) * factor * self.bucket_seconds).astype("datetime64[s]")
+            return [str(start).replace("T", " ") for start in starts]
+        if dimension == "main_category":
+            return [self.main_categories[value] for value in values]
+        return [self.labels[value] for value in values]
+
+    @staticmethod
+    def _selection(names: List[str], wanted: Optional[Iterable[str]], normalize=None) -> np.ndarray:
+        size = max(len(names), 1)
+        if wanted is None:
+            return np.ones(size, dtype=bool)
+        wanted = {normalize(name) if normalize else name for name in wanted}
+        selection = np.zeros(size, dtype=bool)
+        selection[:len(names)] = [name in wanted for name in names]
+        return selection
+
+
+def load_cube(
+    client: QdrantClient,
+    collection_name: str,
+    bucket_seconds: int = 300,
+    page_size: int = 10000,
+) -> AggregateCube:
+    """
+    Build the cube from the payloads of a labeled collection.
+
+    Scrolls through every point, reading only the payload fields the cube
+    needs (no vectors).
+
+    Args:
+        client: Qdrant client.
+        collection_name: Collection labeled by the indexing pipeline.
+        bucket_seconds: Width of the finest time bucket.
+        page_size: Points per scroll request.
+
+    Returns:
+        The cube over all points of the collection.
+    """
+    columns: Dict[str, List[Any]] = {field: [] for field in PAYLOAD_FIELDS}
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            limit=page_size,
+            offset=offset,
+            with_payload=PAYLOAD_FIELDS,
+            with_vectors=False,
+        )
+        for point in points:
+            payload = point.payload or {}
+            for field in PAYLOAD_FIELDS:
+                columns[field].append(payload.get(field))
+        if offset is None:
+            break
+    return AggregateCube(
+        columns["time"],
+        columns["location"],
+        columns["account"],
+        columns["label"],
+        columns["main_category"],
+        bucket_seconds=bucket_seconds,
+    )
+
+
+def _required_epoch(value: TimeValue) -> int:
+    epoch = epoch_seconds(value)
+    if epoch is None:
+        raise ValueError(f"Cannot read time {value!r}")
+    return epoch
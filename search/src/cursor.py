@@ -0,0 +1,50 @@
+import base64
+import json
+from typing import Optional, Tuple
+
+
+def encode_cursor(offset: int, score: float, points: Optional[int] = None) -> str:
+    """
+    Opaque cursor pointing after a page of search results.
+
+    Args:
+        offset: Number of results delivered so far
+        score: Score of the last delivered result
+        points: Point count of the collection when the page was searched
+                (None if unknown)
+
+    Returns:
+        URL-safe token to pass back as `cursor`
+    """
+    state = {"offset": offset, "score": score}
+    if points is not None:
+        state["points"] = points
+    payload = json.dumps(state, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Tuple[int, Optional[float], Optional[int]]:
+    """
+    Read a cursor made by encode_cursor.
+
+    Args:
+        cursor: Token from a previous page, or None for the first page
+
+    Returns:
+        The offset, the last delivered score (None for the first page) and
+        the collection's point count when it was made (None if unknown)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if not cursor:
+        return 0, None, None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        offset, score = int(payload["offset"]), float(payload["score"])
+        points = int(payload["points"]) if payload.get("points") is not None else None
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"Invalid cursor {cursor!r}") from e
+    if offset < 0:
+        raise ValueError(f"Invalid cursor {cursor!r}")
+    return offset, score, points
@@ -0,0 +1,66 @@
+import numbers
+from datetime import datetime, timezone
+from typing import Optional, Union
+
+from qdrant_client.models import FieldCondition, Filter, MatchAny, Range
+from src.models.models import SearchFilters
+
+
+def epoch_seconds(value: Optional[Union[str, int, float, datetime]]) -> Optional[int]:
+    """
+    Epoch seconds of a message time, as stored in the `timestamp` payload field.
+
+    Accepts "YYYY-MM-DD HH:MM[:SS]" strings (also with a "T", as sent by
+    datetime-local inputs), datetimes and numbers. Times without a time zone
+    are read as UTC, like the indexer does. Returns None if the value cannot
+    be read.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, numbers.Real):
+        return int(value)
+    try:
+        moment = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp())
+
+
+def payload_filter(filters: Optional[SearchFilters]) -> Optional[Filter]:
+    """
+    Translate search filters into a Qdrant payload filter.
+
+    Time bounds become a range on the integer `timestamp` field (both ends
+    inclusive); location and category lists become keyword matches on
+    `location`, `main_category` and `label`. All conditions must hold.
+
+    Args:
+        filters: Search filters, or None
+
+    Returns:
+        The filter, or None if nothing is filtered
+
+    Raises:
+        ValueError: If a time bound cannot be read
+    """
+    if filters is None:
+        return None
+    conditions = []
+    if filters.start or filters.end:
+        bounds = {}
+        for name, value in (("gte", filters.start), ("lte", filters.end)):
+            if value:
+                bounds[name] = epoch_seconds(value)
+                if bounds[name] is None:
+                    raise ValueError(f"Cannot read time {value!r}")
+        conditions.append(FieldCondition(key="timestamp", range=Range(**bounds)))
+    for key, values in (
+        ("location", filters.locations),
+        ("main_category", filters.main_categories),
+        ("label", [value.lower() for value in filters.categories] if filters.categories else None),
+    ):
+        if values:
+            conditions.append(FieldCondition(key=key, match=MatchAny(any=values)))
+    return Filter(must=conditions) if conditions else None
@@ -1,6 +1,6 @@
 from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class SearchResult(BaseModel):
@@ -16,3 +16,42 @@ class SearchResponse(BaseModel):
     results: List[SearchResult]
     query: str
     total_results: int
+    next_cursor: Optional[str] = None
+
+
+class SearchFilters(BaseModel):
+    start: Optional[str] = Field(None, description="Earliest message time, e.g. 2020-04-06 00:00:00")
+    end: Optional[str] = Field(None, description="Latest message time")
+    locations: Optional[List[str]] = Field(None, description="Keep only these locations")
+    main_categories: Optional[List[str]] = Field(None, description="Keep only these main categories")
+    categories: Optional[List[str]] = Field(None, description="Keep only these category labels")
+
+
+class BatchSearchRequest(BaseModel):
+    queries: List[str] = Field(..., min_length=1, description="The search queries")
+    limit: int = Field(40000, description="Number of results to return per query")
+    merge: bool = Field(False, description="Return one deduplicated list labeled with each message's best query")
+    filters: Optional[SearchFilters] = Field(None, description="Applied to every query")
+
+
+class BatchSearchResponse(BaseModel):
+    queries: List[str]
+    per_query: Optional[List[SearchResponse]] = None
+    results: Optional[List[SearchResult]] = None
+    total_results: int
+
+
+class AggregateRow(BaseModel):
+    location: Optional[str] = None
+    time: Optional[str] = None
+    main_category: Optional[str] = None
+    category: Optional[str] = None
+    messages: int
+    users: int
+
+
+class AggregateResponse(BaseModel):
+    rows: List[AggregateRow]
+    group_by: List[str]
+    bucket_seconds: int
+    total_rows: int
@@ -1,38 +1,207 @@
+import asyncio
+import json
+from itertools import chain
+from typing import Iterator, List, Optional, TypeVar
+
 from dotenv import load_dotenv
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from src.clients.qdrant_client import QdrantConnectionError
-from src.models.models import SearchResponse
-from src.use_cases.vector_search import VectorSearchInput, VectorSearchUseCase
+from src.columnar import FORMATS, response_format
+from src.models.models import (
+    AggregateResponse,
+    BatchSearchRequest,
+    BatchSearchResponse,
+    SearchFilters,
+    SearchResponse,
+    SearchResult,
+)
+from src.service import SearchService
+from src.use_cases.aggregate import AggregateInput
+from src.use_cases.batch_search import BatchSearchInput
+from src.use_cases.vector_search import VectorSearchInput
+
+UseCaseType = TypeVar("UseCaseType")
 
 # Load environment variables
 load_dotenv()
 
-# Initialize vector search use case
-vector_search_use_case = VectorSearchUseCase()
+# Use cases, created by service.start() in the app's lifespan (not on import, so the server starts at once)
+service = SearchService()
 
 router = APIRouter()
 
 
-@router.get("/search/vector", response_model=SearchResponse)
+def _started(use_case: Optional[UseCaseType]) -> UseCaseType:
+    """The use case, or 503 while the service is still starting."""
+    if use_case is None:
+        raise HTTPException(
+            status_code=503,
+            detail="Search service is starting. Please try again shortly.",
+        )
+    return use_case
+
+
+@router.get("/health")
+async def health():
+    """Liveness: the server is up (the model may still be loading)."""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def ready():
+    """Readiness: the model is loaded and warmed up and Qdrant answers; 503 otherwise."""
+    status = await service.readiness()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+
+@router.get("/search/vector", response_model=SearchResponse, response_model_exclude_none=True)
 async def search(
+    request: Request,
     query: str = Query(..., description="The search query"),
     limit: int = Query(40000, description="Number of results to return"),
+    start: Optional[str] = Query(None, description="Earliest message time, e.g. 2020-04-06 00:00:00"),
+    end: Optional[str] = Query(None, description="Latest message time"),
+    locations: Optional[List[str]] = Query(None, description="Keep only these locations"),
+    main_categories: Optional[List[str]] = Query(None, description="Keep only these main categories"),
+    categories: Optional[List[str]] = Query(None, description="Keep only these category labels"),
+    page_size: Optional[int] = Query(None, ge=1, description="Return one page of this many results"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    output_format: Optional[str] = Query(
+        None, alias="format", description="json (default), columnar or arrow; overrides the Accept header"
+    ),
 ):
     """
     Search the PubMed abstracts using semantic search.
 
     Converts the query to an embedding and searches for similar chunks in the
-    Qdrant vector database.
+    Qdrant vector database. Time, location and category filters are applied
+    by Qdrant, so only matching messages are returned. With `page_size` or
+    `cursor`, returns one page and the `next_cursor` to fetch the next one
+    with (absent after the last page); `limit` then caps all pages together.
+
+    `format=columnar` (or Accept: application/vnd.search.columnar+json)
+    returns column arrays instead of one object per result: epoch-second
+    times, float32 scores and dictionary-encoded location, account and
+    label. `format=arrow` (or Accept: application/vnd.apache.arrow.stream)
+    returns the same columns as an Arrow IPC stream.
     """
+    vector_search_use_case = _started(service.vector_search)
     try:
+        chosen_format = response_format(output_format, request.headers.get("accept"))
+
         # Create input data for the use case
-        input_data = VectorSearchInput(query=query, limit=limit)
+        filters = SearchFilters(
+            start=start, end=end, locations=locations, main_categories=main_categories, categories=categories
+        )
+        input_data = VectorSearchInput(
+            query=query, limit=limit, filters=filters, page_size=page_size, cursor=cursor
+        )
 
         # Execute the use case
-        results = vector_search_use_case.run(input_data)
+        next_cursor = None
+        if page_size or cursor:
+            results, next_cursor = await asyncio.to_thread(vector_search_use_case.run_page, input_data)
+        else:
+            results = await vector_search_use_case.arun(input_data)
+
+        if chosen_format != "json":
+            media_type, encode = FORMATS[chosen_format]
+            # Encoding up to `limit` rows is CPU work: keep it off the event loop
+            content = await asyncio.to_thread(encode, results, query, next_cursor)
+            return Response(content=content, media_type=media_type)
+        return SearchResponse(results=results, query=query, total_results=len(results), next_cursor=next_cursor)
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ImportError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except QdrantConnectionError:
+        raise HTTPException(
+            status_code=503,
+            detail="Vector search service is currently unavailable. Please try again later.",
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Search error: {str(e)}")
+
+
+@router.get("/search/vector/stream")
+async def search_stream(
+    query: str = Query(..., description="The search query"),
+    limit: int = Query(40000, description="Number of results to return"),
+    start: Optional[str] = Query(None, description="Earliest message time, e.g. 2020-04-06 00:00:00"),
+    end: Optional[str] = Query(None, description="Latest message time"),
+    locations: Optional[List[str]] = Query(None, description="Keep only these locations"),
+    main_categories: Optional[List[str]] = Query(None, description="Keep only these main categories"),
+    categories: Optional[List[str]] = Query(None, description="Keep only these category labels"),
+    page_size: int = Query(1000, ge=1, description="Results in the first chunk; later chunks grow"),
+    cursor: Optional[str] = Query(None, description="Start after this page of /search/vector"),
+):
+    """
+    Search like /search/vector, streaming the results as NDJSON.
+
+    Each line is one search result, best first. Results are fetched and sent
+    in pages, the first of `page_size` results, so the first lines arrive
+    before the search is complete and the server holds one page per request.
+    If the search fails after the first page, the last line is {"error": ...}.
+    """
+    vector_search_use_case = _started(service.vector_search)
+    try:
+        filters = SearchFilters(
+            start=start, end=end, locations=locations, main_categories=main_categories, categories=categories
+        )
+        input_data = VectorSearchInput(
+            query=query, limit=limit, filters=filters, page_size=page_size, cursor=cursor
+        )
+        pages = vector_search_use_case.stream(input_data)
+
+        # Fetch the first page here, so invalid input and an unreachable Qdrant get a status code
+        first_page = await asyncio.to_thread(next, pages, [])
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except QdrantConnectionError:
+        raise HTTPException(
+            status_code=503,
+            detail="Vector search service is currently unavailable. Please try again later.",
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Search error: {str(e)}")
+
+    return StreamingResponse(_ndjson(chain([first_page], pages)), media_type="application/x-ndjson")
+
+
+def _ndjson(pages: Iterator[List[SearchResult]]) -> Iterator[str]:
+    """One NDJSON chunk per page of results; a failure ends the stream with an error line."""
+    try:
+        for page in pages:
+            yield "".join(result.model_dump_json() + "\n" for result in page)
+    except Exception as e:
+        yield json.dumps({"error": f"Search error: {str(e)}"}) + "\n"
+
+
+@router.post("/search/batch", response_model=BatchSearchResponse, response_model_exclude_none=True)
+async def search_batch(request: BatchSearchRequest):
+    """
+    Search for several queries in one request.
+
+    Encodes all queries in one model call and runs them as one Qdrant batch
+    search. Returns the results per query, or with `merge` a single
+    deduplicated list in which each message carries its best-matching query
+    as label and that query's score.
+    """
+    batch_search_use_case = _started(service.batch_search)
+    try:
+        # Create input data for the use case
+        input_data = BatchSearchInput(
+            queries=request.queries, limit=request.limit, merge=request.merge, filters=request.filters
+        )
 
-        return SearchResponse(results=results, query=query, total_results=len(results))
+        # Execute the use case
+        return await batch_search_use_case.arun(input_data)
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except QdrantConnectionError:
         raise HTTPException(
             status_code=503,
@@ -40,3 +209,56 @@ async def search(
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search error: {str(e)}")
+
+
+@router.get("/aggregate", response_model=AggregateResponse, response_model_exclude_none=True)
+async def aggregate(
+    group_by: List[str] = Query([], description="Dimensions to group by: location, time, main_category, category"),
+    start: Optional[str] = Query(None, description="Earliest time bucket, e.g. 2020-04-06 00:00:00"),
+    end: Optional[str] = Query(None, description="Latest time bucket"),
+    locations: Optional[List[str]] = Query(None, description="Keep only these locations"),
+    main_categories: Optional[List[str]] = Query(None, description="Keep only these main categories"),
+    categories: Optional[List[str]] = Query(None, description="Keep only these category labels"),
+    bucket_seconds: Optional[int] = Query(None, ge=1, description="Time group width, a multiple of the cube's bucket"),
+):
+    """
+    Count messages and distinct users by location, time bucket and category.
+
+    Served from an in-memory cube built from the labeled collection, so the
+    dashboards get their grouped counts without downloading the messages.
+    """
+    aggregate_use_case = _started(service.aggregate)
+    try:
+        input_data = AggregateInput(
+            start=start,
+            end=end,
+            locations=locations,
+            main_categories=main_categories,
+            categories=categories,
+            group_by=group_by,
+            bucket_seconds=bucket_seconds,
+        )
+        rows = await asyncio.to_thread(aggregate_use_case.run, input_data)
+
+        return AggregateResponse(
+            rows=rows,
+            group_by=group_by,
+            bucket_seconds=bucket_seconds or aggregate_use_case.bucket_seconds,
+            total_rows=len(rows),
+        )
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except QdrantConnectionError:
+        raise HTTPException(
+            status_code=503,
+            detail="Aggregation service is currently unavailable. Please try again later.",
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Aggregation error: {str(e)}")
+
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """Size and hit rate of the query embedding and search result caches."""
+    return _started(service.search_client).cache_stats()
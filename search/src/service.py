@@ -0,0 +1,123 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+from src.clients.async_qdrant_client import AsyncQdrantSearchClient
+from src.use_cases.aggregate import AggregateUseCase
+from src.use_cases.batch_search import BatchSearchUseCase
+from src.use_cases.vector_search import VectorSearchUseCase
+
+logger = logging.getLogger(__name__)
+
+# Searched once at startup so the first real query does not pay for first-call initialization
+WARMUP_QUERY = "earthquake damage"
+
+# Seconds /ready waits for Qdrant before reporting it unreachable
+READY_TIMEOUT = 2.0
+
+
+class SearchService:
+    """
+    The search API's use cases, created at startup instead of on import.
+
+    start() loads the model (from the vendored weights when present, without
+    network access) and connects to Qdrant in a worker thread, then warms up
+    the encoder, the connection pool and the caches. Until it has finished
+    the use cases are None; readiness() reports what is available.
+    """
+
+    def __init__(self, **client_kwargs: Any):
+        """
+        Initialize the service. Nothing is loaded until start().
+
+        Args:
+            **client_kwargs: Arguments for AsyncQdrantSearchClient
+        """
+        self.client_kwargs = client_kwargs
+        self.search_client: Optional[AsyncQdrantSearchClient] = None
+        self.vector_search: Optional[VectorSearchUseCase] = None
+        self.batch_search: Optional[BatchSearchUseCase] = None
+        self.aggregate: Optional[AggregateUseCase] = None
+        self.warmed_up = False
+        self.error: Optional[str] = None
+        self.timings: Dict[str, float] = {}
+
+    async def start(self) -> None:
+        """Load the model and use cases, then warm up. Errors are logged and kept in `error`."""
+        started = time.perf_counter()
+        try:
+            await asyncio.to_thread(self.load)
+            await self.warmup()
+        except Exception as e:
+            self.error = str(e)
+            logger.exception("Search service failed to start")
+        self.timings["startup"] = time.perf_counter() - started
+
+    def load(self) -> None:
+        """Create the search client (loading the model) and the use cases."""
+        started = time.perf_counter()
+        client = AsyncQdrantSearchClient(**self.client_kwargs)
+        self.timings["model_load"] = time.perf_counter() - started
+        self.search_client = client
+        self.vector_search = VectorSearchUseCase(client)
+        self.batch_search = BatchSearchUseCase(client)
+        # Shares the Qdrant client (local storage can only be opened once)
+        self.aggregate = AggregateUseCase(client.client, client.collection_name)
+
+    async def warmup(self) -> None:
+        """
+        Run one encode and one search, then prewarm the caches if configured.
+
+        The first model call allocates its buffers and the first search opens
+        the Qdrant connections; doing both here keeps them off the first
+        request. With PREWARM_CATEGORIES=path/to/categories.json, every
+        category term is searched too (PREWARM_LIMIT results, default 20000).
+        A Qdrant that cannot be reached is logged, not raised: /ready reports
+        it until it is back.
+        """
+        client = self.search_client
+        started = time.perf_counter()
+        await client.aencode([WARMUP_QUERY])
+        self.timings["warmup_encode"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        try:
+            await client.asearch(WARMUP_QUERY, limit=1)
+            categories_path = os.getenv("PREWARM_CATEGORIES")
+            if categories_path:
+                with open(categories_path, "r", encoding="utf-8") as f:
+                    terms = [term for terms in json.load(f).values() for term in terms]
+                await client.asearch_batch(terms, limit=int(os.getenv("PREWARM_LIMIT", "20000")))
+                logger.info("Prewarmed the query caches with %d category terms", len(terms))
+        except Exception as e:
+            logger.warning("Could not warm up the search: %s", e)
+        self.timings["warmup_search"] = time.perf_counter() - started
+        self.warmed_up = True
+
+    async def readiness(self) -> Dict[str, Any]:
+        """Whether the model is loaded and warmed up and Qdrant answers, with startup timings."""
+        qdrant = False
+        if self.search_client is not None:
+            try:
+                qdrant = await asyncio.wait_for(self.search_client.acollection_exists(), READY_TIMEOUT)
+            except Exception:
+                qdrant = False
+        status = {
+            "model_loaded": self.search_client is not None,
+            "warmed_up": self.warmed_up,
+            "qdrant": qdrant,
+        }
+        return {
+            "ready": all(status.values()),
+            **status,
+            "error": self.error,
+            "startup_seconds": {name: round(seconds, 3) for name, seconds in self.timings.items()},
+        }
+
+    async def close(self) -> None:
+        """Close the search client's connections, if it was created."""
+        if self.search_client is not None:
+            await self.search_client.aclose()
@@ -0,0 +1,105 @@
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from qdrant_client import QdrantClient
+from src.clients.qdrant_client import QdrantConnectionError, create_client
+from src.cube import AggregateCube, load_cube
+from src.use_cases.use_case import UseCase
+
+
+class AggregateInput:
+    """Input for aggregate use case"""
+
+    def __init__(
+        self,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        locations: Optional[List[str]] = None,
+        main_categories: Optional[List[str]] = None,
+        categories: Optional[List[str]] = None,
+        group_by: Optional[List[str]] = None,
+        bucket_seconds: Optional[int] = None,
+    ):
+        self.start = start
+        self.end = end
+        self.locations = locations
+        self.main_categories = main_categories
+        self.categories = categories
+        self.group_by = group_by or []
+        self.bucket_seconds = bucket_seconds
+
+
+class AggregateUseCase(UseCase[AggregateInput, List[Dict[str, Any]]]):
+    """Use case for counting messages and users from the pre-aggregated cube"""
+
+    def __init__(
+        self,
+        client: Optional[QdrantClient] = None,
+        collection_name: Optional[str] = None,
+        bucket_seconds: Optional[int] = None,
+        max_age: Optional[float] = None,
+    ):
+        """
+        Initialize the aggregate use case. The cube is built on first use.
+
+        Args:
+            client: Qdrant client (default: from the QDRANT_* environment variables)
+            collection_name: Labeled collection the cube is built from
+            bucket_seconds: Finest time bucket of the cube (AGGREGATE_BUCKET_SECONDS, default 300)
+            max_age: Seconds after which the cube is rebuilt from the collection
+                     (AGGREGATE_MAX_AGE, default 600; 0 never rebuilds)
+        """
+        self.client = client or create_client()
+        self.collection_name = collection_name or os.getenv("QDRANT_COLLECTION", "earthquake_messages")
+        self.bucket_seconds = bucket_seconds or int(os.getenv("AGGREGATE_BUCKET_SECONDS", "300"))
+        self.max_age = max_age if max_age is not None else float(os.getenv("AGGREGATE_MAX_AGE", "600"))
+        self._cube: Optional[AggregateCube] = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def cube(self) -> AggregateCube:
+        """The current cube, built (or rebuilt once older than max_age) from the collection."""
+        with self._lock:
+            stale = self.max_age and time.monotonic() - self._built_at > self.max_age
+            if self._cube is None or stale:
+                self.refresh()
+            return self._cube
+
+    def refresh(self) -> None:
+        """
+        Rebuild the cube from the collection.
+
+        Raises:
+            QdrantConnectionError: If the collection cannot be read
+        """
+        try:
+            self._cube = load_cube(self.client, self.collection_name, self.bucket_seconds)
+        except Exception as e:
+            raise QdrantConnectionError(f"Could not read collection {self.collection_name}: {e}")
+        self._built_at = time.monotonic()
+
+    def run(self, input_data: AggregateInput) -> List[Dict[str, Any]]:
+        """
+        Execute the aggregate use case.
+
+        Args:
+            input_data: Aggregate input parameters
+
+        Returns:
+            One row per group with its message and distinct user counts
+
+        Raises:
+            ValueError: If a group_by dimension, bucket size or time is invalid
+        """
+        return self.cube.query(
+            start=input_data.start,
+            end=input_data.end,
+            locations=input_data.locations,
+            main_categories=input_data.main_categories,
+            categories=input_data.categories,
+            group_by=input_data.group_by,
+            bucket_seconds=input_data.bucket_seconds,
+        )
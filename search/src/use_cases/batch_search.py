@@ -0,0 +1,109 @@
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+from src.clients.async_qdrant_client import AsyncQdrantSearchClient
+from src.clients.qdrant_client import QdrantSearchClient
+from src.models.models import BatchSearchResponse, SearchFilters, SearchResponse, SearchResult
+from src.use_cases.use_case import UseCase
+
+
+class BatchSearchInput:
+    """Input for batch search use case"""
+
+    def __init__(
+        self,
+        queries: List[str],
+        limit: int = 40000,
+        merge: bool = False,
+        filters: Optional[SearchFilters] = None,
+    ):
+        self.queries = queries
+        self.limit = limit
+        self.merge = merge
+        self.filters = filters
+
+
+class BatchSearchUseCase(UseCase[BatchSearchInput, BatchSearchResponse]):
+    """Use case for searching documents for several queries at once"""
+
+    def __init__(self, search_client: Optional[QdrantSearchClient] = None):
+        """
+        Initialize the batch search use case.
+
+        Args:
+            search_client: Client for vector search operations
+        """
+        self.search_client = search_client or QdrantSearchClient()
+
+    def run(self, input_data: BatchSearchInput) -> BatchSearchResponse:
+        """
+        Execute the batch search use case.
+
+        Repeated queries are searched once.
+
+        Args:
+            input_data: Batch search input parameters
+
+        Returns:
+            Per-query results, or with `merge` one list holding every matched
+            message once, labeled with the query it scored best on
+        """
+        queries = list(dict.fromkeys(input_data.queries))
+        per_query = self.search_client.search_batch(queries, limit=input_data.limit, filters=input_data.filters)
+        return _response(queries, per_query, input_data.merge)
+
+    async def arun(self, input_data: BatchSearchInput) -> BatchSearchResponse:
+        """
+        Execute the batch search use case without blocking the event loop.
+
+        Uses the client's async batch search if it has one, and otherwise
+        runs the blocking search in a worker thread.
+
+        Args:
+            input_data: Batch search input parameters
+
+        Returns:
+            Per-query or merged results, as run() does
+        """
+        if not isinstance(self.search_client, AsyncQdrantSearchClient):
+            return await asyncio.to_thread(self.run, input_data)
+        queries = list(dict.fromkeys(input_data.queries))
+        per_query = await self.search_client.asearch_batch(
+            queries, limit=input_data.limit, filters=input_data.filters
+        )
+        return _response(queries, per_query, input_data.merge)
+
+
+def _response(queries: List[str], per_query: List[List[SearchResult]], merge: bool) -> BatchSearchResponse:
+    """Batch response holding the results per query, or merged if `merge`."""
+    if merge:
+        results = merge_results(per_query)
+        return BatchSearchResponse(queries=queries, results=results, total_results=len(results))
+
+    responses = [
+        SearchResponse(results=results, query=query, total_results=len(results))
+        for query, results in zip(queries, per_query)
+    ]
+    return BatchSearchResponse(
+        queries=queries, per_query=responses, total_results=sum(len(results) for results in per_query)
+    )
+
+
+def merge_results(per_query: List[List[SearchResult]]) -> List[SearchResult]:
+    """
+    Merge the results of several queries, keeping each message once.
+
+    Args:
+        per_query: One list of search results per query
+
+    Returns:
+        The distinct messages, each with the label and score of its best
+        match, sorted by score (best first)
+    """
+    best: Dict[Tuple[str, str, str], SearchResult] = {}
+    for results in per_query:
+        for result in results:
+            key = (result.time, result.account, result.message)
+            if key not in best or result.score > best[key].score:
+                best[key] = result
+    return sorted(best.values(), key=lambda result: result.score, reverse=True)
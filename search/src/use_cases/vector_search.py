@@ -1,16 +1,39 @@
-from typing import List, Optional
+import asyncio
+from typing import Iterator, List, Optional, Tuple
 
+from src.clients.async_qdrant_client import AsyncQdrantSearchClient
 from src.clients.qdrant_client import QdrantSearchClient
-from src.models.models import SearchResult
+from src.cursor import decode_cursor, encode_cursor
+from src.models.models import SearchFilters, SearchResult
 from src.use_cases.use_case import UseCase
 
+# Results per page when paging or streaming without an explicit page size
+DEFAULT_PAGE_SIZE = 1000
+
+# Streamed pages double in size up to this many results (or the first page's size, if larger)
+STREAM_MAX_PAGE_SIZE = 8000
+
+# Scores this close to the cursor's count as equal to it: the same point can score a few
+# float32 ulps differently from one request to the next
+SCORE_TOLERANCE = 1e-6
+
 
 class VectorSearchInput:
     """Input for vector search use case"""
 
-    def __init__(self, query: str, limit: int = 40000):
+    def __init__(
+        self,
+        query: str,
+        limit: int = 40000,
+        filters: Optional[SearchFilters] = None,
+        page_size: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ):
         self.query = query
         self.limit = limit
+        self.filters = filters
+        self.page_size = page_size
+        self.cursor = cursor
 
 
 class VectorSearchUseCase(UseCase[VectorSearchInput, List[SearchResult]]):
@@ -35,4 +58,114 @@ class VectorSearchUseCase(UseCase[VectorSearchInput, List[SearchResult]]):
         Returns:
             List of search results
         """
-        return self.search_client.search(query=input_data.query, limit=input_data.limit)
+        return self.search_client.search(query=input_data.query, limit=input_data.limit, filters=input_data.filters)
+
+    async def arun(self, input_data: VectorSearchInput) -> List[SearchResult]:
+        """
+        Execute the vector search use case without blocking the event loop.
+
+        Uses the client's async search if it has one, and otherwise runs the
+        blocking search in a worker thread.
+
+        Args:
+            input_data: Vector search input parameters
+
+        Returns:
+            List of search results
+        """
+        if isinstance(self.search_client, AsyncQdrantSearchClient):
+            return await self.search_client.asearch(
+                query=input_data.query, limit=input_data.limit, filters=input_data.filters
+            )
+        return await asyncio.to_thread(self.run, input_data)
+
+    def run_page(self, input_data: VectorSearchInput) -> Tuple[List[SearchResult], Optional[str]]:
+        """
+        Execute the vector search use case for one page of results.
+
+        The page starts after `input_data.cursor` (at the first result if
+        None). Results scoring above the cursor's score were already
+        delivered, or were added to the collection since, and are skipped,
+        so paging never goes back up the ranking. If the collection's point
+        count changed since the cursor was made, the offset may have shifted
+        and results scoring exactly the cursor's score are skipped too, as
+        the last delivered one would otherwise be sent again; undelivered
+        results tied with it are then lost.
+
+        Args:
+            input_data: Vector search input parameters; `limit` caps the
+                        results over all pages
+
+        Returns:
+            The page and the cursor of the next one (None after the last page)
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        offset, last_score, points = decode_cursor(input_data.cursor)
+        page_size = input_data.page_size or DEFAULT_PAGE_SIZE
+        if offset >= input_data.limit:
+            return [], None
+        current_points = self.search_client.points_count()
+        pages = self.search_client.search_pages(
+            query=input_data.query,
+            limit=input_data.limit,
+            page_size=page_size,
+            offset=offset,
+            filters=input_data.filters,
+        )
+        page = next(pages, [])
+        end = offset + len(page)
+        full = len(page) == min(page_size, input_data.limit - offset)
+        page = _after(page, last_score, changed=points != current_points)
+        if page:
+            last_score = page[-1].score
+        next_cursor = (
+            encode_cursor(end, last_score, current_points) if full and end < input_data.limit else None
+        )
+        return page, next_cursor
+
+    def stream(self, input_data: VectorSearchInput) -> Iterator[List[SearchResult]]:
+        """
+        Execute the vector search use case, yielding the results page by page.
+
+        Only one page is held in memory at a time. The first page has
+        `input_data.page_size` results and later ones grow up to
+        STREAM_MAX_PAGE_SIZE, so fewer Qdrant requests are needed. Starts
+        after `input_data.cursor` if given; like run_page, never goes back up
+        the ranking.
+
+        Args:
+            input_data: Vector search input parameters
+
+        Yields:
+            Non-empty lists of search results, best first
+
+        Raises:
+            ValueError: If the cursor is malformed or a filter time cannot be read
+        """
+        offset, last_score, points = decode_cursor(input_data.cursor)
+        changed = last_score is not None and points != self.search_client.points_count()
+        pages = self.search_client.search_pages(
+            query=input_data.query,
+            limit=input_data.limit,
+            page_size=input_data.page_size or DEFAULT_PAGE_SIZE,
+            offset=offset,
+            filters=input_data.filters,
+            max_page_size=STREAM_MAX_PAGE_SIZE,
+        )
+        for page in pages:
+            page = _after(page, last_score, changed)
+            changed = False
+            if page:
+                last_score = page[-1].score
+                yield page
+
+
+def _after(page: List[SearchResult], last_score: Optional[float], changed: bool) -> List[SearchResult]:
+    """The results of a page ranked after the last delivered score (strictly below it if the collection changed)."""
+    if last_score is None:
+        return page
+    if changed:
+        return [result for result in page if result.score < last_score - SCORE_TOLERANCE]
+    return [result for result in page if result.score <= last_score + SCORE_TOLERANCE]
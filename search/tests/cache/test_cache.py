@@ -0,0 +1,81 @@
+import time
+
+from src.cache import LRUCache
+
+
+class TestLRUCache:
+    """Test cases for LRUCache class."""
+
+    def test_evicts_least_recently_used(self):
+        """Test that the least recently used entry is evicted once max_size is exceeded."""
+        cache = LRUCache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_evicts_by_total_cost(self):
+        """Test that entries are evicted while their total cost exceeds max_cost."""
+        cache = LRUCache(max_size=10, max_cost=100)
+        cache.put("a", ["x"] * 60, cost=60)
+        cache.put("b", ["y"] * 30, cost=30)
+        cache.put("c", ["z"] * 30, cost=30)
+
+        assert cache.get("a") is None
+        assert cache.cost == 60
+        assert len(cache) == 2
+
+    def test_replacing_an_entry_updates_the_cost(self):
+        """Test that storing a key again counts only the new value's cost."""
+        cache = LRUCache(max_size=10, max_cost=100)
+        cache.put("a", [], cost=60)
+        cache.put("a", [], cost=10)
+
+        assert cache.cost == 10
+        cache.clear()
+        assert cache.cost == 0
+
+    def test_skips_entries_above_max_entry_cost(self):
+        """Test that a value costing more than max_entry_cost is not stored and evicts nothing."""
+        cache = LRUCache(max_size=10, max_cost=100, max_entry_cost=50)
+        cache.put("a", [], cost=40)
+        cache.put("b", [], cost=51)
+
+        assert cache.get("a") == []
+        assert cache.get("b") is None
+        assert cache.cost == 40
+
+    def test_ttl_expires_entries(self):
+        """Test that an expired entry is dropped and counted as a miss."""
+        cache = LRUCache(max_size=10, ttl=0.01, max_cost=100)
+        cache.put("a", 1, cost=5)
+        time.sleep(0.02)
+
+        assert cache.get("a") is None
+        assert cache.misses == 1
+        assert cache.cost == 0
+
+    def test_hit_and_miss_counters(self):
+        """Test the counters, and that count_miss=False leaves a miss uncounted."""
+        cache = LRUCache(max_size=10)
+        cache.put("a", 1)
+
+        cache.get("a")
+        cache.get("b")
+        cache.get("b", count_miss=False)
+        cache.get("a", count_miss=False)
+
+        assert (cache.hits, cache.misses) == (2, 1)
+        assert cache.stats()["hit_rate"] == 2 / 3
+
+    def test_size_zero_stores_nothing(self):
+        """Test that a cache with max_size 0 is disabled."""
+        cache = LRUCache(max_size=0)
+        cache.put("a", 1)
+
+        assert cache.get("a") is None
+        assert len(cache) == 0
@@ -0,0 +1,52 @@
+import asyncio
+
+from src.clients.async_qdrant_client import AsyncQdrantSearchClient
+from tests.conftest import COLLECTION
+
+
+class TestAsyncQdrantSearchClient:
+    """Test cases for AsyncQdrantSearchClient class."""
+
+    def test_asearch_matches_search(self, search_client):
+        """Test that the async search returns the same results as the blocking one."""
+        async def run():
+            return await search_client.asearch("road damage", limit=10)
+
+        results = asyncio.run(run())
+
+        assert results
+        assert [r.message for r in results] == [r.message for r in search_client.search("road damage", limit=10)]
+        assert all(result.label == "road damage" for result in results)
+
+    def test_cache_counts_each_lookup_once(self, search_client):
+        """Test that a miss is counted once although asearch looks the key up before coalescing."""
+        async def run():
+            await search_client.asearch("road damage", limit=10)
+            await search_client.asearch("power outage", limit=10)
+            await search_client.asearch("road damage", limit=10)
+
+        asyncio.run(run())
+
+        stats = search_client.cache_stats()["results"]
+        assert (stats["hits"], stats["misses"]) == (1, 2)
+        assert stats["cost"] == 20
+
+    def test_long_result_lists_are_not_cached(self, qdrant_path):
+        """Test that lists longer than result_cache_max_entry_results are not cached and the total is bounded."""
+        client = AsyncQdrantSearchClient(
+            location=qdrant_path,
+            collection_name=COLLECTION,
+            result_cache_max_results=15,
+            result_cache_max_entry_results=10,
+        )
+        try:
+            assert len(client.search("road damage", limit=20)) > 10
+            assert client.result_cache.cost == 0
+            client.search("road damage", limit=8)
+            client.search("power outage", limit=8)
+
+            assert len(client.result_cache) == 1
+            assert client.result_cache.cost == 8
+        finally:
+            asyncio.run(client.aclose())
+            client.client.close()
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from src.coalescer import Coalescer
+
+
+class RecordingHandler:
+    """Doubles every item, recording the batches it was called with."""
+
+    def __init__(self, delay=0.0, error=None, drop=0):
+        self.batches = []
+        self.delay = delay
+        self.error = error
+        self.drop = drop
+
+    async def __call__(self, items):
+        self.batches.append(list(items))
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return [item * 2 for item in items][self.drop:]
+
+
+class TestCoalescer:
+    """Test cases for Coalescer class."""
+
+    def test_concurrent_items_share_a_batch(self):
+        """Test that items submitted within max_wait are handled in one call, each getting its own result."""
+        handler = RecordingHandler()
+
+        async def run():
+            coalescer = Coalescer(handler, max_wait=0.01)
+            return await asyncio.gather(*(coalescer.submit(i) for i in range(5))), coalescer.stats()
+
+        results, stats = asyncio.run(run())
+
+        assert results == [0, 2, 4, 6, 8]
+        assert handler.batches == [[0, 1, 2, 3, 4]]
+        assert (stats["batches"], stats["items"], stats["mean_batch"]) == (1, 5, 5.0)
+
+    def test_full_batch_is_dispatched_at_once(self):
+        """Test that max_batch items are dispatched without waiting for max_wait."""
+        handler = RecordingHandler()
+
+        async def run():
+            coalescer = Coalescer(handler, max_wait=10.0, max_batch=2)
+            return await asyncio.wait_for(asyncio.gather(*(coalescer.submit(i) for i in range(4))), 1.0)
+
+        assert asyncio.run(run()) == [0, 2, 4, 6]
+        assert handler.batches == [[0, 1], [2, 3]]
+
+    def test_later_items_start_a_new_batch(self):
+        """Test that items submitted after a batch was dispatched are not added to it."""
+        handler = RecordingHandler()
+
+        async def run():
+            coalescer = Coalescer(handler, max_wait=0.0)
+            first = await coalescer.submit(1)
+            second = await coalescer.submit(2)
+            return first, second
+
+        assert asyncio.run(run()) == (2, 4)
+        assert handler.batches == [[1], [2]]
+
+    def test_error_reaches_every_caller(self):
+        """Test that a failing handler raises its exception in every caller of the batch."""
+        async def run():
+            coalescer = Coalescer(RecordingHandler(error=RuntimeError("qdrant down")), max_wait=0.01)
+            return await asyncio.gather(*(coalescer.submit(i) for i in range(3)), return_exceptions=True)
+
+        errors = asyncio.run(run())
+
+        assert [str(error) for error in errors] == ["qdrant down"] * 3
+
+    def test_missing_results_fail_every_caller(self):
+        """Test that a handler returning fewer results than items fails the batch instead of leaving callers waiting."""
+        async def run():
+            coalescer = Coalescer(RecordingHandler(drop=1), max_wait=0.01)
+            return await asyncio.wait_for(
+                asyncio.gather(*(coalescer.submit(i) for i in range(3)), return_exceptions=True), 1.0
+            )
+
+        errors = asyncio.run(run())
+
+        assert all(isinstance(error, ValueError) for error in errors)
+
+    @pytest.mark.parametrize("started", [False, True])
+    def test_cancelled_dispatch_cancels_callers(self, started):
+        """Test that cancelling the dispatch task (e.g. at shutdown) does not leave callers waiting."""
+        handler = RecordingHandler(delay=10.0)
+
+        async def run():
+            coalescer = Coalescer(handler, max_wait=0.0)
+            callers = [asyncio.ensure_future(coalescer.submit(i)) for i in range(3)]
+            while not (handler.batches if started else coalescer._tasks):
+                await asyncio.sleep(0)
+            for task in list(coalescer._tasks):
+                task.cancel()
+            return await asyncio.wait_for(asyncio.gather(*callers, return_exceptions=True), 1.0)
+
+        results = asyncio.run(run())
+
+        assert all(isinstance(result, asyncio.CancelledError) for result in results)
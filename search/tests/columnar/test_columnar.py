@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+import src.columnar
+from src.columnar import columns, encode_arrow, encode_columnar, response_format
+from src.models.models import SearchResult
+
+RESULTS = [
+    SearchResult(time="2020-04-06 00:00:00", location="Downtown", account="a", message="m1", label="q", score=0.52),
+    SearchResult(time="2020-04-06 00:05:00", location="Weston", account="a", message="m2", label="q", score=0.25),
+    SearchResult(time="unknown", location="Downtown", account="b", message="m3", label="q", score=0.2),
+]
+
+
+class TestColumnar:
+    """Test cases for the columnar response formats."""
+
+    def test_columns(self):
+        """Test epoch times, float32 scores and dictionary-encoded fields."""
+        encoded = columns(RESULTS)
+
+        assert encoded["time"] == [1586131200, 1586131500, None]
+        assert encoded["score"].dtype == "float32"
+        assert encoded["location"]["values"] == ["Downtown", "Weston"]
+        assert encoded["location"]["codes"].tolist() == [0, 1, 0]
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_encode_columnar_writes_short_scores(self, monkeypatch, use_orjson):
+        """Test that float32 scores are written in their shortest form, with or without orjson."""
+        if use_orjson:
+            pytest.importorskip("orjson")
+        else:
+            monkeypatch.setattr(src.columnar, "orjson", None)
+
+        body = encode_columnar(RESULTS, "q", next_cursor="abc")
+        document = json.loads(body)
+
+        assert b"0.52," in body and b"0.5199999" not in body
+        assert document["score"] == [0.52, 0.25, 0.2]
+        assert document["account"] == {"values": ["a", "b"], "codes": [0, 0, 1]}
+        assert (document["query"], document["total_results"], document["next_cursor"]) == ("q", 3, "abc")
+
+    def test_encode_arrow(self):
+        """Test that the Arrow stream holds the columns and the query in its metadata."""
+        pa = pytest.importorskip("pyarrow")
+
+        table = pa.ipc.open_stream(encode_arrow(RESULTS, "q")).read_all()
+
+        assert table.column_names == ["time", "location", "account", "label", "message", "score"]
+        assert table.column("location").to_pylist() == ["Downtown", "Weston", "Downtown"]
+        assert table.schema.metadata[b"query"] == b"q"
+
+    def test_response_format(self):
+        """Test that the format name wins over the Accept header and unknown names are rejected."""
+        assert response_format(None, "application/vnd.apache.arrow.stream") == "arrow"
+        assert response_format("columnar", "application/vnd.apache.arrow.stream") == "columnar"
+        assert response_format(None, "application/json") == "json"
+        with pytest.raises(ValueError, match="Unknown format"):
+            response_format("xml", None)
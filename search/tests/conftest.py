@@ -0,0 +1,90 @@
+import asyncio
+import zlib
+
+import numpy as np
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.models import Batch, Distance, VectorParams
+
+from src.clients.async_qdrant_client import AsyncQdrantSearchClient
+from src.filters import epoch_seconds
+
+COLLECTION = "test_messages"
+
+# Label, main category and words of the sample messages
+TOPICS = [
+    ("Road damage", "Infrastructure", "road damage"),
+    ("Power outage", "Utilities", "power outage"),
+    ("Fire", "Hazards", "fire smoke"),
+]
+EXTRA_WORDS = ["bridge", "street", "school", "hospital", "park", "market", "river", "station"]
+LOCATIONS = ["Downtown", "Weston", "Palace Hills"]
+
+
+class FakeEncoder:
+    """Bag-of-words unit vectors: texts sharing words are similar. Counts encode() calls."""
+
+    dimensions = 64
+
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, texts, **kwargs):
+        self.calls += 1
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[row, zlib.crc32(word.encode("utf-8")) % self.dimensions] += 1
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+
+def sample_messages(count=60):
+    """Messages two minutes apart from 2020-04-06 00:00:00, cycling over topics, locations and accounts."""
+    messages = []
+    for i in range(count):
+        label, main_category, words = TOPICS[i % len(TOPICS)]
+        extras = " ".join(EXTRA_WORDS[(i * k) % len(EXTRA_WORDS)] for k in range(1, 1 + i % 4))
+        time = f"2020-04-06 {i * 2 // 60:02d}:{i * 2 % 60:02d}:00"
+        messages.append({
+            "time": time,
+            "timestamp": epoch_seconds(time),
+            "location": LOCATIONS[i % len(LOCATIONS)],
+            "account": f"user{i % 7}",
+            "message": f"{words} {extras}".strip(),
+            "label": label,
+            "main_category": main_category,
+        })
+    return messages
+
+
+@pytest.fixture
+def fake_encoder(monkeypatch):
+    """Replace the sentence-transformers model of every search client with a FakeEncoder."""
+    encoder = FakeEncoder()
+    monkeypatch.setattr("src.clients.qdrant_client.load_encoder", lambda *args, **kwargs: encoder)
+    return encoder
+
+
+@pytest.fixture
+def qdrant_path(tmp_path, fake_encoder):
+    """A local Qdrant directory with the sample messages, closed again so a search client can open it."""
+    path = str(tmp_path / "qdrant")
+    messages = sample_messages()
+    client = QdrantClient(path=path)
+    client.create_collection(
+        COLLECTION, vectors_config=VectorParams(size=FakeEncoder.dimensions, distance=Distance.COSINE)
+    )
+    vectors = fake_encoder.encode([message["message"] for message in messages])
+    client.upsert(COLLECTION, points=Batch(ids=list(range(len(messages))), vectors=vectors.tolist(), payloads=messages))
+    client.close()
+    return path
+
+
+@pytest.fixture
+def search_client(qdrant_path):
+    """An AsyncQdrantSearchClient on the sample collection."""
+    client = AsyncQdrantSearchClient(location=qdrant_path, collection_name=COLLECTION)
+    yield client
+    asyncio.run(client.aclose())
+    client.client.close()
@@ -0,0 +1,104 @@
+import pytest
+
+from src.cube import AggregateCube
+
+# 2020-04-06 00:00:00 UTC
+T0 = 1586131200
+
+
+@pytest.fixture
+def cube():
+    """Six messages over two locations, three 5-minute buckets and two categories."""
+    return AggregateCube(
+        time=[T0, T0 + 60, T0 + 300, T0 + 310, "2020-04-06 00:10:00", "not a time"],
+        location=["Downtown", "Downtown", "Downtown", "Weston", "Weston", "Weston"],
+        account=["alice", "alice", "alice", "bob", "alice", "carol"],
+        label=["Road damage", "Road damage", "Power outage", "road damage", None, "Fire"],
+        main_category=["Infrastructure", "Infrastructure", "Utilities", "Infrastructure", None, "Hazards"],
+        bucket_seconds=300,
+    )
+
+
+class TestAggregateCube:
+    """Test cases for AggregateCube class."""
+
+    def test_totals(self, cube):
+        """Test that messages with unreadable times are left out and users are counted once."""
+        assert cube.rows == 5
+        assert cube.query() == [{"messages": 5, "users": 2}]
+
+    def test_group_by_location(self, cube):
+        """Test grouping by one dimension, with distinct users per group."""
+        assert cube.query(group_by=["location"]) == [
+            {"location": "Downtown", "messages": 3, "users": 1},
+            {"location": "Weston", "messages": 2, "users": 2},
+        ]
+
+    def test_group_by_time_and_category(self, cube):
+        """Test grouping by two dimensions; unlabeled messages have the category ""."""
+        rows = cube.query(group_by=["time", "category"])
+
+        assert rows == [
+            {"time": "2020-04-06 00:00:00", "category": "road damage", "messages": 2, "users": 1},
+            {"time": "2020-04-06 00:05:00", "category": "power outage", "messages": 1, "users": 1},
+            {"time": "2020-04-06 00:05:00", "category": "road damage", "messages": 1, "users": 1},
+            {"time": "2020-04-06 00:10:00", "category": "", "messages": 1, "users": 1},
+        ]
+
+    def test_group_by_category_merges_main_categories(self):
+        """Test that a label filed under several main categories is one group, with users counted once."""
+        cube = AggregateCube(
+            time=[T0, T0 + 60, T0 + 120, T0 + 180],
+            location=["Downtown", "Weston", "Weston", "Weston"],
+            account=["alice", "alice", "bob", "bob"],
+            label=["Fire", "fire", "Fire", "Power outage"],
+            main_category=["Hazards", "Utilities", "Hazards", "Utilities"],
+        )
+
+        assert cube.query(group_by=["category"]) == [
+            {"category": "fire", "messages": 3, "users": 2},
+            {"category": "power outage", "messages": 1, "users": 1},
+        ]
+        assert cube.query(group_by=["main_category", "category"]) == [
+            {"main_category": "Hazards", "category": "fire", "messages": 2, "users": 2},
+            {"main_category": "Utilities", "category": "fire", "messages": 1, "users": 1},
+            {"main_category": "Utilities", "category": "power outage", "messages": 1, "users": 1},
+        ]
+
+    def test_wider_time_groups_merge_users_exactly(self, cube):
+        """Test that merging buckets counts a user active in several of them once."""
+        rows = cube.query(group_by=["time"], bucket_seconds=600)
+
+        assert rows == [
+            {"time": "2020-04-06 00:00:00", "messages": 4, "users": 2},
+            {"time": "2020-04-06 00:10:00", "messages": 1, "users": 1},
+        ]
+
+    def test_filters(self, cube):
+        """Test location, category, main category and time filters."""
+        assert cube.query(locations=["Weston"]) == [{"messages": 2, "users": 2}]
+        assert cube.query(categories=["ROAD DAMAGE"], group_by=["location"]) == [
+            {"location": "Downtown", "messages": 2, "users": 1},
+            {"location": "Weston", "messages": 1, "users": 1},
+        ]
+        assert cube.query(main_categories=["Utilities"]) == [{"messages": 1, "users": 1}]
+        assert cube.query(start=T0 + 300, end="2020-04-06 00:05:00") == [{"messages": 2, "users": 2}]
+        assert cube.query(locations=["Nowhere"]) == []
+
+    @pytest.mark.parametrize("bucket_seconds", [-300, 0, 450])
+    def test_invalid_bucket_seconds(self, cube, bucket_seconds):
+        """Test that group widths that are not positive multiples of the bucket are rejected."""
+        with pytest.raises(ValueError, match="positive multiple of 300"):
+            cube.query(group_by=["time"], bucket_seconds=bucket_seconds)
+
+    def test_unknown_dimension(self, cube):
+        """Test that an unknown group_by dimension is rejected."""
+        with pytest.raises(ValueError, match="Unknown group_by"):
+            cube.query(group_by=["weather"])
+
+    def test_empty_cube(self):
+        """Test that a cube without readable messages answers with zero counts."""
+        cube = AggregateCube([], [], [], [], [])
+
+        assert cube.cells == 0
+        assert cube.query(group_by=["location"]) == []
@@ -0,0 +1,167 @@
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from src import routes
+from src.service import SearchService
+from tests.conftest import COLLECTION, LOCATIONS
+
+
+@pytest.fixture
+def api(monkeypatch, qdrant_path):
+    """A TestClient of the app, serving the sample collection once /ready reports it."""
+    monkeypatch.setenv("QDRANT_LOCATION", qdrant_path)
+    monkeypatch.setenv("QDRANT_COLLECTION", COLLECTION)
+    service = SearchService()
+    monkeypatch.setattr(routes, "service", service)
+    monkeypatch.setattr(main, "service", service)
+    with TestClient(main.app) as client:
+        deadline = time.monotonic() + 10
+        while client.get("/ready").status_code != 200:
+            assert time.monotonic() < deadline, client.get("/ready").json()
+            time.sleep(0.02)
+        yield client
+    service.search_client.client.close()
+
+
+class TestStatusRoutes:
+    """Test cases for /health, /ready and /cache/stats."""
+
+    def test_ready(self, api):
+        """Test that a started service reports ready, with its startup timings."""
+        status = api.get("/ready").json()
+
+        assert status["ready"] and status["model_loaded"] and status["warmed_up"] and status["qdrant"]
+        assert status["error"] is None
+        assert status["startup_seconds"]
+
+    def test_starting(self, monkeypatch):
+        """Test that before start() the server is live but not ready, and searches answer 503."""
+        monkeypatch.setattr(routes, "service", SearchService())
+        client = TestClient(main.app)
+
+        assert client.get("/health").json() == {"status": "ok"}
+        assert client.get("/ready").status_code == 503
+        assert client.get("/ready").json()["ready"] is False
+        assert client.get("/search/vector", params={"query": "road damage"}).status_code == 503
+        assert client.post("/search/batch", json={"queries": ["road damage"]}).status_code == 503
+        assert client.get("/aggregate").status_code == 503
+
+    def test_cache_stats(self, api):
+        """Test that the cache statistics include the coalescer of the search client."""
+        api.get("/search/vector", params={"query": "road damage", "limit": 5})
+
+        assert "coalescer" in api.get("/cache/stats").json()
+
+
+class TestVectorSearchRoutes:
+    """Test cases for /search/vector and /search/vector/stream."""
+
+    def test_pages_follow_the_cursor(self, api):
+        """Test that pages fetched with next_cursor add up to the full search, without repeats."""
+        full = api.get("/search/vector", params={"query": "road damage", "limit": 30}).json()
+        seen, cursor = [], None
+        while True:
+            params = {"query": "road damage", "limit": 30, "page_size": 7}
+            if cursor:
+                params["cursor"] = cursor
+            page = api.get("/search/vector", params=params).json()
+            seen += [(result["time"], result["message"]) for result in page["results"]]
+            cursor = page.get("next_cursor")
+            if not cursor:
+                break
+
+        assert len(seen) == len(set(seen)) == full["total_results"]
+        assert sorted(seen) == sorted((result["time"], result["message"]) for result in full["results"])
+
+    def test_stream(self, api):
+        """Test that the stream sends one result per line."""
+        response = api.get("/search/vector/stream", params={"query": "road damage", "limit": 12, "page_size": 5})
+        lines = [json.loads(line) for line in response.text.splitlines()]
+
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert len(lines) == 12
+        assert all(line["label"] == "road damage" for line in lines)
+
+    def test_columnar_format(self, api):
+        """Test that format=columnar returns the same results as columns."""
+        params = {"query": "road damage", "limit": 10}
+        results = api.get("/search/vector", params=params).json()["results"]
+        response = api.get("/search/vector", params={**params, "format": "columnar"})
+
+        assert response.headers["content-type"] == "application/vnd.search.columnar+json"
+        assert response.json()["message"] == [result["message"] for result in results]
+
+    @pytest.mark.parametrize("path", ["/search/vector", "/search/vector/stream"])
+    def test_malformed_cursor(self, api, path):
+        """Test that a malformed cursor is a client error."""
+        response = api.get(path, params={"query": "road damage", "cursor": "garbage"})
+
+        assert response.status_code == 400
+        assert "Invalid cursor" in response.json()["detail"]
+
+
+class TestBatchSearchRoutes:
+    """Test cases for /search/batch."""
+
+    def test_per_query(self, api):
+        """Test that each query gets the same results as its own /search/vector request."""
+        queries = ["road damage", "power outage"]
+        response = api.post("/search/batch", json={"queries": queries, "limit": 5}).json()
+
+        assert response["queries"] == queries
+        assert response["total_results"] == 10
+        for query, results in zip(queries, response["per_query"]):
+            single = api.get("/search/vector", params={"query": query, "limit": 5}).json()
+            assert [result["message"] for result in results["results"]] == [
+                result["message"] for result in single["results"]
+            ]
+
+    def test_merge(self, api):
+        """Test that merged results are deduplicated and labeled with one of the queries."""
+        queries = ["road damage", "power outage", "road"]
+        response = api.post("/search/batch", json={"queries": queries, "limit": 8, "merge": True}).json()
+        keys = [(result["time"], result["message"]) for result in response["results"]]
+
+        assert "per_query" not in response
+        assert len(keys) == len(set(keys)) == response["total_results"]
+        assert {result["label"] for result in response["results"]} <= set(queries)
+
+    def test_empty_queries(self, api):
+        """Test that a batch without queries is rejected."""
+        assert api.post("/search/batch", json={"queries": []}).status_code == 422
+
+
+class TestAggregateRoutes:
+    """Test cases for /aggregate."""
+
+    def test_totals(self, api):
+        """Test the message and distinct user totals of the sample collection."""
+        response = api.get("/aggregate").json()
+
+        assert response["rows"] == [{"messages": 60, "users": 7}]
+        assert response["bucket_seconds"] == 300
+
+    def test_group_by_location(self, api):
+        """Test grouping by location with a category filter."""
+        response = api.get("/aggregate", params={"group_by": "location", "categories": "Road damage"}).json()
+
+        assert response["rows"] == [{"location": LOCATIONS[0], "messages": 20, "users": 7}]
+        assert response["total_rows"] == 1
+
+    def test_group_by_time(self, api):
+        """Test that 10-minute groups each hold five messages two minutes apart."""
+        response = api.get("/aggregate", params={"group_by": "time", "bucket_seconds": 600}).json()
+
+        assert response["total_rows"] == 12
+        assert response["rows"][0] == {"time": "2020-04-06 00:00:00", "messages": 5, "users": 5}
+
+    @pytest.mark.parametrize("bucket_seconds, status_code", [(-300, 422), (0, 422), (450, 400)])
+    def test_invalid_bucket_seconds(self, api, bucket_seconds, status_code):
+        """Test that group widths that are not positive multiples of the bucket are client errors."""
+        response = api.get("/aggregate", params={"group_by": "time", "bucket_seconds": bucket_seconds})
+
+        assert response.status_code == status_code
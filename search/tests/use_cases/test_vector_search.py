@@ -0,0 +1,97 @@
+import pytest
+from qdrant_client.models import PointStruct
+
+from src.cursor import decode_cursor, encode_cursor
+from src.use_cases.vector_search import VectorSearchInput, VectorSearchUseCase
+from tests.conftest import COLLECTION
+
+
+def all_pages(use_case, query, limit, page_size):
+    """Follow the cursors from the first page to the last; returns the pages."""
+    pages, cursor = [], None
+    while True:
+        page, cursor = use_case.run_page(VectorSearchInput(query, limit=limit, page_size=page_size, cursor=cursor))
+        pages.append(page)
+        if cursor is None:
+            return pages
+
+
+def identities(results):
+    return [(result.time, result.message) for result in results]
+
+
+class TestCursor:
+    """Test cases for the page cursor."""
+
+    def test_round_trip(self):
+        """Test that a cursor decodes to what it was made from."""
+        assert decode_cursor(encode_cursor(40, 0.5, points=60)) == (40, 0.5, 60)
+        assert decode_cursor(encode_cursor(40, 0.5)) == (40, 0.5, None)
+        assert decode_cursor(None) == (0, None, None)
+
+    @pytest.mark.parametrize("cursor", ["not a cursor", encode_cursor(-1, 0.5), "W10"])
+    def test_malformed(self, cursor):
+        """Test that malformed cursors are rejected."""
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            decode_cursor(cursor)
+
+
+class TestVectorSearchUseCase:
+    """Test cases for VectorSearchUseCase paging and streaming."""
+
+    @pytest.fixture
+    def use_case(self, search_client):
+        return VectorSearchUseCase(search_client)
+
+    def test_pages_neither_repeat_nor_skip(self, use_case, search_client):
+        """Test that following the cursors returns every result of a full search exactly once."""
+        pages = all_pages(use_case, "road damage bridge", limit=1000, page_size=7)
+        paged = identities(result for page in pages for result in page)
+        expected = identities(search_client.search("road damage bridge", limit=1000))
+
+        assert len(expected) > 14
+        assert len(paged) == len(set(paged))
+        assert sorted(paged) == sorted(expected)
+        assert all(len(page) == 7 for page in pages[:-1])
+
+    def test_limit_caps_all_pages(self, use_case):
+        """Test that limit counts results over all pages and the last page has no cursor."""
+        pages = all_pages(use_case, "road damage", limit=10, page_size=4)
+
+        assert [len(page) for page in pages] == [4, 4, 2]
+
+    def test_cursor_past_limit(self, use_case):
+        """Test that a cursor at the limit gives an empty last page."""
+        assert use_case.run_page(VectorSearchInput("road damage", limit=10, cursor=encode_cursor(10, 0.5))) == ([], None)
+
+    def test_malformed_cursor(self, use_case):
+        """Test that a malformed cursor raises ValueError."""
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            use_case.run_page(VectorSearchInput("road damage", cursor="garbage"))
+
+    def test_points_inserted_above_the_cursor_are_not_repeated(self, use_case, search_client):
+        """Test that results already delivered are not sent again after points are added above the cursor."""
+        first, cursor = use_case.run_page(VectorSearchInput("road damage", limit=1000, page_size=5))
+        search_client.client.upsert(COLLECTION, points=[
+            PointStruct(
+                id=1000 + i,
+                vector=search_client.model.encode(["road damage"])[0].tolist(),
+                payload={"time": f"2020-04-07 00:00:0{i}", "location": "Downtown", "account": "new", "message": "road damage"},
+            )
+            for i in range(3)
+        ])
+
+        second, _ = use_case.run_page(VectorSearchInput("road damage", limit=1000, page_size=5, cursor=cursor))
+
+        assert second
+        assert not set(identities(second)) & set(identities(first))
+        assert all(result.score <= first[-1].score for result in second)
+
+    def test_stream_matches_pages(self, use_case, search_client):
+        """Test that streamed pages grow and together hold every result once."""
+        pages = list(use_case.stream(VectorSearchInput("road damage bridge", limit=1000, page_size=3)))
+        streamed = identities(result for page in pages for result in page)
+
+        assert len(pages[1]) == 6
+        assert len(streamed) == len(set(streamed))
+        assert sorted(streamed) == sorted(identities(search_client.search("road damage bridge", limit=1000)))